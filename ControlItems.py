@@ -31,6 +31,7 @@ class ReflectionLine(QtGui.QGraphicsItem):
         # self.visible = True #Use default isVisble method etc
         # self.setFlag(QtGui.QGraphicsItem.ItemSendsGeometryChanges)
         self.adjustable = False
+        self.updateBoundingRect()
         self.initUI()
 
     def initUI(self):
@@ -40,26 +41,20 @@ class ReflectionLine(QtGui.QGraphicsItem):
         self.drawEnd = [0, self.height/2 - self.inset]
         self.setPos(QtCore.QPointF(self.width/2, self.height/2))
 
+    schema = RigAttributeSchema('ReflectionLine', [('width', 'getWidth', 'setWidth', 'float'),
+                                                   ('height', 'getHeight', 'setHeight', 'float'),
+                                                   ('inset', 'getInset', 'setInset', 'float'),
+                                                   ('pos', 'pos', 'setPos', 'point')])
+
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        ReflectionLineRoot = xml.Element('ReflectionLine')
-        attributes = xml.SubElement(ReflectionLineRoot,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'width', value = str(self.getWidth()))
-        xml.SubElement(attributes, 'attribute', name = 'height', value = str(self.getHeight()))
-        xml.SubElement(attributes, 'attribute', name = 'inset', value = str(self.getInset()))
-        xml.SubElement(attributes, 'attribute', name = 'pos', value = (str(self.pos().x())) + "," + str(self.pos().y()))
+        ReflectionLineRoot = self.schema.store(self)
         return ReflectionLineRoot
 
     def read(self, ReflectionLineXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
         # ReflectionLineRoot = ReflectionLineXml.getroot()
-        for a in ReflectionLineXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'width': self.setWidth(float(a.attrib['value']))
-            elif a.attrib['name'] == 'height': self.setHeight(float(a.attrib['value']))
-            elif a.attrib['name'] == 'inset': self.setInset(float(a.attrib['value']))
-            elif a.attrib['name'] == 'pos': 
-                newPos = a.attrib['value'].split(",")
-                self.setPos(float(newPos[0]), float(newPos[1]))
+        self.schema.read(self, ReflectionLineXml)
         self.setDraw()
         self.update()
 
@@ -74,12 +69,14 @@ class ReflectionLine(QtGui.QGraphicsItem):
 
     def setHeight(self,height):
         self.height = height
+        self.updateBoundingRect()
 
     def getInset(self):
         return self.inset
 
     def setInset(self, inset):
         self.inset = inset
+        self.updateBoundingRect()
 
     def setDraw(self):
         self.drawStart = [0, -self.height/2 + self.inset]
@@ -87,8 +84,8 @@ class ReflectionLine(QtGui.QGraphicsItem):
 
     def paint(self, painter, option, widget):
         # painter.drawLine(QtCore.QLineF(6,-40,6,-2))
-        self.prepareGeometryChange()
         pen = QtGui.QPen(QtCore.Qt.black, 1, QtCore.Qt.DotLine)
+        if rigDetailLevels.getLevel(painter) != "Full": pen = QtGui.QPen(QtCore.Qt.black, 0, QtCore.Qt.SolidLine) #Zoomed out the dots run together, so draw a plain line
         painter.setPen(pen)
         painter.drawLine(self.drawStart[0],self.drawStart[1],self.drawEnd[0],self.drawEnd[1])
         if self.adjustable:
@@ -107,14 +104,20 @@ class ReflectionLine(QtGui.QGraphicsItem):
     def getAdjustable(self):
         return self.adjustable
 
-    def boundingRect(self):
+    def updateBoundingRect(self):
+        """Function to recalculate the cached bounding rect, called by the setters that change the size of the item"""
+        self.prepareGeometryChange()
         adjust = 5.0
-        return QtCore.QRectF( -adjust, -self.height/2 + self.inset - adjust,
-                             2*adjust, self.height - 2*self.inset + 2*adjust)
+        self.boundRect = QtCore.QRectF( -adjust, -self.height/2 + self.inset - adjust,
+                                       2*adjust, self.height - 2*self.inset + 2*adjust)
+
+    def boundingRect(self):
+        return self.boundRect
 
     def remap(self,gViewWidth, gViewHeight):
         self.width = gViewWidth
         self.height = gViewHeight
+        self.updateBoundingRect()
         self.drawStart = [0, -self.height/2 + self.inset]
         self.drawEnd = [0, self.height/2 - self.inset]
         self.setPos(QtCore.QPointF(self.width/2, self.height/2))
@@ -148,14 +151,14 @@ class WireGroup():
         self.scene = rigGView.scene()
         # self.initBuild()
 
+    schema = RigAttributeSchema('WireGroup', [('name', 'getName', 'setName', 'str'),
+                                              ('colour', 'getColour', 'setColour', 'colour'),
+                                              ('scale', 'getScale', 'setScale', 'float'),
+                                              ('visible', 'isVisible', 'setVisible', 'bool')])
+
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        wireRoot = xml.Element('WireGroup')
-        attributes = xml.SubElement(wireRoot,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'name', value = str(self.getName()))
-        xml.SubElement(attributes, 'attribute', name = 'colour', value = (str(self.colour.red()) + "," + str(self.colour.green()) + "," + str(self.colour.blue())))
-        xml.SubElement(attributes, 'attribute', name = 'scale', value = str(self.getScale()))
-        xml.SubElement(attributes, 'attribute', name = 'visible', value = str(self.isVisible()))
+        wireRoot = self.schema.store(self)
 
         # Now record the xml for the Nodes
         wireNodes = xml.SubElement(wireRoot,'Nodes')
@@ -171,13 +174,7 @@ class WireGroup():
 
     def read(self, wireXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
-        for a in wireXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'name': self.setName(a.attrib['value'])
-            elif a.attrib['name'] == 'scale': self.setScale(float(a.attrib['value']))
-            elif a.attrib['name'] == 'visible': self.setVisible(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'colour': 
-                newColour = a.attrib['value'].split(",")
-                self.setColour(QtGui.QColor(int(newColour[0]), int(newColour[1]),int(newColour[2])))
+        self.schema.read(self, wireXml)
 
         # Now read in and generate all the nodes
         self.clear() # Clear out all items, safely deleting everything from the WireGroup and destroying objects
@@ -362,16 +359,16 @@ class SuperNodeGroup():
         self.scene.addItem(pT)
         cP.setLocked(False)
 
+    schema = RigAttributeSchema('SuperNodeGroup', [('name', 'getName', 'setName', 'str'),
+                                                   ('form', 'getForm', 'setForm', 'str'),
+                                                   ('locked', 'isLocked', 'setLocked', 'bool'),
+                                                   ('colour', 'getColour', 'setColour', 'colour'),
+                                                   ('scale', 'getScale', 'setScale', 'float'),
+                                                   ('visible', 'isVisible', 'setVisible', 'bool')])
+
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        superNodeGroupRoot = xml.Element('SuperNodeGroup')
-        attributes = xml.SubElement(superNodeGroupRoot,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'name', value = str(self.getName()))
-        xml.SubElement(attributes, 'attribute', name = 'form', value = str(self.getForm()))
-        xml.SubElement(attributes, 'attribute', name = 'locked', value = str(self.isLocked()))
-        xml.SubElement(attributes, 'attribute', name = 'colour', value = (str(self.colour.red()) + "," + str(self.colour.green()) + "," + str(self.colour.blue())))
-        xml.SubElement(attributes, 'attribute', name = 'scale', value = str(self.getScale()))
-        xml.SubElement(attributes, 'attribute', name = 'visible', value = str(self.isVisible()))
+        superNodeGroupRoot = self.schema.store(self)
 
         # Now record the xml for the superNode and Pin
         # pinTies should be able to be drawn from the resulting data of nodes and pins
@@ -382,15 +379,7 @@ class SuperNodeGroup():
 
     def read(self, superNodeGroupXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
-        for a in superNodeGroupXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'name': self.setName(a.attrib['value'])
-            elif a.attrib['name'] == 'form': self.setForm(a.attrib['value'])
-            elif a.attrib['name'] == 'locked': self.setLocked(str(a.attrib['value']) == 'True')            
-            elif a.attrib['name'] == 'scale': self.setScale(float(a.attrib['value']))
-            elif a.attrib['name'] == 'visible': self.setVisible(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'colour': 
-                newColour = a.attrib['value'].split(",")
-                self.setColour(QtGui.QColor(int(newColour[0]), int(newColour[1]),int(newColour[2])))
+        self.schema.read(self, superNodeGroupXml)
 
         # Now read in and generate superNode, Pin and PinTie
         self.clear() # Clear out superNode, Pin and PinTie
@@ -498,7 +487,7 @@ class SuperNodeGroup():
 
 
 
-class ControlPin(QtGui.QGraphicsItem):
+class ControlPin(QtGui.QGraphicsItem, RigGraphNode, RigStyledItem):
     """A Control Pin is the small black cross with curved outer lines that accompanies each Node
 
     The Control Pin (pin) is the parent of the node and represents the nodes home 
@@ -515,6 +504,7 @@ class ControlPin(QtGui.QGraphicsItem):
     """
     def __init__(self, cPos, control = None):
         super(ControlPin, self).__init__()      
+        self.initGraph()
         self.index = 0 
         self.scale = 1
         self.scaleOffset = 2.5
@@ -525,28 +515,26 @@ class ControlPin(QtGui.QGraphicsItem):
         self.node = None
         self.pinTie = None
         self.locked = True
+        self.initStyle()
+        self.updateBoundingRect()
 
         self.setPos(cPos)
         self.setZValue(12) #Set Draw sorting order - 0 is furthest back. Put curves and pins near the back. Nodes and markers nearer the front.
 
-        f=open('darkorange.stylesheet', 'r')  #Set up Style Sheet for customising anything within the Graphics View
-        self.styleData = f.read()
-        f.close()
+    schema = RigAttributeSchema('Pin', [('index', 'getIndex', 'setIndex', 'int'),
+                                        ('scale', 'getScale', 'setScale', 'float'),
+                                        ('scaleOffset', 'getScaleOffset', 'setScaleOffset', 'float'),
+                                        ('alpha', 'getAlpha', 'setAlpha', 'float'),
+                                        ('active', 'isActive', 'setActive', 'bool'),
+                                        ('zValue', 'zValue', 'setZValue', 'float'),
+                                        ('visible', 'isVisible', 'setVisible', 'bool'),
+                                        ('pos', 'pos', 'setPos', 'point'),
+                                        ('rotation', 'rotation', 'setRotation', 'float'),
+                                        ('locked', 'isLocked', 'setLocked', 'bool')])
 
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        pinRoot = xml.Element('Pin')
-        attributes = xml.SubElement(pinRoot,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'index', value = str(self.getIndex()))
-        xml.SubElement(attributes, 'attribute', name = 'scale', value = str(self.getScale()))
-        xml.SubElement(attributes, 'attribute', name = 'scaleOffset', value = str(self.getScaleOffset()))
-        xml.SubElement(attributes, 'attribute', name = 'alpha', value = str(self.getAlpha()))
-        xml.SubElement(attributes, 'attribute', name = 'active', value = str(self.isActive()))
-        xml.SubElement(attributes, 'attribute', name = 'zValue', value = str(self.zValue()))
-        xml.SubElement(attributes, 'attribute', name = 'visible', value = str(self.isVisible()))
-        xml.SubElement(attributes, 'attribute', name = 'pos', value = (str(self.pos().x())) + "," + str(self.pos().y()))
-        xml.SubElement(attributes, 'attribute', name = 'rotation', value = str(self.rotation()))
-        xml.SubElement(attributes, 'attribute', name = 'locked', value = str(self.isLocked()))
+        pinRoot = self.schema.store(self)
 
         #Now Store the constraint Information add it to the XML
         constraintXml = xml.SubElement(pinRoot,'ConstraintItem')
@@ -557,20 +545,7 @@ class ControlPin(QtGui.QGraphicsItem):
 
     def read(self, pinXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
-        for a in pinXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'index': self.setIndex(int(a.attrib['value']))
-            elif a.attrib['name'] == 'scale': self.setScale(float(a.attrib['value']))
-            elif a.attrib['name'] == 'scaleOffset': self.setScaleOffset(float(a.attrib['value']))
-            elif a.attrib['name'] == 'alpha': self.setAlpha(float(a.attrib['value']))
-            elif a.attrib['name'] == 'zValue': self.setZValue(float(a.attrib['value']))
-            elif a.attrib['name'] == 'visible': self.setVisible(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'pos': 
-                newPos = a.attrib['value'].split(",")
-                self.setPos(float(newPos[0]), float(newPos[1]))
-            elif a.attrib['name'] == 'rotation': 
-                self.setRotation(float(a.attrib['value']))
-            elif a.attrib['name'] == 'active': self.setActive(str(a.attrib['value']) == 'True') #At the very end check the active state of the pin
-            elif a.attrib['name'] == 'locked': self.setLocked(str(a.attrib['value']) == 'True') #At the very end check the locked
+        self.schema.read(self, pinXml)
 
 
         #Now read in the constraint Item information
@@ -597,12 +572,16 @@ class ControlPin(QtGui.QGraphicsItem):
 
     def setScale(self, scale):
         self.scale = scale
+        self.invalidateStyle()
+        self.updateBoundingRect()
 
     def getScaleOffset(self):
         return self.scaleOffset
 
     def setScaleOffset(self, scaleOffset):
         self.scaleOffset = scaleOffset
+        self.invalidateStyle()
+        self.updateBoundingRect()
 
     def getAlpha(self):
         return self.alpha
@@ -621,18 +600,25 @@ class ControlPin(QtGui.QGraphicsItem):
 
     def setConstraintItem(self, item):
         if type(item) == ConstraintLine or type(item) == ConstraintRect or type(item) == ConstraintEllipse:
+            if self.constraintItem: self.constraintItem.removeGraphOutput(self)
             self.constraintItem = item
+            item.addGraphOutput(self) #The rotation of the constraint item drives the pin
 
     def isActive(self):
         return self.active
 
     def setActive(self, active):
         self.active = active
+        updateSceneCache(self)
+
+    def isCacheable(self):
+        """Function to return whether the pin can be drawn from a cache - only pins that cannot be edited are"""
+        return self.locked or not self.active
 
     def activate(self):
         if not self.active: 
             delConstraintItem = QtGui.QMessageBox()
-            delConstraintItem.setStyleSheet(self.styleData)
+            delConstraintItem.setStyleSheet(rigResources.getStyleSheet()) #Read once, and shared with the rest of the UI
             delConstraintItem.setWindowTitle("Pin Deactivation")
             delConstraintItem.setText("Are you sure you want to deactivate the pin? There is a constraint Item present, and this item will be removed if you continue.")
             delConstraintItem.setStandardButtons(QtGui.QMessageBox.Yes | QtGui.QMessageBox.No)
@@ -640,7 +626,7 @@ class ControlPin(QtGui.QGraphicsItem):
             response = QtGui.QMessageBox.Yes
             if self.constraintItem: response = delConstraintItem.exec_()
             if response == QtGui.QMessageBox.Yes:
-                self.scaleOffset = 1.0
+                self.setScaleOffset(1.0)
                 self.getNode().goHome()
                 self.getNode().setVisible(False)
                 self.getPinTie().setVisible(False)
@@ -648,7 +634,7 @@ class ControlPin(QtGui.QGraphicsItem):
                     self.scene().removeItem(self.constraintItem)
                     self.constraintItem = None
         else: 
-            self.scaleOffset = 2.5
+            self.setScaleOffset(2.5)
             self.getNode().setVisible(True)
             self.getPinTie().setVisible(True)            
             self.update()
@@ -658,13 +644,17 @@ class ControlPin(QtGui.QGraphicsItem):
 
     def setNode(self, node):
         # print "Node is : " + str(node)
-        if type(node) == Node: self.node = node
+        if type(node) == Node: 
+            self.node = node
+            self.addGraphOutput(node)
 
     def getPinTie(self):
         return self.pinTie
 
     def setPinTie(self, pinTie):
-        if type(pinTie) == PinTie: self.pinTie = pinTie
+        if type(pinTie) == PinTie: 
+            self.pinTie = pinTie
+            self.addGraphOutput(pinTie)
 
     def isLocked(self):
         return self.locked
@@ -674,19 +664,19 @@ class ControlPin(QtGui.QGraphicsItem):
         self.setFlag(QtGui.QGraphicsItem.ItemIsMovable, not self.locked)
         self.setFlag(QtGui.QGraphicsItem.ItemSendsGeometryChanges, not self.locked)
         self.setFlag(QtGui.QGraphicsItem.ItemIsSelectable, not self.locked)
+        updateSceneCache(self)
 
-    def drawWireControl(self, painter):
-        wCurve1 = QtGui.QPainterPath()
+    def styleKey(self):
+        return ("ControlPin", self.scale, self.scaleOffset)
 
+    def buildStyle(self):
+        """Function to build the pens of the pin, and the curved wire lines which only change with its scale"""
         locAx = -1.6 * self.scale*self.scaleOffset
         locAy = 2.78 * self.scale*self.scaleOffset
 
         locBx = -0.556 * self.scale*self.scaleOffset
         locBy = 3.25 * self.scale*self.scaleOffset
 
-        pen = QtGui.QPen(QtCore.Qt.black, 0.25, QtCore.Qt.SolidLine)
-        painter.setPen(pen)
-
         wCurve1 = QtGui.QPainterPath()
         wCurve1.moveTo(QtCore.QPointF(locAx,locAy))
         wCurve1.cubicTo(QtCore.QPointF(locBx,locBy),QtCore.QPointF(-locBx,locBy),QtCore.QPointF(-locAx,locAy))
@@ -702,42 +692,53 @@ class ControlPin(QtGui.QGraphicsItem):
         wCurve4 = QtGui.QPainterPath()
         wCurve4.moveTo(QtCore.QPointF(-locAy,locAx))
         wCurve4.cubicTo(QtCore.QPointF(-locBy,locBx),QtCore.QPointF(-locBy,-locBx),QtCore.QPointF(-locAy,-locAx))
-        
-        # painter.setBrush(self.color)
-        painter.strokePath(wCurve1, painter.pen())
-        painter.strokePath(wCurve2, painter.pen())
-        painter.strokePath(wCurve3, painter.pen())
-        painter.strokePath(wCurve4, painter.pen())
+
+        dotPen = QtGui.QPen(QtCore.Qt.black, 2, QtCore.Qt.SolidLine)
+        dotPen.setCosmetic(True)
+        return {'pen' : QtGui.QPen(QtCore.Qt.black, 0.5, QtCore.Qt.SolidLine), 
+                'dotPen' : dotPen,
+                'wirePen' : QtGui.QPen(QtCore.Qt.black, 0.25, QtCore.Qt.SolidLine),
+                'wireCurves' : [wCurve1, wCurve2, wCurve3, wCurve4]}
+
+    def drawWireControl(self, painter):
+        style = self.getStyle()
+        painter.setPen(style['wirePen'])
+        for wCurve in style['wireCurves']: painter.strokePath(wCurve, style['wirePen'])
 
     def paint(self, painter, option, widget):
         # painter.drawLine(QtCore.QLineF(6,-40,6,-2))
-        pen = QtGui.QPen(QtCore.Qt.black, 0.5, QtCore.Qt.SolidLine)
-        painter.setPen(pen)
+        detail = self.getDetailLevel(painter)
+        if detail == "Low": #Zoomed out, the pin is just a dot
+            painter.setPen(self.getStyle()['dotPen'])
+            painter.drawPoint(0,0)
+            return
+        painter.setPen(self.getStyle()['pen'])
 
         painter.drawLine(0,self.scale*self.scaleOffset*3.0,0,self.scale*self.scaleOffset*-3.0)
         painter.drawLine(self.scale*self.scaleOffset*-3.0,0,self.scale*self.scaleOffset*3.0,0)
         
-        if self.active:
+        if self.active and detail == "Full":
             #Now add wire details if needed
             self.drawWireControl(painter)
 
 
-    def boundingRect(self):
+    def updateBoundingRect(self):
+        """Function to recalculate the cached bounding rect, called by the setters that change the size of the item"""
+        self.prepareGeometryChange()
         adjust = 5
-        return QtCore.QRectF(self.scale*self.scaleOffset*(-3 - adjust), self.scale*self.scaleOffset*(-3 - adjust),
-                             self.scale*self.scaleOffset*(6 + adjust), self.scale*self.scaleOffset*(6 + adjust))
+        self.boundRect = QtCore.QRectF(self.scale*self.scaleOffset*(-3 - adjust), self.scale*self.scaleOffset*(-3 - adjust),
+                                       self.scale*self.scaleOffset*(6 + adjust), self.scale*self.scaleOffset*(6 + adjust))
+
+    def boundingRect(self):
+        return self.boundRect
 
     def itemChange(self, change, value):
         if change == QtGui.QGraphicsItem.ItemPositionChange:
-            if self.pinTie:
-                self.pinTie.drawTie()
-            if self.getNode():
-                for rigCurve in self.getNode().rigCurveList:
-                    rigCurve().buildCurve()
+            self.markDirty() #The node and pinTie are outputs of the pin, so they are updated with it
         return QtGui.QGraphicsItem.itemChange(self, change, value)
 
 
-class GuideMarker(QtGui.QGraphicsItem):
+class GuideMarker(QtGui.QGraphicsItem, RigStyledItem):
     """Guide markers are the squre icons with the diagonal red lines.
 
     These are used to mark out the places in which we want to add the nodes
@@ -762,57 +763,48 @@ class GuideMarker(QtGui.QGraphicsItem):
         self.alpha = 1.0
         self.colourList = [QtGui.QColor(255,0,0), QtGui.QColor(0,255,0), QtGui.QColor(0,0,255), QtGui.QColor(0,255,255), QtGui.QColor(255,0,255), QtGui.QColor(255,255,0), QtGui.QColor(255,125,0), QtGui.QColor(125,255,0),QtGui.QColor(255,0,125),QtGui.QColor(125,0,255),QtGui.QColor(0,255,125),QtGui.QColor(0,125,255),QtGui.QColor(255,125,125),QtGui.QColor(125,255,125),QtGui.QColor(125,125,255),QtGui.QColor(255,255,125),QtGui.QColor(255,125,255),QtGui.QColor(125,255,255)]
         self.guideColourIndex = 0
+        self.labels = {} #The position and shared QStaticText of each label drawn, built when first drawn
+        self.initStyle()
+        self.updateBoundingRect()
         self.setZValue(20) #Set Draw sorting order - 0 is furthest back. Put curves and pins near the back. Nodes and markers nearer the front.
 
         # self.setPos(QtCore.QPointF(50,50))
         # self.move_restrict_rect = QtGui.QGraphicsRectItem(50,50,,410)
 
+    schema = RigAttributeSchema('GuideMarker', [('index', 'getIndex', 'setIndex', 'int'),
+                                                ('active', 'getActive', 'setActive', 'bool'),
+                                                ('activeIndex', 'getActiveIndex', 'setActiveIndex', 'int'),
+                                                ('scale', 'getScale', 'setScale', 'float'),
+                                                ('alpha', 'getAlpha', 'setAlpha', 'float'),
+                                                ('guideColourIndex', 'getGuideColourIndex', 'setGuideColourIndex', 'int'),
+                                                ('zValue', 'zValue', 'setZValue', 'float'),
+                                                ('visible', 'isVisible', 'setVisible', 'bool'),
+                                                ('pos', 'pos', 'setPos', 'point')])
+
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        GuideMarkerRoot = xml.Element('GuideMarker')
-        attributes = xml.SubElement(GuideMarkerRoot,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'index', value = str(self.getIndex()))
-        xml.SubElement(attributes, 'attribute', name = 'active', value = str(self.getActive()))
-        xml.SubElement(attributes, 'attribute', name = 'activeIndex', value = str(self.getActiveIndex()))
-        xml.SubElement(attributes, 'attribute', name = 'scale', value = str(self.getScale()))
-        xml.SubElement(attributes, 'attribute', name = 'alpha', value = str(self.getAlpha()))
-        xml.SubElement(attributes, 'attribute', name = 'guideColourIndex', value = str(self.getGuideColourIndex()))
-        xml.SubElement(attributes, 'attribute', name = 'zValue', value = str(self.zValue()))
-        xml.SubElement(attributes, 'attribute', name = 'visible', value = str(self.isVisible()))
-        xml.SubElement(attributes, 'attribute', name = 'pos', value = (str(self.pos().x())) + "," + str(self.pos().y()))
-        # xmlFile = FileControl.XMLMan()
-        # xmlFile.setTree(GuideMarkerRoot)
-        # xmlFile.setFile("faceFiles/test.xml")
-        # xmlFile.save()
+        GuideMarkerRoot = self.schema.store(self)
         return GuideMarkerRoot
 
     def read(self, GuideMarkerXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
         # GuideMarkerRoot = GuideMarkerXml.getroot()
-        for a in GuideMarkerXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'index': self.setIndex(int(a.attrib['value']))
-            elif a.attrib['name'] == 'active': self.setActive(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'activeIndex': self.setActiveIndex(int(a.attrib['value']))
-            elif a.attrib['name'] == 'scale': self.setScale(float(a.attrib['value']))
-            elif a.attrib['name'] == 'alpha': self.setAlpha(float(a.attrib['value']))
-            elif a.attrib['name'] == 'guideColourIndex': self.setGuideColourIndex(int(a.attrib['value']))
-            elif a.attrib['name'] == 'zValue': self.setZValue(float(a.attrib['value']))
-            elif a.attrib['name'] == 'visible': self.setVisible(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'pos': 
-                newPos = a.attrib['value'].split(",")
-                self.setPos(float(newPos[0]), float(newPos[1]))
+        self.schema.read(self, GuideMarkerXml)
 
     def getScale(self):
         return self.scale
 
     def setScale(self, scale):
         self.scale = scale
+        self.invalidateStyle()
+        self.updateBoundingRect()
 
     def getAlpha(self):
         return self.alpha
 
     def setAlpha(self, alpha):
         self.alpha = float(alpha)
+        self.invalidateStyle()
 
     def getShowID(self):
         return self.showID
@@ -825,6 +817,7 @@ class GuideMarker(QtGui.QGraphicsItem):
 
     def setIndex(self,index):
         self.index = index
+        self.invalidateLabels()
 
     def getActive(self):
         return self.active
@@ -838,28 +831,71 @@ class GuideMarker(QtGui.QGraphicsItem):
 
     def setActiveIndex(self, index):
         self.activeIndex = index
-        self.update()
+        self.invalidateLabels()
 
     def getGuideColourIndex(self):
         return self.guideColourIndex
 
     def setGuideColourIndex(self, index):
         self.guideColourIndex = int(index)
+        self.invalidateStyle()
 
-    def boundingRect(self):
+    def updateBoundingRect(self):
+        """Function to recalculate the cached bounding rect, called by the setters that change the size of the item"""
+        self.prepareGeometryChange()
         adjust = 5
         numberstretch = 5
-        return QtCore.QRectF(self.scale*(-18 - adjust), self.scale*(-18 - adjust),
-                             self.scale*(36 + adjust), self.scale*(36 + adjust + numberstretch))
+        self.boundRect = QtCore.QRectF(self.scale*(-18 - adjust), self.scale*(-18 - adjust),
+                                       self.scale*(36 + adjust), self.scale*(36 + adjust + numberstretch))
+
+    def boundingRect(self):
+        return self.boundRect
+
+    def styleKey(self):
+        return ("GuideMarker", self.guideColourIndex, self.alpha, self.scale)
+
+    def buildStyle(self):
+        """Function to build the pens, gradients and font of the marker from its guide colour, alpha and scale"""
+        colour = self.colourList[self.guideColourIndex]
+        red, green, blue = colour.red(), colour.green(), colour.blue()
+        activeGradient = QtGui.QRadialGradient(0, 0, self.scale*18)
+        activeGradient.setColorAt(0, QtGui.QColor(red,0,0,100*self.alpha))
+        activeGradient.setColorAt(1, QtGui.QColor(red,green,blue,20*self.alpha))
+        selectedGradient = QtGui.QRadialGradient(0, 0, self.scale*4)
+        selectedGradient.setColorAt(1, QtGui.QColor(red,0,0,150*self.alpha))
+        selectedGradient.setColorAt(0, QtGui.QColor(red,green,blue,20*self.alpha))
+        fontsize = 9
+        if self.scale < 1.0:
+            fontsize = int(9*self.scale)
+        return {'activeBrush' : QtGui.QBrush(activeGradient),
+                'outerPen' : QtGui.QPen(QtGui.QColor(180,180,180,255*self.alpha), 0),
+                'innerPen' : QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine),
+                'crossPen' : QtGui.QPen(QtGui.QColor(red,green,blue,255*self.alpha), 0.5, QtCore.Qt.SolidLine),
+                'selectedBrush' : QtGui.QBrush(selectedGradient),
+                'selectedCrossPen' : QtGui.QPen(QtGui.QColor(red,green,blue,255*self.alpha), 2*self.scale, QtCore.Qt.SolidLine),
+                'textPen' : QtGui.QPen(QtGui.QColor(180,180,180,255*self.alpha), 1, QtCore.Qt.SolidLine),
+                'font' : QtGui.QFont('Arial', fontsize)}
+
+    def invalidateStyle(self):
+        self.labels = {} #The labels are laid out in the font and colour of the style
+        RigStyledItem.invalidateStyle(self)
+
+    def invalidateLabels(self):
+        self.labels = {}
+        self.update()
+
+    def buildLabel(self, name, text, x, y):
+        """Function to store the label of the given name, with its baseline starting at (x, y), and return it"""
+        style = self.getStyle()
+        staticText = rigLabelCache.getLabel(text, style['font'], style['textPen'].color())
+        label = (QtCore.QPointF(x, y - QtGui.QFontMetricsF(style['font']).ascent()), staticText) #Static text is drawn from its top left
+        self.labels[name] = label
+        return label
 
     def drawActive(self, painter):
         """A function to draw an active glow around the marker when activated"""
         if self.active:
-            pen = QtGui.QPen(QtGui.QColor(self.colourList[self.guideColourIndex].red(),self.colourList[self.guideColourIndex].green(),self.colourList[self.guideColourIndex].blue(),255*self.alpha), self.scale*0.5, QtCore.Qt.SolidLine)
-            gradient = QtGui.QRadialGradient(0, 0, self.scale*18)
-            gradient.setColorAt(0, QtGui.QColor(self.colourList[self.guideColourIndex].red(),0,0,100*self.alpha))
-            gradient.setColorAt(1, QtGui.QColor(self.colourList[self.guideColourIndex].red(),self.colourList[self.guideColourIndex].green(),self.colourList[self.guideColourIndex].blue(),20*self.alpha))
-            painter.setBrush(QtGui.QBrush(gradient))
+            painter.setBrush(self.getStyle()['activeBrush'])
             painter.drawEllipse(self.scale*-18, self.scale*-18, self.scale*36, self.scale*36)        
 
     def drawID(self, painter):
@@ -867,50 +903,50 @@ class GuideMarker(QtGui.QGraphicsItem):
         # print "Marker guideIndex : " + str(self.guideIndex)
         # print "Marker showID : " + str(self.showID)
         if self.showID and self.index: #Conditions met to disply numbers on corners
-            pen = QtGui.QPen(QtGui.QColor(180,180,180,255*self.alpha), 1, QtCore.Qt.SolidLine)
-            painter.setPen(pen)
-            fontsize = 9
-            if self.scale < 1.0:
-                fontsize = int(9*self.scale)
-            painter.setFont(QtGui.QFont('Arial', fontsize))
+            style = self.getStyle()
+            painter.setPen(style['textPen'])
+            painter.setFont(style['font'])
             if self.guideIndex != 0: 
                 # print "guide index : " + str(self.guideIndex)
-                painter.drawText(self.scale*12,self.scale*-12, str(self.guideIndex)) #Add in the guide Index if it is not 0
-            painter.drawText(self.scale*12,self.scale*21,str(self.index))
+                label = self.labels.get('guideIndex') or self.buildLabel('guideIndex', str(self.guideIndex), self.scale*12, self.scale*-12)
+                painter.drawStaticText(*label) #Add in the guide Index if it is not 0
+            label = self.labels.get('index') or self.buildLabel('index', str(self.index), self.scale*12, self.scale*21)
+            painter.drawStaticText(*label)
 
     def drawActiveIndex(self,painter):
         if self.active: #Conditions met to disply numbers on corners
-            pen = QtGui.QPen(QtGui.QColor(180,180,180,255*self.alpha), 1, QtCore.Qt.SolidLine)
-            painter.setPen(pen)
-            fontsize = 9
-            if self.scale < 1.0:
-                fontsize = int(9*self.scale)
-            painter.setFont(QtGui.QFont('Arial', fontsize))
-            painter.drawText(self.scale*12,self.scale*21,str(self.activeIndex))
+            style = self.getStyle()
+            painter.setPen(style['textPen'])
+            painter.setFont(style['font'])
+            label = self.labels.get('activeIndex') or self.buildLabel('activeIndex', str(self.activeIndex), self.scale*12, self.scale*21)
+            painter.drawStaticText(*label)
 
     def paint(self, painter, option, widget):
         # painter.drawLine(QtCore.QLineF(6,-40,6,-2))
+        style = self.getStyle()
+        detail = self.getDetailLevel(painter)
+        if detail == "Low": #Zoomed out, only the coloured cross is drawn
+            painter.setPen(style['crossPen'])
+            painter.drawLine(self.scale*-12,self.scale*-12,self.scale*12,self.scale*12)
+            painter.drawLine(self.scale*-12,self.scale*12,self.scale*12,self.scale*-12)
+            return
         self.drawActive(painter)
-        painter.setPen(QtCore.Qt.NoPen)
-        painter.setPen(QtGui.QPen(QtGui.QColor(180,180,180,255*self.alpha), 0))
+        painter.setPen(style['outerPen'])
         painter.drawRect(self.scale*-8, self.scale*-8, self.scale*16, self.scale*16)
-        painter.setPen(QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine))
+        painter.setPen(style['innerPen'])
         painter.drawRect(self.scale*-4, self.scale*-4, self.scale*8, self.scale*8)
         # painter.drawRect(-12.5, -2.75, 25, 5)
-        pen = QtGui.QPen(QtGui.QColor(self.colourList[self.guideColourIndex].red(),self.colourList[self.guideColourIndex].green(),self.colourList[self.guideColourIndex].blue(),255*self.alpha), 0.5, QtCore.Qt.SolidLine)
+        pen = style['crossPen']
         if option.state & QtGui.QStyle.State_Sunken or self.isSelected(): # selected
-            gradient = QtGui.QRadialGradient(0, 0, self.scale*4)
-            gradient.setColorAt(1, QtGui.QColor(self.colourList[self.guideColourIndex].red(),0,0,150*self.alpha))
-            gradient.setColorAt(0, QtGui.QColor(self.colourList[self.guideColourIndex].red(),self.colourList[self.guideColourIndex].green(),self.colourList[self.guideColourIndex].blue(),20*self.alpha))
-            painter.setBrush(QtGui.QBrush(gradient))
+            painter.setBrush(style['selectedBrush'])
             painter.drawRect(self.scale*-4, self.scale*-4, self.scale*8, self.scale*8)
-            pen = QtGui.QPen(QtGui.QColor(self.colourList[self.guideColourIndex].red(),self.colourList[self.guideColourIndex].green(),self.colourList[self.guideColourIndex].blue(),255*self.alpha), 2*self.scale, QtCore.Qt.SolidLine)
+            pen = style['selectedCrossPen']
 
         painter.setPen(pen)
         painter.drawLine(self.scale*-12,self.scale*-12,self.scale*12,self.scale*12)
         painter.drawLine(self.scale*-12,self.scale*12,self.scale*12,self.scale*-12)
         # self.drawID(painter) #Now add in the Marker ID if relevant
-        self.drawActiveIndex(painter)
+        if detail == "Full": self.drawActiveIndex(painter)
 
 
     def itemChange(self, change, value):
@@ -924,7 +960,7 @@ class GuideMarker(QtGui.QGraphicsItem):
 
 
 ###Nodes for selection in the Graphics View
-class Node(QtGui.QGraphicsItem):
+class Node(QtGui.QGraphicsItem, RigGraphNode, RigStyledItem):
     """The Node is the main circular item that the user interacts with in the WireGroup
 
     Nodes when moved away from their parent ControlPin (pin) generate the offset that
@@ -938,6 +974,7 @@ class Node(QtGui.QGraphicsItem):
     """
     def __init__(self, nPos):
         QtGui.QGraphicsItem.__init__(self)
+        self.initGraph()
         self.setFlag(QtGui.QGraphicsItem.ItemIsMovable,True)
         self.setFlag(QtGui.QGraphicsItem.ItemSendsGeometryChanges,True)
         self.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,True)
@@ -951,6 +988,8 @@ class Node(QtGui.QGraphicsItem):
         self.scale = 1.0
         self.wireName = ""
         self.colour = QtGui.QColor(25,25,255,150)
+        self.initStyle()
+        self.updateBoundingRect()
         # self.pin.append(weakref.ref(pin))
         self.pin = None
         self.pinIndex = None
@@ -963,54 +1002,27 @@ class Node(QtGui.QGraphicsItem):
         self.setPos(nPos)
         self.setZValue(12) #Set Draw sorting order - 0 is furthest back. Put curves and pins near the back. Nodes and markers nearer the front.
 
+    schema = RigAttributeSchema('Node', [('index', 'getIndex', 'setIndex', 'int'),
+                                         ('radius', 'getRadius', 'setRadius', 'float'),
+                                         ('scale', 'getScale', 'setScale', 'float'),
+                                         ('pinIndex', 'getPinIndex', 'setPinIndex', 'int'),
+                                         ('pinTieIndex', 'getPinTieIndex', 'setPinTieIndex', 'int'),
+                                         ('wireName', 'getWireName', 'setWireName', 'str'),
+                                         ('colour', 'getColour', 'setColour', 'colour'),
+                                         ('zValue', 'zValue', 'setZValue', 'float'),
+                                         ('visible', 'isVisible', 'setVisible', 'bool'),
+                                         ('pos', 'pos', 'setPos', 'point'),
+                                         ('bezierHandle0', lambda item: item.getBezierHandles(0), lambda item, value: item.setBezierHandles(value, 0), 'handle'),
+                                         ('bezierHandle1', lambda item: item.getBezierHandles(1), lambda item, value: item.setBezierHandles(value, 1), 'handle')])
+
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        nodeRoot = xml.Element('Node')
-        attributes = xml.SubElement(nodeRoot,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'index', value = str(self.getIndex()))
-        xml.SubElement(attributes, 'attribute', name = 'radius', value = str(self.getRadius()))
-        xml.SubElement(attributes, 'attribute', name = 'scale', value = str(self.getScale()))
-        xml.SubElement(attributes, 'attribute', name = 'pinIndex', value = str(self.getPinIndex()))
-        xml.SubElement(attributes, 'attribute', name = 'pinTieIndex', value = str(self.getPinTieIndex()))
-        xml.SubElement(attributes, 'attribute', name = 'wireName', value = str(self.getWireName()))
-        xml.SubElement(attributes, 'attribute', name = 'colour', value = (str(self.getColour().red()) + "," + str(self.getColour().green()) + "," + str(self.getColour().blue())))
-        xml.SubElement(attributes, 'attribute', name = 'zValue', value = str(self.zValue()))
-        xml.SubElement(attributes, 'attribute', name = 'visible', value = str(self.isVisible()))
-        xml.SubElement(attributes, 'attribute', name = 'pos', value = (str(self.pos().x())) + "," + str(self.pos().y()))
-        if self.getBezierHandles(0) != None: xml.SubElement(attributes, 'attribute', name = 'bezierHandle0', value = (str(self.getBezierHandles(0)[0]) + "," + str(self.getBezierHandles(0)[1])))
-        else: xml.SubElement(attributes, 'attribute', name = 'bezierHandle0', value = ("None"))
-        if self.getBezierHandles(1) != None: xml.SubElement(attributes, 'attribute', name = 'bezierHandle1', value = (str(self.getBezierHandles(1)[0]) + "," + str(self.getBezierHandles(1)[1])))
-        else: xml.SubElement(attributes, 'attribute', name = 'bezierHandle1', value = ("None"))
-
+        nodeRoot = self.schema.store(self)
         return nodeRoot
 
     def read(self, nodeXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
-        for a in nodeXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'index': self.setIndex(int(a.attrib['value']))
-            elif a.attrib['name'] == 'radius': self.setRadius(float(a.attrib['value']))
-            elif a.attrib['name'] == 'scale': self.setScale(float(a.attrib['value']))
-            elif a.attrib['name'] == 'pinIndex': self.setPinIndex(int(a.attrib['value']))
-            elif a.attrib['name'] == 'pinTieIndex': self.setPinTieIndex(int(a.attrib['value']))
-            elif a.attrib['name'] == 'wireName': self.setWireName(str(a.attrib['value']))
-            elif a.attrib['name'] == 'zValue': self.setZValue(float(a.attrib['value']))
-            elif a.attrib['name'] == 'visible': self.setVisible(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'pos': 
-                newPos = a.attrib['value'].split(",")
-                self.setPos(float(newPos[0]), float(newPos[1]))
-            elif a.attrib['name'] == 'bezierHandle0': 
-                if a.attrib['value'] != "None":
-                    newPos = a.attrib['value'].split(",")
-                    self.setBezierHandles([float(newPos[0]), float(newPos[1])],0)
-                else: self.setBezierHandles(None,0)
-            elif a.attrib['name'] == 'bezierHandle1': 
-                if a.attrib['value'] != "None":
-                    newPos = a.attrib['value'].split(",")
-                    self.setBezierHandles([float(newPos[0]), float(newPos[1])],1)
-                else: self.setBezierHandles(None,1)
-            elif a.attrib['name'] == 'colour':
-                newColour = a.attrib['value'].split(",")
-                self.setColour(QtGui.QColor(float(newColour[0]), float(newColour[1]),float(newColour[2])))                
+        self.schema.read(self, nodeXml)
 
     def setIndex(self,value):
         self.index = value
@@ -1023,12 +1035,16 @@ class Node(QtGui.QGraphicsItem):
 
     def setRadius(self, radius):
         self.radius = radius
+        self.invalidateStyle()
+        self.updateBoundingRect()
 
     def getScale(self):
         return self.scale
 
     def setScale(self, scale):
         self.scale = scale
+        self.invalidateStyle()
+        self.updateBoundingRect()
 
     def getPinIndex(self):
         return self.pinIndex
@@ -1052,7 +1068,9 @@ class Node(QtGui.QGraphicsItem):
         return self.colour
 
     def setColour(self, colour):
-        if type(colour) == QtGui.QColor: self.colour = colour
+        if type(colour) == QtGui.QColor: 
+            self.colour = colour
+            self.invalidateStyle()
 
     def isHighlighted(self):
         return self.hightlighted
@@ -1063,8 +1081,15 @@ class Node(QtGui.QGraphicsItem):
 
     def addRigCurve(self, rigCurve):
         self.rigCurveList.append(weakref.ref(rigCurve))
+        self.addGraphOutput(rigCurve)
         # print "Rig Curve List is : " + str(self.rigCurveList) + " - for Node :" + str(self)
 
+    def evaluate(self):
+        """Function to flag this node as moved on each of its rigCurves, which are evaluated after it"""
+        for rigCurve in self.rigCurveList:
+            if rigCurve(): rigCurve().setNodeDirty(self)
+        updateSceneIndex(self)
+
     def setBezierHandles(self, handlePos, handleNo):
         """A function to record the position of the bezier handles associated with this Node"""
         self.bezierHandles[handleNo] = handlePos
@@ -1081,6 +1106,8 @@ class Node(QtGui.QGraphicsItem):
             self.pin = pin
             self.setPinIndex(pin.getIndex())
             self.setParentItem(pin)
+            registerSceneItem(self)
+            pin.addGraphOutput(self)
         else: 
             print "WARNING : INVALID OBJECT WAS PASSED TO NODE FOR PIN ALLOCATION"
 
@@ -1091,6 +1118,7 @@ class Node(QtGui.QGraphicsItem):
         if type(pinTie) == PinTie:
             self.pinTie = weakref.ref(pinTie)
             self.setPinTieIndex(pinTie.getIndex())
+            self.addGraphOutput(pinTie)
         else: 
             print "WARNING : INVALID OBJECT WAS PASSED TO NODE FOR PINTIE ALLOCATION"
 
@@ -1110,53 +1138,63 @@ class Node(QtGui.QGraphicsItem):
         """Function to centralise the node back to the pin and update any associated rigCurves and pinTies"""
         if self.pin:
             self.setPos(QtCore.QPointF(0,0))
-            if self.pinTie:
-                self.pinTie().drawTie()
-            for rigCurve in self.rigCurveList:
-                rigCurve().buildCurve()
+            self.markDirty()
         else:
             print "WARNING : NODE HAS NO ASSOCIATED PIN AND AS SUCH HAS NO HOME TO GO TO :("
 
-    def boundingRect(self):
-        adjust = 2
-        return QtCore.QRectF((-self.radius - adjust)*self.scale, (-self.radius - adjust)*self.scale,
-                             (2*self.radius + adjust)*self.scale, (2*self.radius + adjust)*self.scale)
-
-    def paint(self, painter, option, widget):
+    def updateBoundingRect(self):
+        """Function to recalculate the cached bounding rect, called by the setters that change the size of the item"""
         self.prepareGeometryChange()
-        # painter.setPen(QtCore.Qt.NoPen)
-        cColour = QtGui.QColor(25,25,50,150)
-        if self.isSelected(): cColour = QtGui.QColor(220,220,255,150)
-        if self.hightlighted:
-            pen = QtGui.QPen(cColour, 1, QtCore.Qt.SolidLine)
-            painter.setPen(pen)
-            gradient = QtGui.QRadialGradient(0, 0, self.scale*self.radius)
-            gradient.setColorAt(0, self.colour)
-            gradient.setColorAt(0.2, self.colour)
-            gradient.setColorAt(0.9, QtGui.QColor(255,255,255, 255))
-            gradient.setColorAt(1.0, QtGui.QColor(255,255,255, 10))
-            painter.setBrush(QtGui.QBrush(gradient))
-            painter.drawEllipse(-self.radius*self.scale, -self.radius*self.scale, 2*self.radius*self.scale, 2*self.radius*self.scale)
+        adjust = 2
+        self.boundRect = QtCore.QRectF((-self.radius - adjust)*self.scale, (-self.radius - adjust)*self.scale,
+                                       (2*self.radius + adjust)*self.scale, (2*self.radius + adjust)*self.scale)
+        updateSceneIndex(self) #The grid holds the scene bounding rect, so it has to follow a change of size as well as a move
 
-        pen = QtGui.QPen(cColour, 1, QtCore.Qt.SolidLine)
-        painter.setPen(pen)
+    def boundingRect(self):
+        return self.boundRect
+
+    def styleKey(self):
+        return (type(self).__name__, self.colour.rgba(), self.radius, self.scale)
+
+    def buildStyle(self):
+        """Function to build the pens and radial gradients of the node from its colour, radius and scale"""
+        highlightGradient = QtGui.QRadialGradient(0, 0, self.scale*self.radius)
+        highlightGradient.setColorAt(0, self.colour)
+        highlightGradient.setColorAt(0.2, self.colour)
+        highlightGradient.setColorAt(0.9, QtGui.QColor(255,255,255, 255))
+        highlightGradient.setColorAt(1.0, QtGui.QColor(255,255,255, 10))
         gradient = QtGui.QRadialGradient(0, 0, self.scale*self.radius/2)
         gradient.setColorAt(0, self.colour)
         gradient.setColorAt(0.2, self.colour)
         gradient.setColorAt(0.3, QtGui.QColor(self.colour.red(),self.colour.green(),self.colour.blue(), 125))
         gradient.setColorAt(1.0, QtGui.QColor(self.colour.red(),self.colour.green(),self.colour.blue(), 10))
-        painter.setBrush(QtGui.QBrush(gradient))
+        return {'pen' : QtGui.QPen(QtGui.QColor(25,25,50,150), 1, QtCore.Qt.SolidLine),
+                'selectedPen' : QtGui.QPen(QtGui.QColor(220,220,255,150), 1, QtCore.Qt.SolidLine),
+                'highlightBrush' : QtGui.QBrush(highlightGradient),
+                'brush' : QtGui.QBrush(gradient),
+                'flatBrush' : QtGui.QBrush(QtGui.QColor(self.colour.red(),self.colour.green(),self.colour.blue(), 125))}
+
+    def paint(self, painter, option, widget):
+        # painter.setPen(QtCore.Qt.NoPen)
+        style = self.getStyle()
+        if self.isSelected(): painter.setPen(style['selectedPen'])
+        else: painter.setPen(style['pen'])
+        detail = self.getDetailLevel(painter)
+        if detail == "Low": #Zoomed out, the node is a flat circle
+            painter.setBrush(style['flatBrush'])
+            painter.drawEllipse(-self.radius*self.scale, -self.radius*self.scale, 2*self.radius*self.scale, 2*self.radius*self.scale)
+            return
+        if self.hightlighted:
+            painter.setBrush(style['highlightBrush'])
+            painter.drawEllipse(-self.radius*self.scale, -self.radius*self.scale, 2*self.radius*self.scale, 2*self.radius*self.scale)
+
+        painter.setBrush(style['brush'])
         painter.drawEllipse(-self.radius*self.scale, -self.radius*self.scale, 2*self.radius*self.scale, 2*self.radius*self.scale)
-        QtGui.QPen(QtCore.Qt.black, 1.2, QtCore.Qt.SolidLine)
-        painter.drawEllipse((-self.radius/2)*self.scale, (-self.radius/2)*self.scale, self.radius*self.scale, self.radius*self.scale)
+        if detail == "Full": painter.drawEllipse((-self.radius/2)*self.scale, (-self.radius/2)*self.scale, self.radius*self.scale, self.radius*self.scale)
 
     def itemChange(self, change, value):
         if change == QtGui.QGraphicsItem.ItemPositionChange:
-            if self.pinTie:
-                # print "There is a tie"
-                self.pinTie().drawTie()
-            for rigCurve in self.rigCurveList:
-                rigCurve().buildCurve()
+            self.markDirty() #The pinTie and rigCurves are outputs of the node, so they are updated with it
             if self.getPin(): #Check to see if there is a pin
                 if self.getPin().getConstraintItem(): #check to see if there is a constraint Item
                     if type(self.getPin().getConstraintItem()) == ConstraintLine: # We have the special case of the ConstraintLine in place
@@ -1194,44 +1232,40 @@ class SuperNode(Node):
     accurate facial movements, especially around the lips, jaw and eyes
 
     SuperNodes can be drawn in different ways to represent different arrow type 
-    controls. Currently this is done with switch statements, but should probably be
-    upgraded to using polymorphism.
+    controls. The outline of each arrow form is listed in arrowForms, and its path is
+    built once per form and size in the shared RigShapeLibrary.
 
     """
+    #Outlines of the arrow forms, in units of scaleOffset*scale. Any other form is drawn as a Node
+    arrowForms = {"Arrow_4Point" : [(3,3), (9,3), (9,6), (15,0), (9,-6), (9,-3), (3,-3), (3,-9), (6,-9), (0,-15), (-6,-9), (-3,-9), (-3,-3),
+                                    (-9,-3), (-9,-6), (-15,0), (-9,6), (-9,3), (-3,3), (-3,9), (-6,9), (0,15), (6,9), (3,9), (3,3)],
+                  "Arrow_sidePoint" : [(3,3), (9,3), (9,6), (15,0), (9,-6), (9,-3), (3,-3), (-3,-3), (-9,-3), (-9,-6), (-15,0), (-9,6),
+                                       (-9,3), (-3,3), (3,3)],
+                  "Arrow_upDownPoint" : [(3,3), (3,-3), (3,-9), (6,-9), (0,-15), (-6,-9), (-3,-9), (-3,-3), (-3,3), (-3,9), (-6,9), (0,15),
+                                         (6,9), (3,9), (3,3)]}
+    form = None #Until the superNode has set its form, Node.__init__ builds the bounding rect of a Node
+
     def __init__(self, nPos):
         Node.__init__(self,nPos)
         self.name = "Badger"
         self.form = "Arrow_4Point" #Possibilities are arrow_4Point, arrow_sidePoint, arrow_upDownPoint  
         self.alpha = 1.0
         self.colour = QtGui.QColor(250,160,100,255*self.alpha)
-        self.path = QtGui.QPainterPath()
         self.skinningItem = None
         self.skinnedPins = []
+        self.skinArrays = None #Rest positions, skin values and pins of the skinnedPins, built when first needed
         self.initBuild()
+        self.updateBoundingRect()
 
     def initBuild(self):
         self.scaleOffset = 2
 
+    schema = RigAttributeSchema('SuperNode', [('name', 'getName', 'setName', 'str'),
+                                              ('form', 'getForm', 'setForm', 'str')] + Node.schema.attributes)
+
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        superNodeRoot = xml.Element('SuperNode')
-        attributes = xml.SubElement(superNodeRoot,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'name', value = str(self.getName()))
-        xml.SubElement(attributes, 'attribute', name = 'form', value = str(self.getForm()))
-        xml.SubElement(attributes, 'attribute', name = 'index', value = str(self.getIndex()))
-        xml.SubElement(attributes, 'attribute', name = 'radius', value = str(self.getRadius()))
-        xml.SubElement(attributes, 'attribute', name = 'scale', value = str(self.getScale()))
-        xml.SubElement(attributes, 'attribute', name = 'pinIndex', value = str(self.getPinIndex()))
-        xml.SubElement(attributes, 'attribute', name = 'pinTieIndex', value = str(self.getPinTieIndex()))
-        xml.SubElement(attributes, 'attribute', name = 'wireName', value = str(self.getWireName()))
-        xml.SubElement(attributes, 'attribute', name = 'colour', value = (str(self.getColour().red()) + "," + str(self.getColour().green()) + "," + str(self.getColour().blue())))
-        xml.SubElement(attributes, 'attribute', name = 'zValue', value = str(self.zValue()))
-        xml.SubElement(attributes, 'attribute', name = 'visible', value = str(self.isVisible()))
-        xml.SubElement(attributes, 'attribute', name = 'pos', value = (str(self.pos().x())) + "," + str(self.pos().y()))
-        if self.getBezierHandles(0) != None: xml.SubElement(attributes, 'attribute', name = 'bezierHandle0', value = (str(self.getBezierHandles(0)[0]) + "," + str(self.getBezierHandles(0)[1])))
-        else: xml.SubElement(attributes, 'attribute', name = 'bezierHandle0', value = ("None"))
-        if self.getBezierHandles(1) != None: xml.SubElement(attributes, 'attribute', name = 'bezierHandle1', value = (str(self.getBezierHandles(1)[0]) + "," + str(self.getBezierHandles(1)[1])))
-        else: xml.SubElement(attributes, 'attribute', name = 'bezierHandle1', value = ("None"))
+        superNodeRoot = self.schema.store(self)
 
         #Store Skinning Information
         skinPinsXml = xml.SubElement(superNodeRoot,'SkinningPinInfos')
@@ -1242,37 +1276,12 @@ class SuperNode(Node):
 
     def read(self, superNodeXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
-        for a in superNodeXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'index': self.setIndex(int(a.attrib['value']))
-            elif a.attrib['name'] == 'name': self.setName(str(a.attrib['value']))
-            elif a.attrib['name'] == 'form': self.setForm(str(a.attrib['value']))
-            elif a.attrib['name'] == 'radius': self.setRadius(float(a.attrib['value']))
-            elif a.attrib['name'] == 'scale': self.setScale(float(a.attrib['value']))
-            elif a.attrib['name'] == 'pinIndex': self.setPinIndex(int(a.attrib['value']))
-            elif a.attrib['name'] == 'pinTieIndex': self.setPinTieIndex(int(a.attrib['value']))
-            elif a.attrib['name'] == 'wireName': self.setWireName(str(a.attrib['value']))
-            elif a.attrib['name'] == 'zValue': self.setZValue(float(a.attrib['value']))
-            elif a.attrib['name'] == 'visible': self.setVisible(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'pos': 
-                newPos = a.attrib['value'].split(",")
-                self.setPos(float(newPos[0]), float(newPos[1]))
-            elif a.attrib['name'] == 'bezierHandle0': 
-                if a.attrib['value'] != "None":
-                    newPos = a.attrib['value'].split(",")
-                    self.setBezierHandles([float(newPos[0]), float(newPos[1])],0)
-                else: self.setBezierHandles(None,0)
-            elif a.attrib['name'] == 'bezierHandle1': 
-                if a.attrib['value'] != "None":
-                    newPos = a.attrib['value'].split(",")
-                    self.setBezierHandles([float(newPos[0]), float(newPos[1])],1)
-                else: self.setBezierHandles(None,1)
-            elif a.attrib['name'] == 'colour':
-                newColour = a.attrib['value'].split(",")
-                self.setColour(QtGui.QColor(float(newColour[0]), float(newColour[1]),float(newColour[2]))) 
+        self.schema.read(self, superNodeXml)
 
         # Read skinning information
-        self.skinnedPins = [] # Clear Out all the Skinning info ready for the new values to be read in
+        self.clearSkinnedPins() # Clear Out all the Skinning info ready for the new values to be read in
         skinnedpinsXml = superNodeXml.findall('SkinningPinInfos')
+        if not skinnedpinsXml: return
         for skinPinXml in skinnedpinsXml[0].findall('SkinningPinInfo'):
             newSkinInfo = SkinningPinInfo()
             newSkinInfo.read(skinPinXml) # Read in names of WireGroups and PinIndexes
@@ -1290,7 +1299,7 @@ class SuperNode(Node):
                 print "WARNING: SkinningInfo has failed to fine correct WireGroup"
             if newSkinInfo.getPin() == None:
                 print "WARNING: SkinningInfo has failed to fine correct Pin"
-            self.skinnedPins.append(newSkinInfo)
+            self.addSkinnedPin(newSkinInfo)
 
     def getName(self):
         return self.name
@@ -1303,10 +1312,18 @@ class SuperNode(Node):
 
     def setForm(self,form):
         self.form = str(form)
+        self.updateBoundingRect()
         self.update()
 
     def setColour(self,colour):
-        if type(colour) == QtGui.QColor: self.colour = QtGui.QColor(colour.red(), colour.green(), colour.blue(), 255*self.alpha)
+        if type(colour) == QtGui.QColor: 
+            self.colour = QtGui.QColor(colour.red(), colour.green(), colour.blue(), 255*self.alpha)
+            self.invalidateStyle()
+
+    def buildStyle(self):
+        style = Node.buildStyle(self)
+        style['arrowPen'] = QtGui.QPen(self.colour, 1, QtCore.Qt.SolidLine)
+        return style
 
     def getSkinningItem(self):
         return self.skinningItem
@@ -1319,10 +1336,57 @@ class SuperNode(Node):
     def getSkinnedPins(self):
         return self.skinnedPins
 
+    def clearSkinnedPins(self):
+        """Function to remove all the skinning Info, and disconnect it from the superNode"""
+        for skinPin in self.skinnedPins: self.removeGraphOutput(skinPin)
+        self.skinnedPins = []
+        self.invalidateSkinArrays()
+
+    def addSkinnedPin(self, skinInfo):
+        self.skinnedPins.append(skinInfo)
+        self.invalidateSkinArrays()
+
+    def invalidateSkinArrays(self):
+        """Function to flag the skinning arrays as out of date, called whenever the skinning Info changes"""
+        self.skinArrays = None
+        if self.getSkinMatrix(): self.getSkinMatrix().invalidate()
+
+    def getSkinMatrix(self):
+        """Function to return the rig wide RigSkinMatrix of the view, or None if the superNode is not in a view"""
+        if self.scene() and self.scene().views(): return self.scene().views()[0].skinMatrix
+        return None
+
+    def getSkinArrays(self):
+        """Function to return the skinning Info as contiguous arrays - rest positions (N,2), weight matrices (N,2,2) and the pins"""
+        if self.skinArrays is None:
+            skinPins = [skinPin for skinPin in self.skinnedPins if skinPin.getPin() and skinPin.getPinSkinPos() is not None]
+            restPositions = np.array([[skinPin.getPinSkinPos().x(), skinPin.getPinSkinPos().y()] for skinPin in skinPins], dtype = float).reshape(-1,2)
+            weightMatrices = np.array([skinPin.getWeightMatrix() for skinPin in skinPins], dtype = float).reshape(-1,2,2)
+            self.skinArrays = (restPositions, weightMatrices, [skinPin.getPin() for skinPin in skinPins])
+        return self.skinArrays
+
+    def evaluate(self):
+        """Function to move all of the skinned pins from the translation of the superNode
+
+        Every new pin position is calculated in one array expression and then written back to the pins.
+        In a view the pins are moved by the rig wide RigSkinMatrix instead, so that all of the superNodes
+        influencing a pin are blended together.
+        """
+        Node.evaluate(self)
+        if not self.skinnedPins or not self.getPin(): return
+        skinMatrix = self.getSkinMatrix()
+        if skinMatrix:
+            skinMatrix.markDirty() #The skin matrix is evaluated once all of the moving superNodes have been
+            return
+        restPositions, weightMatrices, pins = self.getSkinArrays()
+        translation = npVec(self.scenePos() - self.getPin().scenePos())
+        newPositions = restPositions + np.matmul(weightMatrices, translation)
+        for pin, newPos in zip(pins, newPositions): pin.setPos(newPos[0], newPos[1])
+
     def setSkinnedPins(self, nodes):
         """Function to assign skinning Info for each of the nodes to the Super Node"""
         if self.skinningItem:
-            self.skinnedPins = []
+            self.clearSkinnedPins()
             self.goHome() #Send the superNode Home to neaten everything with rest poses
             superNodePinPos = self.getPin().pos()
             skinRadius = self.skinningItem.getWidth()
@@ -1338,7 +1402,7 @@ class SuperNode(Node):
                 skinInfo.setWireGroup(node.getWireGroup())
                 # print "get skin wire Name " + str(skinInfo.getWireGroupName())
                 skinInfo.setSkinValue(skinValue)
-                self.skinnedPins.append(skinInfo)
+                self.addSkinnedPin(skinInfo)
             
             #Now that we have skinned we need to remove the skinning Item
             self.scene().removeItem(self.skinningItem)
@@ -1351,107 +1415,46 @@ class SuperNode(Node):
         """Function to centralise the node back to the pin and update any associated rigCurves and pinTies"""
         if self.pin:
             self.setPos(QtCore.QPointF(0,0))
-            if self.pinTie:
-                self.pinTie().drawTie()
-            for rigCurve in self.rigCurveList:
-                rigCurve().buildCurve()
-            for skinPin in self.skinnedPins: 
-                skinPin.goHome()
-                homeNode = skinPin.getPin().getNode()
-                if homeNode:  #Hacky way of updating the curves when the pin is sent home! Maybe wrap into a neat function
-                    for rigCurve in homeNode.rigCurveList:
-                        rigCurve().buildCurve()    
+            for skinPin in self.skinnedPins: skinPin.goHome()
+            self.markDirty() #The skinned pins are outputs of the superNode, so their nodes, ties and curves follow
         else:
             print "WARNING : NODE HAS NO ASSOCIATED PIN AND AS SUCH HAS NO HOME TO GO TO :("
 
-    def drawArrow_4Point(self, painter, option, widget):
-        pen = QtGui.QPen(self.colour, 1, QtCore.Qt.SolidLine)
-        painter.setPen(pen)
-        self.path = QtGui.QPainterPath()
-        self.path.moveTo(QtCore.QPointF(3*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(9*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(9*self.scaleOffset*self.scale,6*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(15*self.scaleOffset*self.scale,0*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(9*self.scaleOffset*self.scale,-6*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(9*self.scaleOffset*self.scale,-3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(3*self.scaleOffset*self.scale,-3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(3*self.scaleOffset*self.scale,-9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(6*self.scaleOffset*self.scale,-9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(0*self.scaleOffset*self.scale,-15*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-6*self.scaleOffset*self.scale,-9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-3*self.scaleOffset*self.scale,-9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-3*self.scaleOffset*self.scale,-3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-9*self.scaleOffset*self.scale,-3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-9*self.scaleOffset*self.scale,-6*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-15*self.scaleOffset*self.scale,0*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-9*self.scaleOffset*self.scale,6*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-9*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-3*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-3*self.scaleOffset*self.scale,9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-6*self.scaleOffset*self.scale,9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(0*self.scaleOffset*self.scale,15*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(6*self.scaleOffset*self.scale,9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(3*self.scaleOffset*self.scale,9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(3*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
-
-    def drawArrow_sidePoint(self, painter, option, widget):
-        pen = QtGui.QPen(self.colour, 1, QtCore.Qt.SolidLine)
-        painter.setPen(pen)
-        self.path = QtGui.QPainterPath()
-        self.path.moveTo(QtCore.QPointF(3*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(9*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(9*self.scaleOffset*self.scale,6*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(15*self.scaleOffset*self.scale,0*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(9*self.scaleOffset*self.scale,-6*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(9*self.scaleOffset*self.scale,-3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(3*self.scaleOffset*self.scale,-3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-3*self.scaleOffset*self.scale,-3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-9*self.scaleOffset*self.scale,-3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-9*self.scaleOffset*self.scale,-6*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-15*self.scaleOffset*self.scale,0*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-9*self.scaleOffset*self.scale,6*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-9*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-3*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(3*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
-
-    def drawArrow_upDownPoint(self, painter, option, widget):
-        pen = QtGui.QPen(self.colour, 1, QtCore.Qt.SolidLine)
-        painter.setPen(pen)
-        self.path = QtGui.QPainterPath()
-        self.path.moveTo(QtCore.QPointF(3*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
-
-        self.path.lineTo(QtCore.QPointF(3*self.scaleOffset*self.scale,-3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(3*self.scaleOffset*self.scale,-9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(6*self.scaleOffset*self.scale,-9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(0*self.scaleOffset*self.scale,-15*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-6*self.scaleOffset*self.scale,-9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-3*self.scaleOffset*self.scale,-9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-3*self.scaleOffset*self.scale,-3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-3*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-3*self.scaleOffset*self.scale,9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(-6*self.scaleOffset*self.scale,9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(0*self.scaleOffset*self.scale,15*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(6*self.scaleOffset*self.scale,9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(3*self.scaleOffset*self.scale,9*self.scaleOffset*self.scale))
-        self.path.lineTo(QtCore.QPointF(3*self.scaleOffset*self.scale,3*self.scaleOffset*self.scale))
+    def buildArrowPath(self):
+        """Function to build the outline of the arrow form of the superNode, at its current size"""
+        size = self.scaleOffset*self.scale
+        points = self.arrowForms[self.form]
+        path = QtGui.QPainterPath()
+        path.moveTo(QtCore.QPointF(points[0][0]*size, points[0][1]*size))
+        for x, y in points[1:]: path.lineTo(QtCore.QPointF(x*size, y*size))
+        return path
+
+    def getArrowPath(self):
+        """Function to return the shared outline of the superNode's arrow form, or None if it is drawn as a Node"""
+        if self.form not in self.arrowForms: return None
+        return rigShapeLibrary.getShape(("SuperNode", self.form, self.scaleOffset*self.scale), self.buildArrowPath)
+
+    def updateBoundingRect(self):
+        """Function to pick up the arrow path for the form and scale, and recalculate the cached bounding rect from it"""
+        self.path = self.getArrowPath()
+        if self.path is None: return Node.updateBoundingRect(self)
+        self.prepareGeometryChange()
+        self.boundRect = self.path.boundingRect().adjusted(-1, -1, 1, 1) #Allow for the width of the pen
+        updateSceneIndex(self)
 
-    def boundingRect(self):
-        return self.path.boundingRect()
+    def shape(self):
+        if self.path is None: return Node.shape(self)
+        return self.path
 
     def paint(self, painter, option, widget):
-        if self.form == "Arrow_4Point": self.drawArrow_4Point(painter, option, widget)
-        elif self.form == "Arrow_sidePoint": self.drawArrow_sidePoint(painter, option, widget)
-        elif self.form == "Arrow_upDownPoint": self.drawArrow_upDownPoint(painter, option, widget)
-        else: return Node.paint(self, painter, option, widget)
-        painter.strokePath(self.path, painter.pen())
+        if self.getDetailLevel(painter) == "Low": return Node.paint(self, painter, option, widget) #Zoomed out, all forms are drawn as a flat circle
+        if self.path is None: return Node.paint(self, painter, option, widget)
+        pen = self.getStyle()['arrowPen']
+        painter.setPen(pen)
+        painter.strokePath(self.path, pen)
 
     def itemChange(self, change, value):
-        if change == QtGui.QGraphicsItem.ItemPositionChange:
-            for skinPin in self.skinnedPins: 
-                skinPin.update() #Update the pin positions of the skinned Nodes
-                skinPin.getPin().itemChange(change, value)
-
-        elif change == QtGui.QGraphicsItem.ItemSelectedChange:
+        if change == QtGui.QGraphicsItem.ItemSelectedChange:
             if value.toBool():
                 self.scene().views()[0].populateSkinningTable(self)
                 # self.scene().views()[0].skinTableWidget.populate(self)
@@ -1462,7 +1465,7 @@ class SuperNode(Node):
 ############################################CONSTRAINT ITEMS###############################################################################
 
 #RESTRICTION ITEMS
-class OpsRotation(QtGui.QGraphicsItem):
+class OpsRotation(QtGui.QGraphicsItem, RigStyledItem):
     """This is the small red curve with two arrows serving as rotation control
 
     This item is used to control the rotation of constraintItems
@@ -1481,80 +1484,84 @@ class OpsRotation(QtGui.QGraphicsItem):
         self.alpha = 1.0
         self.length = 1.0
         self.constraintItem = constraintItem
+        self.initStyle()
+        self.updateBoundingRect()
         self.setZValue(2)
 
+    schema = RigAttributeSchema('OpsRot', [('scale', 'getScale', 'setScale', 'float'),
+                                           ('alpha', 'getAlpha', 'setAlpha', 'float'),
+                                           ('length', 'getLength', 'setLength', 'float'),
+                                           ('zValue', 'zValue', 'setZValue', 'float'),
+                                           ('visible', 'isVisible', 'setVisible', 'bool'),
+                                           ('pos', 'pos', 'setPos', 'point')])
+
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        OpsRotXml = xml.Element('OpsRot')
-        attributes = xml.SubElement(OpsRotXml,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'scale', value = str(self.getScale()))
-        xml.SubElement(attributes, 'attribute', name = 'alpha', value = str(self.getAlpha()))
-        xml.SubElement(attributes, 'attribute', name = 'length', value = str(self.getLength()))
-        xml.SubElement(attributes, 'attribute', name = 'zValue', value = str(self.zValue()))
-        xml.SubElement(attributes, 'attribute', name = 'visible', value = str(self.isVisible()))
-        xml.SubElement(attributes, 'attribute', name = 'pos', value = (str(self.pos().x())) + "," + str(self.pos().y()))
+        OpsRotXml = self.schema.store(self)
         return OpsRotXml
 
     def read(self, OpsRotXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
-        for a in OpsRotXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'scale': self.setScale(float(a.attrib['value']))
-            elif a.attrib['name'] == 'alpha': self.setAlpha(float(a.attrib['value']))
-            elif a.attrib['name'] == 'length': self.setLength(float(a.attrib['value']))
-            elif a.attrib['name'] == 'zValue': self.setZValue(float(a.attrib['value']))
-            elif a.attrib['name'] == 'visible': self.setVisible(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'pos': 
-                newPos = a.attrib['value'].split(",")
-                self.setPos(float(newPos[0]), float(newPos[1]))
+        self.schema.read(self, OpsRotXml)
 
     def getScale(self):
         return self.scale
 
     def setScale(self, scale):
         self.scale = scale
+        self.invalidateStyle()
+        self.updateBoundingRect()
 
     def getLength(self):
         return self.length
 
     def setLength(self,length):
         self.length = length
+        self.invalidateStyle()
+        self.updateBoundingRect()
 
     def getAlpha(self):
         return self.alpha
 
     def setAlpha(self, alpha):
         self.alpha = float(alpha)
+        self.invalidateStyle()
 
-    def boundingRect(self):
+    def updateBoundingRect(self):
+        """Function to recalculate the cached bounding rect, called by the setters that change the size of the item"""
+        self.prepareGeometryChange()
         adjust = 0
-        return QtCore.QRectF(self.scale*self.length*(-10 - adjust), self.scale*self.length*(-5 - adjust),
-                             self.scale*self.length*(20 + 2*adjust), self.scale*self.length*(10 + 2*adjust))       
+        self.boundRect = QtCore.QRectF(self.scale*self.length*(-10 - adjust), self.scale*self.length*(-5 - adjust),
+                                       self.scale*self.length*(20 + 2*adjust), self.scale*self.length*(10 + 2*adjust))
 
-    def paint(self, painter, option, widget):
-        self.prepareGeometryChange()
-        wCurve1 = QtGui.QPainterPath()
+    def boundingRect(self):
+        return self.boundRect
+
+    def styleKey(self):
+        return ("OpsRotation", self.alpha, self.scale, self.length)
 
+    def buildStyle(self):
+        """Function to build the pen, and the path of the curve and its two arrow heads"""
         locAx = -7.8 * self.scale*self.length
         locAy = -2 * self.scale*self.length
 
         locBx = -4 * self.scale*self.length
         locBy = 0 * self.scale*self.length
 
-        pen = QtGui.QPen(QtGui.QColor(255,20,0,255*self.alpha), 0.5, QtCore.Qt.SolidLine)
-        painter.setPen(pen)
-
         wCurve1 = QtGui.QPainterPath()
         wCurve1.moveTo(QtCore.QPointF(locAx,-locAy))
         wCurve1.cubicTo(QtCore.QPointF(locBx,-locBy),QtCore.QPointF(-locBx,-locBy),QtCore.QPointF(-locAx,-locAy))
-        painter.strokePath(wCurve1, painter.pen())
-        
-        pen = QtGui.QPen(QtGui.QColor(255,20,0,255*self.alpha), 0.5, QtCore.Qt.SolidLine)
-        painter.setPen(pen)
-        painter.drawLine(locAx-0.5,-locAy,locAx+2,-locAy+1)
-        painter.drawLine(locAx-0.5,-locAy,locAx+1,-locAy-2)
+        for start, end in (((locAx-0.5,-locAy),(locAx+2,-locAy+1)), ((locAx-0.5,-locAy),(locAx+1,-locAy-2)),
+                           ((-locAx+0.5,-locAy),(-locAx-2,-locAy+1)), ((-locAx+0.5,-locAy),(-locAx-1,-locAy-2))):
+            wCurve1.moveTo(QtCore.QPointF(*start))
+            wCurve1.lineTo(QtCore.QPointF(*end))
+        return {'pen' : QtGui.QPen(QtGui.QColor(255,20,0,255*self.alpha), 0.5, QtCore.Qt.SolidLine), 'path' : wCurve1}
 
-        painter.drawLine(-locAx+0.5,-locAy,-locAx-2,-locAy+1)
-        painter.drawLine(-locAx+0.5,-locAy,-locAx-1,-locAy-2)
+    def paint(self, painter, option, widget):
+        if self.getDetailLevel(painter) == "Low": return #Zoomed out, the handle is too small to use, so it is not drawn
+        style = self.getStyle()
+        painter.setPen(style['pen'])
+        painter.strokePath(style['path'], style['pen'])
 
     def mousePressEvent(self, event):
         if self.parentItem().getNode(): self.parentItem().getNode().goHome() #If we are adjusting the constraint area, then first send the node home
@@ -1570,7 +1577,7 @@ class OpsRotation(QtGui.QGraphicsItem):
         # QtGui.QGraphicsItem.mouseMoveEvent(self, event)
 
 
-class OpsCross(QtGui.QGraphicsItem):
+class OpsCross(QtGui.QGraphicsItem, RigStyledItem):
     """This is a small red cross that is used to visually define the dimensions of shapes
 
     It is used to control the shapes and line lengths of constraintItems and SkinningItems
@@ -1590,6 +1597,8 @@ class OpsCross(QtGui.QGraphicsItem):
         self.sliderLimit = 0
         self.index = 0
         self.constraintItem = constraintItem
+        self.initStyle()
+        self.updateBoundingRect()
         self.setZValue(2)
 
         self.setFlag(QtGui.QGraphicsItem.ItemIsMovable,True)
@@ -1597,33 +1606,23 @@ class OpsCross(QtGui.QGraphicsItem):
         self.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,True)
 
 
+    schema = RigAttributeSchema('OpsCross', [('scale', 'getScale', 'setScale', 'float'),
+                                             ('alpha', 'getAlpha', 'setAlpha', 'float'),
+                                             ('length', 'getLength', 'setLength', 'float'),
+                                             ('slider', 'isSlider', 'setSlider', 'bool'),
+                                             ('sliderLimit', 'getSliderLimit', 'setSliderLimit', 'float'),
+                                             ('zValue', 'zValue', 'setZValue', 'float'),
+                                             ('visible', 'isVisible', 'setVisible', 'bool'),
+                                             ('pos', 'pos', 'setPos', 'point')])
+
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        OpsCrossXml = xml.Element('OpsCross')
-        attributes = xml.SubElement(OpsCrossXml,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'scale', value = str(self.getScale()))
-        xml.SubElement(attributes, 'attribute', name = 'alpha', value = str(self.getAlpha()))
-        xml.SubElement(attributes, 'attribute', name = 'length', value = str(self.getLength()))
-        xml.SubElement(attributes, 'attribute', name = 'slider', value = str(self.isSlider()))
-        xml.SubElement(attributes, 'attribute', name = 'sliderLimit', value = str(self.getSliderLimit()))
-        xml.SubElement(attributes, 'attribute', name = 'zValue', value = str(self.zValue()))
-        xml.SubElement(attributes, 'attribute', name = 'visible', value = str(self.isVisible()))
-        xml.SubElement(attributes, 'attribute', name = 'pos', value = (str(self.pos().x())) + "," + str(self.pos().y()))
+        OpsCrossXml = self.schema.store(self)
         return OpsCrossXml
 
     def read(self, OpsCrossXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
-        for a in OpsCrossXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'scale': self.setScale(float(a.attrib['value']))
-            elif a.attrib['name'] == 'alpha': self.setAlpha(float(a.attrib['value']))
-            elif a.attrib['name'] == 'length': self.setLength(float(a.attrib['value']))
-            elif a.attrib['name'] == 'slider': self.setSlider(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'sliderLimit': self.setSliderLimit(float(a.attrib['value']))
-            elif a.attrib['name'] == 'zValue': self.setZValue(float(a.attrib['value']))
-            elif a.attrib['name'] == 'visible': self.setVisible(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'pos': 
-                newPos = a.attrib['value'].split(",")
-                self.setPos(float(newPos[0]), float(newPos[1]))
+        self.schema.read(self, OpsCrossXml)
 
 
     def getScale(self):
@@ -1631,12 +1630,14 @@ class OpsCross(QtGui.QGraphicsItem):
 
     def setScale(self, scale):
         self.scale = scale
+        self.updateBoundingRect()
 
     def getLength(self):
         return self.length
 
     def setLength(self,length):
         self.length = length
+        self.updateBoundingRect()
 
     def isSlider(self):
         return self.slider
@@ -1661,19 +1662,32 @@ class OpsCross(QtGui.QGraphicsItem):
 
     def setAlpha(self, alpha):
         self.alpha = float(alpha)
+        self.invalidateStyle()
 
-    def boundingRect(self):
+    def updateBoundingRect(self):
+        """Function to recalculate the cached bounding rect, called by the setters that change the size of the item"""
+        self.prepareGeometryChange()
         adjust = 1
-        return QtCore.QRectF(self.scale*(-self.length - adjust), self.scale*(-self.length - adjust),
-                             self.scale*(2*self.length + 2*adjust), self.scale*(2*self.length + 2*adjust))        
+        self.boundRect = QtCore.QRectF(self.scale*(-self.length - adjust), self.scale*(-self.length - adjust),
+                                       self.scale*(2*self.length + 2*adjust), self.scale*(2*self.length + 2*adjust))
+
+    def boundingRect(self):
+        return self.boundRect
+
+    def styleKey(self):
+        return ("OpsCross", self.alpha)
+
+    def buildStyle(self):
+        return {'pen' : QtGui.QPen(QtGui.QColor(255,0,0,200*self.alpha), 0.5, QtCore.Qt.SolidLine), 
+                'brush' : QtGui.QBrush(QtGui.QColor(255,20,0,25*self.alpha))}
 
     def paint(self, painter, option, widget):
-        self.prepareGeometryChange()
-        pen = QtGui.QPen(QtGui.QColor(255,0,0,200*self.alpha), 0.5, QtCore.Qt.SolidLine)
-        painter.setPen(pen)
+        if self.getDetailLevel(painter) == "Low": return #Zoomed out, the handle is too small to use, so it is not drawn
+        style = self.getStyle()
+        painter.setPen(style['pen'])
         painter.drawLine(self.scale*-self.length,0,self.scale*self.length,0)
         painter.drawLine(0,self.scale*self.length,0,self.scale*-self.length)
-        painter.setBrush(QtGui.QBrush(QtGui.QColor(255,20,0,25*self.alpha))) #shade in the circle
+        painter.setBrush(style['brush']) #shade in the circle
         # painter.drawRect(self.boundingRect())
 
     def mousePressEvent(self, event):
@@ -1688,7 +1702,6 @@ class OpsCross(QtGui.QGraphicsItem):
             pass
         else:
             if self.parentItem():
-                self.prepareGeometryChange()
                 self.constraintItem.redraw(self.pos())
                 self.update()
         QtGui.QGraphicsItem.mouseMoveEvent(self, event)
@@ -1722,7 +1735,7 @@ class OpsCross(QtGui.QGraphicsItem):
         else: return QtGui.QGraphicsItem.itemChange(self, change, value)
 
 
-class ConstraintEllipse(QtGui.QGraphicsEllipseItem):
+class ConstraintEllipse(QtGui.QGraphicsEllipseItem, RigGraphNode, RigStyledItem):
     """This is used to constrain the movement of a node or superNode to within the Ellipse Shape
 
     An OpsCross and OpsRotation item is used to define its shape and rotation.
@@ -1746,6 +1759,10 @@ class ConstraintEllipse(QtGui.QGraphicsEllipseItem):
         self.ghostArea = False
         self.extension = 15.0
         QtGui.QGraphicsEllipseItem.__init__(self, -self.width, -self.height, 2*self.width, 2*self.height) 
+        self.initGraph()
+        self.initStyle()
+        self.updateBoundingRect()
+        self.invalidateStyle()
         self.opX = None
         self.opRot = None
         self.pin = None
@@ -1768,19 +1785,19 @@ class ConstraintEllipse(QtGui.QGraphicsEllipseItem):
         self.opRot.setParentItem(self)
         self.opRot.setPos(QtCore.QPointF(0,-self.height-self.extension-9))
 
+    schema = RigAttributeSchema('ConstraintEllipse', [('scale', 'getScale', 'setScale', 'float'),
+                                                      ('alpha', 'getAlpha', 'setAlpha', 'float'),
+                                                      ('height', 'getHeight', 'setHeight', 'float'),
+                                                      ('width', 'getWidth', 'setWidth', 'float'),
+                                                      ('ghostArea', 'isGhostArea', 'setGhostArea', 'bool'),
+                                                      ('extension', 'getExtension', 'setExtension', 'float'),
+                                                      ('zValue', 'zValue', 'setZValue', 'float'),
+                                                      ('visible', 'isVisible', 'setVisible', 'bool'),
+                                                      ('pos', 'pos', 'setPos', 'point')], late = ['ghostArea', 'visible'])
+
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        ConstraintEllipseXml = xml.Element('ConstraintEllipse')
-        attributes = xml.SubElement(ConstraintEllipseXml,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'scale', value = str(self.getScale()))
-        xml.SubElement(attributes, 'attribute', name = 'alpha', value = str(self.getAlpha()))
-        xml.SubElement(attributes, 'attribute', name = 'height', value = str(self.getHeight()))
-        xml.SubElement(attributes, 'attribute', name = 'width', value = str(self.getWidth()))
-        xml.SubElement(attributes, 'attribute', name = 'ghostArea', value = str(self.isGhostArea()))
-        xml.SubElement(attributes, 'attribute', name = 'extension', value = str(self.getExtension()))
-        xml.SubElement(attributes, 'attribute', name = 'zValue', value = str(self.zValue()))
-        xml.SubElement(attributes, 'attribute', name = 'visible', value = str(self.isVisible()))
-        xml.SubElement(attributes, 'attribute', name = 'pos', value = (str(self.pos().x())) + "," + str(self.pos().y()))
+        ConstraintEllipseXml = self.schema.store(self)
         
         #Now record the xml for the OpCross
         OpsItemsXml = xml.SubElement(ConstraintEllipseXml,'OpsItems')
@@ -1792,16 +1809,7 @@ class ConstraintEllipse(QtGui.QGraphicsEllipseItem):
 
     def read(self, ConstraintEllipseXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
-        for a in ConstraintEllipseXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'scale': self.setScale(float(a.attrib['value']))
-            elif a.attrib['name'] == 'alpha': self.setAlpha(float(a.attrib['value']))
-            elif a.attrib['name'] == 'height': self.setHeight(float(a.attrib['value']))
-            elif a.attrib['name'] == 'width': self.setWidth(float(a.attrib['value']))
-            elif a.attrib['name'] == 'extension': self.setExtension(float(a.attrib['value']))
-            elif a.attrib['name'] == 'zValue': self.setZValue(float(a.attrib['value']))
-            elif a.attrib['name'] == 'pos': 
-                newPos = a.attrib['value'].split(",")
-                self.setPos(float(newPos[0]), float(newPos[1]))
+        self.schema.read(self, ConstraintEllipseXml)
 
         #The Ops Cross and OpsRot are created, so hunt through the XML and make sure all their attributes are loaded in
         OpsItemsXml = ConstraintEllipseXml.findall('OpsItems')
@@ -1811,9 +1819,7 @@ class ConstraintEllipse(QtGui.QGraphicsEllipseItem):
         self.redraw(self.opX.pos())
         self.lock()
 
-        for a in ConstraintEllipseXml.findall( 'attributes/attribute'): #Finsh by setting and ghost visibility states
-            if a.attrib['name'] == 'ghostArea': self.setGhostArea(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'visible': self.setVisible(str(a.attrib['value']) == 'True')
+        self.schema.readLate(self, ConstraintEllipseXml) #Finish by setting the ghost and visibility states
         self.update()
 
     def getScale(self):
@@ -1821,30 +1827,35 @@ class ConstraintEllipse(QtGui.QGraphicsEllipseItem):
 
     def setScale(self, scale):
         self.scale = scale
+        self.updateBoundingRect()
 
     def getWidth(self):
         return self.width
 
     def setWidth(self, width):
         self.width = width
+        self.updateBoundingRect()
 
     def getHeight(self):
         return self.height
 
     def setHeight(self,height):
         self.height = height
+        self.updateBoundingRect()
 
     def getExtension(self):
         return self.extension
 
     def setExtension(self,extension):
         self.extension = extension
+        self.updateBoundingRect()
 
     def getAlpha(self):
         return self.alpha
 
     def setAlpha(self, alpha):
         self.alpha = float(alpha)
+        self.invalidateStyle()
         self.opX.setAlpha(float(alpha))
         self.opRot.setAlpha(float(alpha))
 
@@ -1853,6 +1864,7 @@ class ConstraintEllipse(QtGui.QGraphicsEllipseItem):
 
     def setGhostArea(self, ghost):
         self.ghostArea = bool(ghost)
+        self.invalidateStyle()
         self.opX.setVisible(not bool(ghost))
         self.opRot.setVisible(not bool(ghost))
 
@@ -1870,6 +1882,7 @@ class ConstraintEllipse(QtGui.QGraphicsEllipseItem):
             self.pin = pin
             self.setPinIndex(pin.getIndex())
             self.setParentItem(pin)
+            registerSceneItem(self)
         else: 
             print "WARNING : INVALID OBJECT WAS PASSED TO NODE FOR PIN ALLOCATION"
 
@@ -1895,26 +1908,37 @@ class ConstraintEllipse(QtGui.QGraphicsEllipseItem):
         self.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,False)  
         self.opX.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,False) 
 
-    def boundingRect(self):
+    def updateBoundingRect(self):
+        """Function to recalculate the cached bounding rect, called by the setters that change the size of the item"""
+        self.prepareGeometryChange()
         adjust = 2
-        return QtCore.QRectF(self.scale*(-self.width - adjust), self.scale*(-self.height - adjust - self.extension-3),
-                             self.scale*(2*self.width + 2*adjust), self.scale*(2*self.height + adjust + 2*self.extension + 5))
+        self.boundRect = QtCore.QRectF(self.scale*(-self.width - adjust), self.scale*(-self.height - adjust - self.extension-3),
+                                       self.scale*(2*self.width + 2*adjust), self.scale*(2*self.height + adjust + 2*self.extension + 5))
+
+    def boundingRect(self):
+        return self.boundRect
+
+    def styleKey(self):
+        return ("ConstraintEllipse", self.alpha, self.ghostArea)
+
+    def buildStyle(self):
+        if self.ghostArea: style = {'pen' : QtGui.QPen(QtCore.Qt.NoPen), 'brush' : QtGui.QBrush(QtGui.QColor(255,20,0,15*self.alpha))}
+        else: style = {'pen' : QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine), 'brush' : QtGui.QBrush(QtGui.QColor(255,20,0,25*self.alpha))}
+        style['linePen'] = QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine)
+        return style
+
+    def invalidateStyle(self):
+        """The ellipse is drawn with its own pen and brush, so they are set here rather than in paint()"""
+        RigStyledItem.invalidateStyle(self)
+        style = self.getStyle()
+        self.setPen(style['pen'])
+        self.setBrush(style['brush'])
 
     def paint(self, painter, option, widget):
-        self.prepareGeometryChange()
-        self.setBrush(QtGui.QBrush(QtGui.QColor(255,20,0,25*self.alpha))) #shade in the circle
-        pen = QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine)
-        if not self.ghostArea: self.setPen(pen)
-        else: 
-            self.setPen(QtGui.QPen(QtCore.Qt.NoPen))
-            self.setBrush(QtGui.QBrush(QtGui.QColor(255,20,0,15*self.alpha))) #shade in the circle
         QtGui.QGraphicsEllipseItem.paint(self, painter, option, widget)
-        if not self.ghostArea:
-            pen = QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine)
-            painter.setPen(pen)
+        if not self.ghostArea and self.getDetailLevel(painter) != "Low": #Zoomed out, only the area is drawn
+            painter.setPen(self.getStyle()['linePen'])
             painter.drawLine(0,self.scale*self.height - 2,0,self.scale*-self.height-self.extension) 
-            pen = QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine)
-            painter.setPen(pen)
             if self.width > 5:
                 painter.drawLine(-5,-(self.scale*self.height+self.extension-5),0,-(self.scale*self.height+self.extension))     
                 painter.drawLine(5,-(self.scale*self.height+self.extension-5),0,-(self.scale*self.height+self.extension))
@@ -1927,6 +1951,7 @@ class ConstraintEllipse(QtGui.QGraphicsEllipseItem):
     def redraw(self, dimPos):
         self.width = abs(dimPos.x())
         self.height = abs(dimPos.y())
+        self.updateBoundingRect()
         self.setRect(self.scale*(-self.width), self.scale*(-self.height),
                              self.scale*(2*self.width), self.scale*(2*self.height)) 
         self.opRot.setPos(QtCore.QPointF(0,-self.height-self.extension-5))
@@ -1976,6 +2001,7 @@ class ConstraintEllipse(QtGui.QGraphicsEllipseItem):
     def doTransform(self, theta_deg, arrow_x, arrow_y):
         if self.getPin():
             self.getPin().setRotation(theta_deg)
+            self.markDirty() #Rotating the pin moves the node, so update everything the constraint drives
 
     def mouseMoveEvent(self, mouseEvent):
         if self.pin == None: return QtGui.QGraphicsEllipseItem.mouseMoveEvent(self, mouseEvent) #If there is no pin we are free to move, else we are locked to a pin
@@ -1986,7 +2012,7 @@ class ConstraintEllipse(QtGui.QGraphicsEllipseItem):
             return QtGui.QGraphicsItem.mouseMoveEvent(self.node, mouseEvent)
 
 
-class ConstraintRect(QtGui.QGraphicsRectItem):
+class ConstraintRect(QtGui.QGraphicsRectItem, RigGraphNode, RigStyledItem):
     """This is used to constrain the movement of a node or superNode to within the Rectangle Shape
 
     An OpsCross and OpsRotation item is used to define its shape and rotation.
@@ -2010,6 +2036,10 @@ class ConstraintRect(QtGui.QGraphicsRectItem):
         self.ghostArea = False
         self.extension = 15.0
         QtGui.QGraphicsRectItem.__init__(self, -self.width , -self.height, 2*self.width, 2*self.height) 
+        self.initGraph()
+        self.initStyle()
+        self.updateBoundingRect()
+        self.invalidateStyle()
         self.setFlag(QtGui.QGraphicsItem.ItemIsMovable,True)
         self.setFlag(QtGui.QGraphicsItem.ItemSendsGeometryChanges,True)
         self.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,True)
@@ -2031,19 +2061,11 @@ class ConstraintRect(QtGui.QGraphicsRectItem):
         self.opRot.setParentItem(self)
         self.opRot.setPos(QtCore.QPointF(0,-self.height-self.extension-5))
 
+    schema = RigAttributeSchema('ConstraintRect', ConstraintEllipse.schema.attributes, late = ['ghostArea', 'visible'])
+
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        ConstraintRectXml = xml.Element('ConstraintRect')
-        attributes = xml.SubElement(ConstraintRectXml,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'scale', value = str(self.getScale()))
-        xml.SubElement(attributes, 'attribute', name = 'alpha', value = str(self.getAlpha()))
-        xml.SubElement(attributes, 'attribute', name = 'height', value = str(self.getHeight()))
-        xml.SubElement(attributes, 'attribute', name = 'width', value = str(self.getWidth()))
-        xml.SubElement(attributes, 'attribute', name = 'ghostArea', value = str(self.isGhostArea()))
-        xml.SubElement(attributes, 'attribute', name = 'extension', value = str(self.getExtension()))
-        xml.SubElement(attributes, 'attribute', name = 'zValue', value = str(self.zValue()))
-        xml.SubElement(attributes, 'attribute', name = 'visible', value = str(self.isVisible()))
-        xml.SubElement(attributes, 'attribute', name = 'pos', value = (str(self.pos().x())) + "," + str(self.pos().y()))
+        ConstraintRectXml = self.schema.store(self)
         
         #Now record the xml for the OpCross
         OpsItemsXml = xml.SubElement(ConstraintRectXml,'OpsItems')
@@ -2055,17 +2077,9 @@ class ConstraintRect(QtGui.QGraphicsRectItem):
 
     def read(self, ConstraintRectXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
-        for a in ConstraintRectXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'scale': self.setScale(float(a.attrib['value']))
-            elif a.attrib['name'] == 'alpha': self.setAlpha(float(a.attrib['value']))
-            elif a.attrib['name'] == 'height': self.setHeight(float(a.attrib['value']))
-            elif a.attrib['name'] == 'width': self.setWidth(float(a.attrib['value']))
-            elif a.attrib['name'] == 'extension': self.setExtension(float(a.attrib['value']))
-            elif a.attrib['name'] == 'zValue': self.setZValue(float(a.attrib['value']))
-            elif a.attrib['name'] == 'pos': 
-                newPos = a.attrib['value'].split(",")
-                self.setPos(float(newPos[0]), float(newPos[1]))
-            #The Ops Cross and OpsRot are created, so hunt through the XML and make sure all their attributes are loaded in
+        self.schema.read(self, ConstraintRectXml)
+
+        #The Ops Cross and OpsRot are created, so hunt through the XML and make sure all their attributes are loaded in
         OpsItemsXml = ConstraintRectXml.findall('OpsItems')
         for itemXml in OpsItemsXml[0]: #This should only find One OpsCross
             if itemXml.tag == "OpsCross": self.opX.read(itemXml)
@@ -2073,9 +2087,7 @@ class ConstraintRect(QtGui.QGraphicsRectItem):
         self.redraw(self.opX.pos())
         self.lock()
 
-        for a in ConstraintRectXml.findall( 'attributes/attribute'): #Finsh by setting and ghost visibility states
-            if a.attrib['name'] == 'ghostArea': self.setGhostArea(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'visible': self.setVisible(str(a.attrib['value']) == 'True')
+        self.schema.readLate(self, ConstraintRectXml) #Finish by setting the ghost and visibility states
         self.update()
 
     def getScale(self):
@@ -2083,30 +2095,35 @@ class ConstraintRect(QtGui.QGraphicsRectItem):
 
     def setScale(self, scale):
         self.scale = scale
+        self.updateBoundingRect()
 
     def getWidth(self):
         return self.width
 
     def setWidth(self, width):
         self.width = width
+        self.updateBoundingRect()
 
     def getHeight(self):
         return self.height
 
     def setHeight(self,height):
         self.height = height
+        self.updateBoundingRect()
 
     def getExtension(self):
         return self.extension
 
     def setExtension(self,extension):
         self.extension = extension
+        self.updateBoundingRect()
 
     def getAlpha(self):
         return self.alpha
 
     def setAlpha(self, alpha):
         self.alpha = float(alpha)
+        self.invalidateStyle()
         self.opX.setAlpha(float(alpha))
         self.opRot.setAlpha(float(alpha))
 
@@ -2115,6 +2132,7 @@ class ConstraintRect(QtGui.QGraphicsRectItem):
 
     def setGhostArea(self, ghost):
         self.ghostArea = bool(ghost)
+        self.invalidateStyle()
         self.opX.setVisible(not bool(ghost))
         self.opRot.setVisible(not bool(ghost))
 
@@ -2132,6 +2150,7 @@ class ConstraintRect(QtGui.QGraphicsRectItem):
             self.pin = pin
             self.setPinIndex(pin.getIndex())
             self.setParentItem(pin)
+            registerSceneItem(self)
         else: 
             print "WARNING : INVALID OBJECT WAS PASSED TO NODE FOR PIN ALLOCATION"
 
@@ -2157,25 +2176,38 @@ class ConstraintRect(QtGui.QGraphicsRectItem):
         self.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,False)  
         self.opX.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,False) 
 
-    def boundingRect(self):
+    def updateBoundingRect(self):
+        """Function to recalculate the cached bounding rect, called by the setters that change the size of the item"""
+        self.prepareGeometryChange()
         adjust = 2
-        return QtCore.QRectF(self.scale*(-self.width - adjust), self.scale*(-self.height - adjust - self.extension),
-                             self.scale*(2*self.width + 2*adjust), self.scale*(2*self.height + 2*adjust + 2*self.extension))
+        self.boundRect = QtCore.QRectF(self.scale*(-self.width - adjust), self.scale*(-self.height - adjust - self.extension),
+                                       self.scale*(2*self.width + 2*adjust), self.scale*(2*self.height + 2*adjust + 2*self.extension))
+
+    def boundingRect(self):
+        return self.boundRect
+
+    def styleKey(self):
+        return ("ConstraintRect", self.alpha, self.ghostArea)
+
+    def buildStyle(self):
+        if self.ghostArea: style = {'pen' : QtGui.QPen(QtCore.Qt.NoPen), 'brush' : QtGui.QBrush(QtGui.QColor(255,20,0,15*self.alpha))}
+        else: style = {'pen' : QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine), 'brush' : QtGui.QBrush(QtGui.QColor(255,20,0,25*self.alpha))}
+        style['linePen'] = QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine)
+        return style
+
+    def invalidateStyle(self):
+        """The rectangle is drawn with its own pen and brush, so they are set here rather than in paint()"""
+        RigStyledItem.invalidateStyle(self)
+        style = self.getStyle()
+        self.setPen(style['pen'])
+        self.setBrush(style['brush'])
 
     def paint(self, painter, option, widget):
-        self.prepareGeometryChange()
-        pen = QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine)
-        self.setBrush(QtGui.QBrush(QtGui.QColor(255,20,0,25*self.alpha))) #shade in the rect
-        if not self.ghostArea: self.setPen(pen)
-        else: 
-            self.setPen(QtGui.QPen(QtCore.Qt.NoPen))
-            self.setBrush(QtGui.QBrush(QtGui.QColor(255,20,0,15*self.alpha))) #shade in the rect
         QtGui.QGraphicsRectItem.paint(self, painter, option, widget)
 
-        if not self.ghostArea:
+        if not self.ghostArea and self.getDetailLevel(painter) != "Low": #Zoomed out, only the area is drawn
+            painter.setPen(self.getStyle()['linePen'])
             painter.drawLine(0,self.scale*self.height - 2,0,self.scale*-self.height-self.extension)  
-            pen = QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine)
-            painter.setPen(pen)
             if self.width > 5:
                 painter.drawLine(-5,-(self.scale*self.height+self.extension-5),0,-(self.scale*self.height+self.extension))     
                 painter.drawLine(5,-(self.scale*self.height+self.extension-5),0,-(self.scale*self.height+self.extension))
@@ -2189,6 +2221,7 @@ class ConstraintRect(QtGui.QGraphicsRectItem):
     def redraw(self, dimPos):
         self.width = abs(dimPos.x())
         self.height = abs(dimPos.y())
+        self.updateBoundingRect()
         self.setRect(self.scale*(-self.width), self.scale*(-self.height),
                              self.scale*(2*self.width), self.scale*(2*self.height))  
         self.opRot.setPos(QtCore.QPointF(0,-self.height-self.extension-5))
@@ -2238,6 +2271,7 @@ class ConstraintRect(QtGui.QGraphicsRectItem):
     def doTransform(self, theta_deg, arrow_x, arrow_y):
         if self.getPin():
             self.getPin().setRotation(theta_deg)
+            self.markDirty() #Rotating the pin moves the node, so update everything the constraint drives
 
     def mouseMoveEvent(self, mouseEvent):
         if self.pin == None: return QtGui.QGraphicsEllipseItem.mouseMoveEvent(self, mouseEvent) #If there is no pin we are free to move, else we are locked to a pin
@@ -2247,7 +2281,7 @@ class ConstraintRect(QtGui.QGraphicsRectItem):
             return QtGui.QGraphicsItem.mouseMoveEvent(self.node, mouseEvent)
 
 
-class ConstraintLine(QtGui.QGraphicsItem):
+class ConstraintLine(QtGui.QGraphicsItem, RigGraphNode, RigStyledItem):
     """This is used to constrain the movement of a node or superNode to a straight Line
 
     Two OpsCrosses and a OpsRotation item are used to define its shape and rotation.
@@ -2265,11 +2299,14 @@ class ConstraintLine(QtGui.QGraphicsItem):
 
     def __init__(self):
         QtGui.QGraphicsItem.__init__(self) 
+        self.initGraph()
         self.scale = 1.0
         self.alpha = 1.0
         self.headLength = 25
         self.tailLength = 25
         self.ghostArea = False
+        self.initStyle()
+        self.updateBoundingRect()
         self.setFlag(QtGui.QGraphicsItem.ItemIsMovable,True)
         self.setFlag(QtGui.QGraphicsItem.ItemSendsGeometryChanges,True)
         self.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,True)
@@ -2302,18 +2339,18 @@ class ConstraintLine(QtGui.QGraphicsItem):
         self.opRot.setParentItem(self)
         self.opRot.setPos(QtCore.QPointF(0,-self.headLength - self.crossOffset - 9))
 
+    schema = RigAttributeSchema('ConstraintLine', [('scale', 'getScale', 'setScale', 'float'),
+                                                   ('alpha', 'getAlpha', 'setAlpha', 'float'),
+                                                   ('headLength', 'getHeadLength', 'setHeadLength', 'float'),
+                                                   ('tailLength', 'getTailLength', 'setTailLength', 'float'),
+                                                   ('ghostArea', 'isGhostArea', 'setGhostArea', 'bool'),
+                                                   ('zValue', 'zValue', 'setZValue', 'float'),
+                                                   ('visible', 'isVisible', 'setVisible', 'bool'),
+                                                   ('pos', 'pos', 'setPos', 'point')], late = ['ghostArea', 'visible'])
+
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        ConstraintLineXml = xml.Element('ConstraintLine')
-        attributes = xml.SubElement(ConstraintLineXml,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'scale', value = str(self.getScale()))
-        xml.SubElement(attributes, 'attribute', name = 'alpha', value = str(self.getAlpha()))
-        xml.SubElement(attributes, 'attribute', name = 'headLength', value = str(self.getHeadLength()))
-        xml.SubElement(attributes, 'attribute', name = 'tailLength', value = str(self.getTailLength()))
-        xml.SubElement(attributes, 'attribute', name = 'ghostArea', value = str(self.isGhostArea()))
-        xml.SubElement(attributes, 'attribute', name = 'zValue', value = str(self.zValue()))
-        xml.SubElement(attributes, 'attribute', name = 'visible', value = str(self.isVisible()))
-        xml.SubElement(attributes, 'attribute', name = 'pos', value = (str(self.pos().x())) + "," + str(self.pos().y()))
+        ConstraintLineXml = self.schema.store(self)
         
         #Now record the xml for the OpCross
         OpsItemsXml = xml.SubElement(ConstraintLineXml,'OpsItems')
@@ -2327,16 +2364,9 @@ class ConstraintLine(QtGui.QGraphicsItem):
 
     def read(self, ConstraintLineXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
-        for a in ConstraintLineXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'scale': self.setScale(float(a.attrib['value']))
-            elif a.attrib['name'] == 'alpha': self.setAlpha(float(a.attrib['value']))
-            elif a.attrib['name'] == 'headLength': self.setHeadLength(float(a.attrib['value']))
-            elif a.attrib['name'] == 'tailLength': self.setTailLength(float(a.attrib['value']))
-            elif a.attrib['name'] == 'zValue': self.setZValue(float(a.attrib['value']))
-            elif a.attrib['name'] == 'pos': 
-                newPos = a.attrib['value'].split(",")
-                self.setPos(float(newPos[0]), float(newPos[1]))
-            #The Ops Cross and OpsRot are created, so hunt through the XML and make sure all their attributes are loaded in
+        self.schema.read(self, ConstraintLineXml)
+
+        #The Ops Cross and OpsRot are created, so hunt through the XML and make sure all their attributes are loaded in
         OpsItemsXml = ConstraintLineXml.findall('OpsItems')
         for index, itemXml in enumerate(OpsItemsXml[0]): #This will return two OpsCross, the first is the head, the second is the tail
             if itemXml.tag == "OpsCross" and index == 0: self.opXHead.read(itemXml)
@@ -2346,9 +2376,7 @@ class ConstraintLine(QtGui.QGraphicsItem):
         self.redraw(1)
         self.lock()
 
-        for a in ConstraintLineXml.findall( 'attributes/attribute'): #Finsh by setting and ghost visibility states
-            if a.attrib['name'] == 'ghostArea': self.setGhostArea(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'visible': self.setVisible(str(a.attrib['value']) == 'True')
+        self.schema.readLate(self, ConstraintLineXml) #Finish by setting the ghost and visibility states
         self.update()
 
     def getScale(self):
@@ -2356,24 +2384,28 @@ class ConstraintLine(QtGui.QGraphicsItem):
 
     def setScale(self, scale):
         self.scale = scale
+        self.updateBoundingRect()
 
     def getHeadLength(self):
         return self.headLength
 
     def setHeadLength(self, headLength):
         self.headLength = headLength
+        self.updateBoundingRect()
 
     def getTailLength(self):
         return self.tailLength
 
     def setTailLength(self, tailLength):
         self.tailLength = tailLength
+        self.updateBoundingRect()
 
     def isGhostArea(self):
         return self.ghostArea
 
     def setGhostArea(self, ghost):
         self.ghostArea = bool(ghost)
+        self.invalidateStyle()
         self.opXHead.setVisible(not bool(ghost))
         self.opXTail.setVisible(not bool(ghost))
         self.opRot.setVisible(not bool(ghost))
@@ -2383,6 +2415,7 @@ class ConstraintLine(QtGui.QGraphicsItem):
 
     def setAlpha(self, alpha):
         self.alpha = float(alpha)
+        self.invalidateStyle()
         self.opXHead.setAlpha(float(alpha))
         self.opXTail.setAlpha(float(alpha))
         self.opRot.setAlpha(float(alpha))
@@ -2401,6 +2434,7 @@ class ConstraintLine(QtGui.QGraphicsItem):
             self.pin = pin
             self.setPinIndex(pin.getIndex())
             self.setParentItem(pin)
+            registerSceneItem(self)
         else: 
             print "WARNING : INVALID OBJECT WAS PASSED TO NODE FOR PIN ALLOCATION"
 
@@ -2427,19 +2461,28 @@ class ConstraintLine(QtGui.QGraphicsItem):
         self.opXHead.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,False) 
         self.opXTail.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,False) 
 
-    def boundingRect(self):
+    def updateBoundingRect(self):
+        """Function to recalculate the cached bounding rect, called by the setters that change the size of the item"""
+        self.prepareGeometryChange()
         adjust = 2
-        return QtCore.QRectF(self.scale*(-5 - adjust), self.scale*(-self.headLength - adjust +1 ),
-                             self.scale*(10 + 2*adjust), self.scale*(self.headLength + self.tailLength + 2))
+        self.boundRect = QtCore.QRectF(self.scale*(-5 - adjust), self.scale*(-self.headLength - adjust +1 ),
+                                       self.scale*(10 + 2*adjust), self.scale*(self.headLength + self.tailLength + 2))
+
+    def boundingRect(self):
+        return self.boundRect
+
+    def styleKey(self):
+        return ("ConstraintLine", self.alpha, self.ghostArea)
+
+    def buildStyle(self):
+        if self.ghostArea: return {'pen' : QtGui.QPen(QtGui.QColor(0,0,0,100*self.alpha), 0.25, QtCore.Qt.SolidLine)}
+        return {'pen' : QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine)}
 
     def paint(self, painter, option, widget):
         # QtGui.QGraphicsRectItem.paint(self, painter, option, widget)
-        self.prepareGeometryChange()
-        pen = QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine)
-        if self.ghostArea: pen = QtGui.QPen(QtGui.QColor(0,0,0,100*self.alpha), 0.25, QtCore.Qt.SolidLine)
-
-        painter.setPen(pen)
+        painter.setPen(self.getStyle()['pen'])
         painter.drawLine(0,1*self.scale*self.tailLength,0,1*self.scale*-self.headLength) 
+        if self.getDetailLevel(painter) == "Low": return #Zoomed out, only the line is drawn
         painter.drawLine(5,self.scale*-self.headLength,-5,self.scale*-self.headLength)
         painter.drawLine(5,self.scale*self.tailLength,-5,self.scale*self.tailLength)
         painter.drawLine(3,0,-3,0)
@@ -2498,6 +2541,7 @@ class ConstraintLine(QtGui.QGraphicsItem):
     def doTransform(self, theta_deg, arrow_x, arrow_y):
         if self.getPin():
             self.getPin().setRotation(theta_deg)
+            self.markDirty() #Rotating the pin moves the node, so update everything the constraint drives
 
     def mouseMoveEvent(self, mouseEvent):
         if self.pin == None: return QtGui.QGraphicsEllipseItem.mouseMoveEvent(self, mouseEvent) #If there is no pin we are free to move, else we are locked to a pin
@@ -2520,7 +2564,7 @@ class ConstraintLine(QtGui.QGraphicsItem):
 
 #############################################################SKINNING ITEM##############################################################
 
-class SkinningEllipse(QtGui.QGraphicsEllipseItem):
+class SkinningEllipse(QtGui.QGraphicsEllipseItem, RigStyledItem):
     """This is used to the region that nodes can be captured for skinning to a SuperNode
 
     An OpsCross item is used to define its shape. It can only be circular
@@ -2546,6 +2590,9 @@ class SkinningEllipse(QtGui.QGraphicsEllipseItem):
         QtGui.QGraphicsEllipseItem.__init__(self, -self.width, -self.width, 2*self.width, 2*self.width) 
         self.opX = None
         self.opRot = None
+        self.initStyle()
+        self.updateBoundingRect()
+        self.invalidateStyle()
         self.pin = None
         self.pinIndex = 0
         self.node = None
@@ -2569,19 +2616,11 @@ class SkinningEllipse(QtGui.QGraphicsEllipseItem):
         # self.opRot.setParentItem(self)
         # self.opRot.setPos(QtCore.QPointF(0,-self.width-self.extension - self.crossOffset))
 
+    schema = RigAttributeSchema('SkinningEllipse', ConstraintEllipse.schema.attributes, late = ['ghostArea', 'visible'])
+
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        ConstraintEllipseXml = xml.Element('SkinningEllipse')
-        attributes = xml.SubElement(ConstraintEllipseXml,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'scale', value = str(self.getScale()))
-        xml.SubElement(attributes, 'attribute', name = 'alpha', value = str(self.getAlpha()))
-        xml.SubElement(attributes, 'attribute', name = 'height', value = str(self.getHeight()))
-        xml.SubElement(attributes, 'attribute', name = 'width', value = str(self.getWidth()))
-        xml.SubElement(attributes, 'attribute', name = 'ghostArea', value = str(self.isGhostArea()))
-        xml.SubElement(attributes, 'attribute', name = 'extension', value = str(self.getExtension()))
-        xml.SubElement(attributes, 'attribute', name = 'zValue', value = str(self.zValue()))
-        xml.SubElement(attributes, 'attribute', name = 'visible', value = str(self.isVisible()))
-        xml.SubElement(attributes, 'attribute', name = 'pos', value = (str(self.pos().x())) + "," + str(self.pos().y()))
+        ConstraintEllipseXml = self.schema.store(self)
         
         #Now record the xml for the OpCross
         OpsItemsXml = xml.SubElement(ConstraintEllipseXml,'OpsItems')
@@ -2593,16 +2632,7 @@ class SkinningEllipse(QtGui.QGraphicsEllipseItem):
 
     def read(self, ConstraintEllipseXml):
         """A function to read in a block of XML and set all major attributes accordingly"""
-        for a in ConstraintEllipseXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'scale': self.setScale(float(a.attrib['value']))
-            elif a.attrib['name'] == 'alpha': self.setAlpha(float(a.attrib['value']))
-            elif a.attrib['name'] == 'height': self.setHeight(float(a.attrib['value']))
-            elif a.attrib['name'] == 'width': self.setWidth(float(a.attrib['value']))
-            elif a.attrib['name'] == 'extension': self.setExtension(float(a.attrib['value']))
-            elif a.attrib['name'] == 'zValue': self.setZValue(float(a.attrib['value']))
-            elif a.attrib['name'] == 'pos': 
-                newPos = a.attrib['value'].split(",")
-                self.setPos(float(newPos[0]), float(newPos[1]))
+        self.schema.read(self, ConstraintEllipseXml)
 
         #The Ops Cross and OpsRot are created, so hunt through the XML and make sure all their attributes are loaded in
         OpsItemsXml = ConstraintEllipseXml.findall('OpsItems')
@@ -2612,9 +2642,7 @@ class SkinningEllipse(QtGui.QGraphicsEllipseItem):
         self.redraw(self.opX.pos())
         self.lock()
 
-        for a in ConstraintEllipseXml.findall( 'attributes/attribute'): #Finsh by setting and ghost visibility states
-            if a.attrib['name'] == 'ghostArea': self.setGhostArea(str(a.attrib['value']) == 'True')
-            elif a.attrib['name'] == 'visible': self.setVisible(str(a.attrib['value']) == 'True')
+        self.schema.readLate(self, ConstraintEllipseXml) #Finish by setting the ghost and visibility states
         self.update()
 
     def getScale(self):
@@ -2622,24 +2650,28 @@ class SkinningEllipse(QtGui.QGraphicsEllipseItem):
 
     def setScale(self, scale):
         self.scale = scale
+        self.updateBoundingRect()
 
     def getWidth(self):
         return self.width
 
     def setWidth(self, width):
         self.width = width
+        self.updateBoundingRect()
 
     def getExtension(self):
         return self.extension
 
     def setExtension(self,extension):
         self.extension = extension
+        self.updateBoundingRect()
 
     def getAlpha(self):
         return self.alpha
 
     def setAlpha(self, alpha):
         self.alpha = float(alpha)
+        self.invalidateStyle()
         self.opX.setAlpha(float(alpha))
 
     def isGhostArea(self):
@@ -2664,6 +2696,7 @@ class SkinningEllipse(QtGui.QGraphicsEllipseItem):
             self.pin = pin
             self.setPinIndex(pin.getIndex())
             self.setParentItem(pin)
+            registerSceneItem(self)
         else: 
             print "WARNING : INVALID OBJECT WAS PASSED TO NODE FOR PIN ALLOCATION"
 
@@ -2689,24 +2722,40 @@ class SkinningEllipse(QtGui.QGraphicsEllipseItem):
         self.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,False)  
         self.opX.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,False) 
 
-    def boundingRect(self):
+    def updateBoundingRect(self):
+        """Function to recalculate the cached bounding rect, called by the setters that change the size of the item"""
+        self.prepareGeometryChange()
         adjust = 2
-        return QtCore.QRectF(self.scale*(-self.width - adjust), self.scale*(-self.width - adjust - self.extension-3),
-                             self.scale*(2*self.width + 2*adjust), self.scale*(2*self.width + adjust + 2*self.extension + 5))
+        self.boundRect = QtCore.QRectF(self.scale*(-self.width - adjust), self.scale*(-self.width - adjust - self.extension-3),
+                                       self.scale*(2*self.width + 2*adjust), self.scale*(2*self.width + adjust + 2*self.extension + 5))
 
-    def paint(self, painter, option, widget):
-        self.prepareGeometryChange()
-        gradient = QtGui.QRadialGradient(0, 0, self.scale*self.width)
+    def boundingRect(self):
+        return self.boundRect
+
+    def styleKey(self):
+        return ("SkinningEllipse", self.alpha)
+
+    def buildStyle(self):
+        """Function to build the pen and rainbow gradient, which is set relative to the ellipse so it does not change with the width"""
+        gradient = QtGui.QRadialGradient(0.5, 0.5, 0.5)
+        gradient.setCoordinateMode(QtGui.QGradient.ObjectBoundingMode)
         gradient.setColorAt(0, QtGui.QColor(255,0,0,25 * self.alpha))
         gradient.setColorAt(0.25, QtGui.QColor(255,125,0,25 * self.alpha))
         gradient.setColorAt(0.5, QtGui.QColor(255,255,0,25 * self.alpha))
         gradient.setColorAt(0.75, QtGui.QColor(125,255,0,25 * self.alpha))
         gradient.setColorAt(1.0, QtGui.QColor(0,255,0,25 * self.alpha))
-        self.setBrush(QtGui.QBrush(gradient))
-        pen = QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine)
-        self.setPen(pen)
-        self.setBrush(QtGui.QBrush(gradient))
+        return {'pen' : QtGui.QPen(QtGui.QColor(0,0,0,255*self.alpha), 0.25, QtCore.Qt.SolidLine), 'brush' : QtGui.QBrush(gradient)}
+
+    def invalidateStyle(self):
+        """The ellipse is drawn with its own pen and brush, so they are set here rather than in paint()"""
+        RigStyledItem.invalidateStyle(self)
+        style = self.getStyle()
+        self.setPen(style['pen'])
+        self.setBrush(style['brush'])
+
+    def paint(self, painter, option, widget):
         QtGui.QGraphicsEllipseItem.paint(self, painter, option, widget)
+        if self.getDetailLevel(painter) == "Low": return #Zoomed out, only the area is drawn
 
         if self.width > 3: 
             painter.drawLine(3,0,-3,0)
@@ -2778,7 +2827,7 @@ class SkinningEllipse(QtGui.QGraphicsEllipseItem):
 
 
 
-class SkinningPinInfo():
+class SkinningPinInfo(RigGraphNode):
     """This is used to store the skinning information that allows a SuperNode to move the ControlPin in a WireGroup
 
     One instance of this class is created for each node that is skinned to a superNode. These instances are the stored
@@ -2786,8 +2835,16 @@ class SkinningPinInfo():
 
     The SkinningPinInfo records the initial skinning position of the ControlPin, and then calculates the influence on 
     the position of ControlPin by the translation of the SuperNode and the associated Skinning Value
+
+    The Skinning Value applies equally to both axes. Optionally a 2x2 matrix of axis weights can be set instead, so that
+    the pin can follow the SuperNode differently in x and y (a lip corner that follows the jaw vertically but not 
+    horizontally has axis weights [[0,0],[0,1]]).
+
+    When the SuperNode moves, all of its skinned pins are moved together by SuperNode.evaluate(), using arrays built 
+    from the SkinningPinInfos. Any change to the skinning Info here flags those arrays as out of date.
     """
     def __init__(self):
+        self.initGraph()
         self.superNode = None
         # self.superNodeName = None
         self.pin = None
@@ -2797,27 +2854,22 @@ class SkinningPinInfo():
 
         self.pinSkinPos = None
         self.skinValue = 0
+        self.axisWeights = None #Optional 2x2 matrix of skin values, used in place of the skinValue
+
+    schema = RigAttributeSchema('SkinningPinInfo', [('pinIndex', 'getPinIndex', 'setPinIndex', 'int'),
+                                                    ('wireGroupName', 'getWireGroupName', 'setWireGroupName', 'str'),
+                                                    ('pinSkinPos', 'getPinSkinPos', 'setPinSkinPos', 'point'),
+                                                    ('skinValue', 'getSkinValue', 'setSkinValue', 'float'),
+                                                    ('axisWeights', 'getAxisWeights', 'setAxisWeights', 'weights')])
 
     def store(self):
         """Function to write out a block of XML that records all the major attributes that will be needed for save/load"""
-        skinningPinInfoRoot = xml.Element('SkinningPinInfo')
-        attributes = xml.SubElement(skinningPinInfoRoot,'attributes')
-        xml.SubElement(attributes, 'attribute', name = 'pinIndex', value = str(self.getPinIndex()))
-        xml.SubElement(attributes, 'attribute', name = 'wireGroupName', value = str(self.getWireGroupName()))
-        xml.SubElement(attributes, 'attribute', name = 'pinSkinPos', value = (str(self.pinSkinPos.x())) + "," + str(self.pinSkinPos.y()))
-        xml.SubElement(attributes, 'attribute', name = 'skinValue', value = str(self.getSkinValue()))
-
+        skinningPinInfoRoot = self.schema.store(self)
         return skinningPinInfoRoot
 
     def read(self, nodeXml):
         """A function to read in a block of XML and set all major attributes accordingly. Has to run through all Items in the scene to find the Correct WireGroup/SuperNode/Pin"""
-        for a in nodeXml.findall( 'attributes/attribute'):
-            if a.attrib['name'] == 'pinIndex': self.setPinIndex(int(a.attrib['value']))
-            elif a.attrib['name'] == 'wireGroupName': self.setWireGroupName(str(a.attrib['value']))
-            elif a.attrib['name'] == 'skinValue': self.setSkinValue(float(a.attrib['value']))
-            elif a.attrib['name'] == 'pinSkinPos': 
-                newSkinPos = a.attrib['value'].split(",")
-                self.setPinSkinPos(QtCore.QPointF(float(newSkinPos[0]), float(newSkinPos[1])))
+        self.schema.read(self, nodeXml)
  
 
     def getSuperNode(self):
@@ -2826,6 +2878,7 @@ class SkinningPinInfo():
     def setSuperNode(self, superNode):
         if type(superNode) == SuperNode:
             self.superNode = superNode
+            superNode.addGraphOutput(self)
             # self.setSuperNodeName(superNode.getName())
 
     def getSuperNodeName(self):
@@ -2840,9 +2893,12 @@ class SkinningPinInfo():
     def setPin(self, pin, setSkinPos = True):
         """Function to set the pin of the skinningInfo"""
         if type(pin) == ControlPin:
+            if self.pin: self.removeGraphOutput(self.pin)
             self.pin = pin
             self.setPinIndex(pin.getIndex())
             if setSkinPos: self.pinSkinPos = self.pin.pos()
+            self.addGraphOutput(pin)
+            self.invalidateSkinArrays()
         else: 
             print "WARNING : INVALID OBJECT WAS PASSED TO ITEM FOR ALLOCATION"
 
@@ -2870,6 +2926,7 @@ class SkinningPinInfo():
 
     def setPinSkinPos(self, pinSkinPos):
         self.pinSkinPos = pinSkinPos
+        self.invalidateSkinArrays()
 
     def getSkinValue(self):
         return self.skinValue
@@ -2879,11 +2936,162 @@ class SkinningPinInfo():
         if val > 1.0 : self.skinValue = 1.0
         elif val < 0.0 : self.skinValue = 0.0
         else: self.skinValue = val
+        self.invalidateSkinArrays()
+
+    def getAxisWeights(self):
+        return self.axisWeights
+
+    def setAxisWeights(self, axisWeights):
+        """Function to set the 2x2 matrix of skin values (or 4 values xx,xy,yx,yy), or None to use the skinValue on both axes"""
+        if axisWeights is None: self.axisWeights = None
+        else:
+            weights = np.array(axisWeights, dtype = float)
+            if weights.size == 4: self.axisWeights = np.clip(weights.reshape(2,2), -1.0, 1.0)
+            else: print "WARNING : AXIS WEIGHTS NEED 4 VALUES, SO THEY HAVE NOT BEEN SET"
+        self.invalidateSkinArrays()
+
+    def getWeightMatrix(self):
+        """Function to return the 2x2 matrix that maps the translation of the SuperNode to the translation of the pin"""
+        if self.axisWeights is not None: return self.axisWeights
+        return self.skinValue*np.identity(2)
+
+    def invalidateSkinArrays(self):
+        if self.superNode: self.superNode.invalidateSkinArrays()
 
     def goHome(self):
         if self.pin: self.pin.setPos(self.pinSkinPos)
 
     def update(self):
         if self.superNode and self.pin:
-            newTranslation = ((self.superNode.scenePos()-self.superNode.getPin().scenePos()) * self.skinValue) + self.pinSkinPos
+            newTranslation = QPVec(self.getWeightMatrix().dot(npVec(self.superNode.scenePos()-self.superNode.getPin().scenePos()))) + self.pinSkinPos
             self.pin.setPos(newTranslation)
+
+    def graphScheduler(self):
+        if self.superNode: return findUpdateScheduler(self.superNode)
+        return None
+
+    def evaluate(self):
+        pass #The pin has already been moved by the batched skinning in SuperNode.evaluate() or the RigSkinMatrix
+
+
+
+class RigSkinMatrix(RigGraphNode):
+    """The RigSkinMatrix holds the skinning of the whole rig as a sparse matrix of skin values, pins x SuperNodes
+
+    The entries of the matrix are the SkinningPinInfos of every SuperNode in the view, so a pin can be influenced by
+    several SuperNodes (jaw, cheek and lip corner) and their translations are blended together. The matrix is stored 
+    in coordinate form (row, column and value arrays) and the pin offsets for an update come from one sparse 
+    matrix-vector product of the skin values with the SuperNode translations. Each entry is the 2x2 weight matrix of
+    the SkinningPinInfo, so the product is a stacked (N,2,2) matmul followed by a sum over each pin.
+
+    The matrix is rebuilt from the SkinningPinInfos when it is invalidated, so it is saved and loaded through
+    the SkinningPinInfos blocks of SuperNode.store() and SuperNode.read().
+
+    The skin values of each pin can be normalised, separately for each axis:
+        "None"  - the skin values are used as they are
+        "Clamp" - the skin values of a pin are scaled down if they add up to more than 1
+        "Unit"  - the skin values of a pin are scaled to add up to 1
+    """
+
+    normalisations = ["None", "Clamp", "Unit"]
+
+    def __init__(self, rigGView):
+        self.initGraph()
+        self.view = rigGView
+        self.normalisation = "None"
+        self.valid = False
+        self.clear()
+
+    def clear(self):
+        """Function to empty the matrix, used when the scene is cleared"""
+        self.superNodes = []
+        self.pins = []
+        self.restPositions = np.zeros((0,2))
+        self.rows = np.zeros(0, dtype = int)
+        self.columns = np.zeros(0, dtype = int)
+        self.weightMatrices = np.zeros((0,2,2))
+        self.valid = False
+
+    def getNormalisation(self):
+        return self.normalisation
+
+    def setNormalisation(self, normalisation):
+        if normalisation in self.normalisations:
+            self.normalisation = normalisation
+            self.invalidate()
+        else: 
+            print "WARNING : INVALID SKIN NORMALISATION : " + str(normalisation)
+
+    def isValid(self):
+        return self.valid
+
+    def invalidate(self):
+        """Function to flag the matrix as out of date and make sure it is rebuilt on the next update"""
+        self.valid = False
+        self.markDirty()
+
+    def getPins(self):
+        return self.pins
+
+    def getSuperNodes(self):
+        return self.superNodes
+
+    def graphScheduler(self):
+        return self.view.updateScheduler
+
+    def build(self):
+        """Function to rebuild the matrix from the SkinningPinInfos of all of the SuperNodes in the view"""
+        for superNode in self.superNodes: superNode.removeGraphOutput(self)
+        for pin in self.pins: self.removeGraphOutput(pin)
+        self.superNodes = [group.getSuperNode() for group in self.view.getSuperNodeGroups() if group.getSuperNode()]
+        self.pins = []
+        pinRows = {}
+        restPositions = []
+        rows = []
+        columns = []
+        weightMatrices = []
+        for column, superNode in enumerate(self.superNodes):
+            superNode.addGraphOutput(self)
+            for skinPin in superNode.getSkinnedPins():
+                pin = skinPin.getPin()
+                if not pin or skinPin.getPinSkinPos() is None: continue
+                if id(pin) not in pinRows: #The first SkinningPinInfo of a pin gives its rest position
+                    pinRows[id(pin)] = len(self.pins)
+                    self.pins.append(pin)
+                    restPositions.append([skinPin.getPinSkinPos().x(), skinPin.getPinSkinPos().y()])
+                    self.addGraphOutput(pin)
+                rows.append(pinRows[id(pin)])
+                columns.append(column)
+                weightMatrices.append(skinPin.getWeightMatrix())
+        self.restPositions = np.array(restPositions, dtype = float).reshape(-1,2)
+        self.rows = np.array(rows, dtype = int)
+        self.columns = np.array(columns, dtype = int)
+        self.weightMatrices = self.normaliseWeights(np.array(weightMatrices, dtype = float).reshape(-1,2,2))
+        self.valid = True
+
+    def normaliseWeights(self, weightMatrices):
+        """Function to scale the weight matrices of each pin according to the normalisation setting
+
+        The totals are taken from the diagonal (x on x, y on y) of the matrices, one axis at a time
+        """
+        if self.normalisation == "None" or not len(weightMatrices): return weightMatrices
+        scale = np.ones((len(weightMatrices), 2))
+        for axis in range(2):
+            pinTotals = np.bincount(self.rows, weightMatrices[:,axis,axis], minlength = len(self.pins))[self.rows]
+            if self.normalisation == "Clamp": scale[:,axis] = 1.0/np.maximum(pinTotals, 1.0)
+            else: scale[:,axis] = np.where(pinTotals > 0.0, 1.0/np.where(pinTotals > 0.0, pinTotals, 1.0), 0.0)
+        return weightMatrices*scale[:,:,np.newaxis]
+
+    def evaluate(self):
+        """Function to move every skinned pin in the rig, from the translations of all of the SuperNodes"""
+        if not self.valid: 
+            self.build()
+            for pin in self.pins: pin.markDirty() #Newly connected pins may not be part of this evaluation yet
+        if not self.pins: return
+        translations = np.array([npVec(superNode.scenePos() - superNode.getPin().scenePos()) if superNode.getPin() else [0.0,0.0] 
+                                 for superNode in self.superNodes], dtype = float).reshape(-1,2)
+        weighted = np.matmul(self.weightMatrices, translations[self.columns][:,:,np.newaxis])[:,:,0] #Sparse matrix-vector product
+        offsets = np.column_stack((np.bincount(self.rows, weighted[:,0], minlength = len(self.pins)),
+                                   np.bincount(self.rows, weighted[:,1], minlength = len(self.pins))))
+        newPositions = self.restPositions + offsets
+        for pin, newPos in zip(self.pins, newPositions): pin.setPos(newPos[0], newPos[1])
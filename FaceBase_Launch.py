@@ -143,22 +143,22 @@ class RigFaceSetup(QtGui.QMainWindow):
         self.setCentralWidget(self.mainWidget)
 
         # File Menu
-        openFace = QtGui.QAction(QtGui.QIcon('exit.png'), 'Open Face', self)        
+        openFace = QtGui.QAction(rig.rigResources.getIcon('exit.png'), 'Open Face', self)        
         openFace.setShortcut('Ctrl+O')
         openFace.setStatusTip('Open a new face')
         openFace.triggered.connect(lambda: self.openFaceRig())
 
-        saveFace = QtGui.QAction(QtGui.QIcon('exit.png'), 'Save Face', self)        
+        saveFace = QtGui.QAction(rig.rigResources.getIcon('exit.png'), 'Save Face', self)        
         saveFace.setShortcut('Ctrl+S')
         saveFace.setStatusTip('Save current face')
         saveFace.triggered.connect(lambda: self.saveFaceRig())
 
-        saveFaceAs = QtGui.QAction(QtGui.QIcon('exit.png'), 'Save Face as...', self)        
+        saveFaceAs = QtGui.QAction(rig.rigResources.getIcon('exit.png'), 'Save Face as...', self)        
         saveFaceAs.setShortcut('Ctrl+Shift+S')
         saveFaceAs.setStatusTip('Save current face to a new file')
         saveFaceAs.triggered.connect(lambda: self.moo())
 
-        exitAction = QtGui.QAction(QtGui.QIcon('exit.png'), '&Exit', self)        
+        exitAction = QtGui.QAction(rig.rigResources.getIcon('exit.png'), '&Exit', self)        
         exitAction.setShortcut('Ctrl+Q')
         exitAction.setStatusTip('Exit application')
         exitAction.triggered.connect(QtGui.qApp.quit)
@@ -218,7 +218,7 @@ class RigFaceSetup(QtGui.QMainWindow):
         self.selectionFilters = QtGui.QLabel("   Selection Filters   ")
 
         self.selMarkers = QtGui.QAction(
-                QtGui.QIcon('images/GuideMarker_toolbar_active.png'),
+                rig.rigResources.getIcon('images/GuideMarker_toolbar_active.png'),
                 'Select Guide Markers',
                 self
                 ) 
@@ -227,7 +227,7 @@ class RigFaceSetup(QtGui.QMainWindow):
         self.selMarkers.setStatusTip("Toggle guide marker selection")
         self.selMarkers.toggled.connect(lambda: self.selectMarkers(self.selMarkers.isChecked()))
 
-        self.selNodes = QtGui.QAction(QtGui.QIcon('images/Node_toolbar_active.png'), 'Select Nodes', self)
+        self.selNodes = QtGui.QAction(rig.rigResources.getIcon('images/Node_toolbar_active.png'), 'Select Nodes', self)
         self.selNodes.setCheckable(True)
         self.selNodes.setChecked(True)
         self.selNodes.setStatusTip("Toggle node selection")
@@ -303,8 +303,7 @@ class RigFaceSetup(QtGui.QMainWindow):
         skinBox.addStretch(1)
 
         #Build the Skinning Table
-        self.skinTableWidget = rig.SkinTabW()
-        self.skinTableWidget.itemChanged.connect(self.updateSkinData)
+        self.skinTableWidget = rig.SkinTabW() #Edits are applied to the SuperNode by the table's model
 
         self.dockSkinningWidget = QtGui.QDockWidget(self)
         self.dockSkinningWidget.setWindowTitle("Skinning Values")
@@ -328,9 +327,9 @@ class RigFaceSetup(QtGui.QMainWindow):
         contradict the icon state.
         """ 
         if state:
-            self.selMarkers.setIcon(QtGui.QIcon('images/GuideMarker_toolbar_active.png'))
+            self.selMarkers.setIcon(rig.rigResources.getIcon('images/GuideMarker_toolbar_active.png'))
         else:
-            self.selMarkers.setIcon(QtGui.QIcon('images/GuideMarker_toolbar_deactive.png'))
+            self.selMarkers.setIcon(rig.rigResources.getIcon('images/GuideMarker_toolbar_deactive.png'))
         self.view.selectFilter(state, rig.GuideMarker)
 
     def selectNodes(self,state):
@@ -344,9 +343,9 @@ class RigFaceSetup(QtGui.QMainWindow):
         contradict the icon state.
         """
         if state:
-            self.selNodes.setIcon(QtGui.QIcon('images/Node_toolbar_active.png'))
+            self.selNodes.setIcon(rig.rigResources.getIcon('images/Node_toolbar_active.png'))
         else:
-            self.selNodes.setIcon(QtGui.QIcon('images/Node_toolbar_deactive.png'))
+            self.selNodes.setIcon(rig.rigResources.getIcon('images/Node_toolbar_deactive.png'))
         self.view.selectFilter(state, rig.Node)
 
     def openFaceRig(self):
@@ -362,10 +361,6 @@ class RigFaceSetup(QtGui.QMainWindow):
         xMLStructure.store()
 
 
-    def updateSkinData(self, item):
-        """Function that simply calls the skinning table to update"""
-        self.skinTableWidget.updateSkinning(item)
-
     def itemTest(self):
         """Random Test funciton to see if things get called"""
         print "moo"
@@ -374,11 +369,9 @@ class RigFaceSetup(QtGui.QMainWindow):
 def main():
 
     stylesheet = 'darkorange.stylesheet'
-    try:
-        # Read style sheet information
-        with open(stylesheet, 'r') as handle:
-            styleData = handle.read()
-    except IOError:
+    # Read style sheet information, once for the whole application
+    styleData = rig.rigResources.getStyleSheet(stylesheet)
+    if styleData == None:
         sys.stderr.write('Error - Unable to find stylesheet \'%s\'\n' % stylesheet)
         return 1
 
@@ -14,12 +14,31 @@
 ##IMPORTS 
 
 import os
+import weakref
 import xml.etree.ElementTree as xml
+import numpy as np
 
 
 #################################################################################################
 ##CLASSES, FUNCTIONS AND DATA
 
+attributeTypes = {} #(item tag, attribute name) : column type, declared by the item attribute schemas
+
+attributeValues = weakref.WeakKeyDictionary() #item element : {attribute name : value}, for items streamed from a binary file
+
+def registerAttributeTypes(tag, types):
+	"""Function to declare the column types the binary format should try first for the attributes of an item tag"""
+	for name, columnType in types.items(): attributeTypes[(tag, name)] = columnType
+
+def getAttributeTags():
+	"""Function to return the item tags that have declared attribute types"""
+	return set(tag for tag, name in attributeTypes)
+
+def getAttributeValues(element):
+	"""Function to return the attribute values handed over with an item element by RigBinaryMan.streamLoad(), 
+	or None when the attributes are elements of the item, as they are when read from XML"""
+	return attributeValues.get(element)
+
 
 class FileMan():
 	"""A class to cover basic file tests, managing exporting, managing importing"""
@@ -60,12 +79,20 @@ class XMLMan():
 	"""Class to simply the loading and procesing methods for XML
 
 	This is used in places, but the XML etree python library is often directly used for reading and storage
+
+	findBranch() answers from an index of tag : elements, built the first time it is called on a tree. The index is
+	built again whenever a different tree is set or loaded, but not when the tree is edited in place.
 	"""
-	fileLoc = None
-	tree = None
-	markedBranches = []
 	
 	#Methods
+	def __init__(self):
+		"""function to initialise the per instance data - each XMLMan has its own tree and results"""
+		self.fileLoc = None
+		self.tree = None
+		self.markedBranches = []
+		self.branchIndex = {}
+		self.indexedTree = None
+
 	def setFile(self, fileName):
 		"""Function to set the XML file location"""
 		self.fileLoc = fileName
@@ -108,6 +135,32 @@ class XMLMan():
 		else:
 			print "TError: The xml file name does not exist, so it cannot be loaded"
 	
+	def streamLoad(self, fileName, builders):
+		"""Function to read the XML file in a single pass, handing each item to its builder as soon as it is complete
+
+		builders is a dictionary of tag : function(element). The children of the root (viewSettings ...) and of its 
+		sceneItems branch (ReflectionLine, GuideMarker, WireGroup ...) are handed over in the order they are in the file, 
+		and then cleared, so the whole tree is never held in memory. Returns False if the file could not be read.
+		"""
+		self.setFile(fileName)
+		xmlTest = FileMan(self.fileLoc)
+		if not xmlTest.exists():
+			print "TError: The xml file name does not exist, so it cannot be loaded"
+			return False
+		path = []
+		for event, element in xml.iterparse(self.fileLoc, events = ("start", "end")):
+			if event == "start":
+				path.append(element)
+				continue
+			path.pop()
+			if len(path) == 1 or (len(path) == 2 and path[1].tag == 'sceneItems'): #A complete child of the root, or of sceneItems
+				if element.tag == 'sceneItems': continue
+				if element.tag in builders: builders[element.tag](element)
+				element.clear()
+				path[-1].remove(element)
+			elif len(path) == 0: self.tree = element
+		return True
+
 	def save(self):
 		"""Function that will attempt to save out tree to the given file path"""
 		xmlFile = open(self.fileLoc, 'w')
@@ -124,15 +177,323 @@ class XMLMan():
 			for child in branch:
 		   		self.iterFindBranch(child, tName)
 
+	def buildBranchIndex(self):
+		"""Function to index the elements of the tree by tag, in one walk of the tree
+
+		The index holds the same elements, in the same order, as iterFindBranch() finds: the children of the first
+		branch down each path that has children of that name. So the children of an element are only indexed under
+		the names that none of its ancestors have as children.
+		"""
+		self.branchIndex = {}
+		self.indexedTree = self.tree
+		stack = [(self.tree, frozenset())]
+		while stack:
+			branch, blockedTags = stack.pop()
+			children = list(branch)
+			if len(children) == 0: continue
+			for child in children:
+				if child.tag not in blockedTags: self.branchIndex.setdefault(child.tag, []).append(child)
+			childBlockedTags = blockedTags.union(child.tag for child in children)
+			for child in reversed(children): stack.append((child, childBlockedTags))
+
 	def findBranch(self, tName):
 		"""Function to return any elements with the target name"""
 		self.setMarkedBranches([])
 		if self.tree != None:
-			self.iterFindBranch(self.tree, tName)
+			if self.indexedTree is not self.tree: self.buildBranchIndex()
+			self.setMarkedBranches(list(self.branchIndex.get(tName, [])))
 		else:
 			print "TError: The xml tree was not defined, so no search is possible"
 		return self.markedBranches
 
+
+class RigBinaryMan(XMLMan):
+	"""Class to load and save the same trees as XMLMan, in a compact binary file
+
+	The rig files are made of thousands of <attribute name=... value=...> elements holding stringified numbers. In the
+	binary file the shape of the tree is kept as two arrays (the tag and parent of every element), and the attribute 
+	values are gathered into one column per item tag and attribute name (GuideMarker pos, SkinningPinInfo skinValue ...).
+	A column whose values are all ints, floats, bools or comma separated vectors of them is stored as a typed numpy 
+	array, with "None" values flagged in a mask. A value is only given a type if it is written back as exactly the same
+	string, so anything else falls back to a string column, and the round trip through XML is lossless.
+
+	The file is a numpy .npz archive, read without pickling.
+	"""
+	extension = ".rig"
+	version = 1
+	intRange = (-2**63, 2**63 - 1) #Integers outside int64 are kept as strings
+
+	def load(self):
+		xmlTest = FileMan(self.fileLoc)
+		if xmlTest.exists():
+			self.tree = self.decode(np.load(self.fileLoc))
+		else:
+			print "TError: The binary file name does not exist, so it cannot be loaded"
+
+	def setLoad(self, fileName):
+		"""Function to set and load the binary file from the set file location"""
+		self.setFile(fileName)
+		self.load()
+
+	def streamLoad(self, fileName, builders):
+		"""Function to load the binary file, and hand each item to its builder in the same order as XMLMan.streamLoad()
+
+		The attributes of the items with declared attribute types are not rebuilt as elements, their values are handed
+		over straight from the columns (see decode()), so the tree is only good for reading the items from.
+		"""
+		self.setFile(fileName)
+		if not FileMan(self.fileLoc).exists():
+			print "TError: The binary file name does not exist, so it cannot be loaded"
+			return False
+		self.tree = self.decode(np.load(self.fileLoc), getAttributeTags())
+		if self.tree == None: return False
+		for element in list(self.tree):
+			if element.tag == 'sceneItems':
+				for item in list(element):
+					if item.tag in builders: builders[item.tag](item)
+			elif element.tag in builders: builders[element.tag](element)
+		return True
+
+	def save(self):
+		"""Function that will attempt to save out tree to the given file path"""
+		binaryFile = open(self.fileLoc, 'wb') #Write through a file, so that numpy does not add its own extension
+		np.savez_compressed(binaryFile, **self.encode(self.tree))
+		binaryFile.close()
+
+	def packStrings(self, strings):
+		"""Function to pack a list of strings into one utf-8 buffer, and the offsets of the ends of the strings"""
+		encoded = [string.encode('utf-8') for string in strings]
+		offsets = np.cumsum([len(string) for string in encoded]).astype(np.int64)
+		return np.frombuffer(b"".join(encoded) or b" ", dtype = np.uint8), offsets
+
+	def unpackStrings(self, buffer, offsets):
+		data = buffer.tobytes()
+		strings = []
+		start = 0
+		for end in offsets:
+			string = data[start:end].decode('utf-8')
+			try: string = str(string) #Plain strings where they will do, as the XML parser gives them
+			except UnicodeEncodeError: pass
+			strings.append(string)
+			start = end
+		return strings
+
+	def valueType(self, value):
+		"""Function to return the type a value can be stored as without changing it ("int", "float", "bool", "vec<n>int" ...)"""
+		if value == "None": return None
+		if value == "True" or value == "False": return "bool"
+		parts = value.split(",")
+		partTypes = []
+		for part in parts:
+			if self.fitsPart(part, "int"): partTypes.append("int")
+			elif self.fitsPart(part, "float"): partTypes.append("float")
+			else: return "str"
+		if len(parts) == 1: return partTypes[0]
+		if len(set(partTypes)) != 1: return "str"
+		return "vec" + str(len(parts)) + partTypes[0]
+
+	def fitsType(self, value, columnType):
+		"""Function to return whether a value is written back as exactly the same string when stored as the column type"""
+		if value == "None" or columnType == "str": return True
+		if columnType == "bool": return value == "True" or value == "False"
+		if columnType.startswith("vec"):
+			partType = "float" if columnType.endswith("float") else "int"
+			parts = value.split(",")
+			if len(parts) != int(columnType[3:-len(partType)]): return False
+			for part in parts:
+				if not self.fitsPart(part, partType): return False
+			return True
+		return self.fitsPart(value, columnType)
+
+	def fitsPart(self, part, partType):
+		"""Function to return whether a single number is written back as exactly the same string from an int64 or float64"""
+		try:
+			if partType == "int": return str(int(part)) == part and self.intRange[0] <= int(part) <= self.intRange[1]
+			return str(float(part)) == part
+		except ValueError: return False
+
+	def encodeColumn(self, values, declaredType = None):
+		"""Function to return the type of a column of values, their typed array, and the mask of "None" values
+
+		A declared type (from the item attribute schemas) is checked against the values and used if they all fit it,
+		otherwise the type is worked out from the values themselves.
+		"""
+		if declaredType and any(value != "None" for value in values) and all(self.fitsType(value, declaredType) for value in values):
+			columnType = declaredType
+		else:
+			types = set(self.valueType(value) for value in values)
+			types.discard(None)
+			columnType = types.pop() if len(types) == 1 else "str"
+			if len(types) == 0 and columnType == "str" and all(value == "None" for value in values): columnType = "none"
+		isNone = np.array([value == "None" for value in values], dtype = bool)
+		if columnType == "str" or columnType == "none": return columnType, None, None
+		present = [value for value in values if value != "None"]
+		if columnType == "bool": data = np.array([value == "True" for value in present], dtype = bool)
+		elif columnType == "int": data = np.array([int(value) for value in present], dtype = np.int64)
+		elif columnType == "float": data = np.array([float(value) for value in present], dtype = np.float64)
+		else: 
+			dtype = np.int64 if columnType.endswith("int") else np.float64
+			parse = int if columnType.endswith("int") else float
+			data = np.array([[parse(part) for part in value.split(",")] for value in present], dtype = dtype)
+		return columnType, data, isNone
+
+	def matchesType(self, columnType, declaredType):
+		"""Function to return whether the values of a column can be handed over as they are for the declared type"""
+		return columnType == declaredType or columnType == declaredType.replace("float", "int")
+
+	def columnValues(self, arrays, number, columnType, declaredType = None):
+		"""Function to return the values of a column as the strings they were built from, or typed (None for "None")
+		when the column has the declared type"""
+		if columnType == "str": return self.unpackStrings(arrays['c%d_values' % number], arrays['c%d_ends' % number])
+		if columnType == "none": return ["None"]*len(arrays['c%d_elements' % number])
+		data, isNone = arrays['c%d_values' % number], arrays['c%d_none' % number]
+		if declaredType == None or not self.matchesType(columnType, declaredType): return self.decodeColumn(columnType, data, isNone)
+		present = data.tolist()
+		present.reverse()
+		return [None if none else present.pop() for none in isNone.tolist()]
+
+	def decodeColumn(self, columnType, data, isNone):
+		"""Function to turn a typed column back in to the strings it was built from"""
+		if columnType == "bool": present = [["False", "True"][value] for value in data.tolist()]
+		elif columnType == "int" or columnType == "float": present = [str(value) for value in data.tolist()]
+		elif columnType.endswith("int"): present = [",".join(str(int(part)) for part in value) for value in data.tolist()]
+		else: present = [",".join(str(part) for part in value) for value in data.tolist()]
+		values = []
+		present.reverse()
+		for none in isNone.tolist():
+			values.append("None" if none else present.pop())
+		return values
+
+	def encode(self, root):
+		"""Function to turn a tree into the dictionary of arrays that is saved"""
+		tags = []
+		tagIds = {}
+		elementTags = []
+		parents = []
+		columns = {} #(parent tag, attribute name) : ([element index ...], [value ...])
+		rawAttributes = ([], [], []) #element, key, value - for anything that is not a name/value attribute element
+		texts = ([], [], []) #element, "text" or "tail", string
+		stack = [(root, -1, None)]
+		while stack:
+			element, parent, parentTag = stack.pop()
+			index = len(elementTags)
+			if element.tag not in tagIds:
+				tagIds[element.tag] = len(tags)
+				tags.append(element.tag)
+			elementTags.append(tagIds[element.tag])
+			parents.append(parent)
+			if element.tag == 'attribute' and sorted(element.attrib.keys()) == ['name', 'value']:
+				column = columns.setdefault((parentTag, element.attrib['name']), ([], []))
+				column[0].append(index)
+				column[1].append(element.attrib['value'])
+			else:
+				for key, value in element.attrib.items():
+					for entry, item in zip(rawAttributes, (index, key, value)): entry.append(item)
+			for kind in ("text", "tail"):
+				if getattr(element, kind) is not None:
+					for entry, item in zip(texts, (index, kind, getattr(element, kind))): entry.append(item)
+			ownerTag = parentTag if element.tag == 'attributes' else element.tag #attribute elements belong to the item above "attributes"
+			for child in reversed(list(element)): stack.append((child, index, ownerTag))
+
+		arrays = {'version' : np.array([self.version], dtype = np.int64), 
+				  'elementTags' : np.array(elementTags, dtype = np.int32),
+				  'parents' : np.array(parents, dtype = np.int32)}
+		arrays['tags'], arrays['tagEnds'] = self.packStrings(tags)
+		arrays['rawElements'] = np.array(rawAttributes[0], dtype = np.int32)
+		arrays['rawKeys'], arrays['rawKeyEnds'] = self.packStrings(rawAttributes[1])
+		arrays['rawValues'], arrays['rawValueEnds'] = self.packStrings(rawAttributes[2])
+		arrays['textElements'] = np.array(texts[0], dtype = np.int32)
+		arrays['textIsTail'] = np.array([kind == "tail" for kind in texts[1]], dtype = bool)
+		arrays['texts'], arrays['textEnds'] = self.packStrings(texts[2])
+		columnNames = []
+		columnTypes = []
+		for number, ((owner, name), (elements, values)) in enumerate(sorted(columns.items())):
+			columnType, data, isNone = self.encodeColumn(values, attributeTypes.get((owner, name)))
+			columnNames += [str(owner), name]
+			columnTypes.append(columnType)
+			arrays['c%d_elements' % number] = np.array(elements, dtype = np.int32)
+			if columnType == "str": arrays['c%d_values' % number], arrays['c%d_ends' % number] = self.packStrings(values)
+			elif columnType != "none":
+				arrays['c%d_values' % number] = data
+				arrays['c%d_none' % number] = isNone
+		arrays['columnNames'], arrays['columnNameEnds'] = self.packStrings(columnNames)
+		arrays['columnTypes'], arrays['columnTypeEnds'] = self.packStrings(columnTypes)
+		return arrays
+
+	def decode(self, arrays, typedTags = None):
+		"""Function to rebuild the tree from the dictionary of arrays that was saved
+
+		The attribute elements in the attributes block of items with tags in typedTags are not rebuilt. Their values
+		are handed over as a dictionary for each item element instead (see getAttributeValues()), typed wherever the
+		column has the type declared for the attribute, and as the strings they were written as otherwise.
+		"""
+		if int(arrays['version'][0]) > self.version:
+			print "TError: The binary file was written by a newer version, so it cannot be loaded"
+			return None
+		tags = self.unpackStrings(arrays['tags'], arrays['tagEnds'])
+		elementTags = arrays['elementTags']
+		parents = arrays['parents']
+		columnNames = self.unpackStrings(arrays['columnNames'], arrays['columnNameEnds'])
+		columnTypes = self.unpackStrings(arrays['columnTypes'], arrays['columnTypeEnds'])
+		typed = np.zeros(len(elementTags), dtype = bool) #The attribute elements that are handed over rather than rebuilt
+		if typedTags and 'attributes' in tags:
+			attributesTag = tags.index('attributes')
+			for number in range(len(columnTypes)):
+				if columnNames[2*number] not in typedTags: continue
+				indices = arrays['c%d_elements' % number]
+				typed[indices[elementTags[parents[indices]] == attributesTag]] = True
+		elements = [None]*len(elementTags)
+		tagIds = elementTags.tolist()
+		parentIds = parents.tolist()
+		for index in np.flatnonzero(~typed).tolist(): #Parents come before their children, and children in order
+			parent = parentIds[index]
+			if parent < 0: elements[index] = xml.Element(tags[tagIds[index]])
+			else: elements[index] = xml.SubElement(elements[parent], tags[tagIds[index]])
+		rawKeys = self.unpackStrings(arrays['rawKeys'], arrays['rawKeyEnds'])
+		rawValues = self.unpackStrings(arrays['rawValues'], arrays['rawValueEnds'])
+		for index, key, value in zip(arrays['rawElements'].tolist(), rawKeys, rawValues): 
+			if elements[index] is not None: elements[index].set(key, value)
+		texts = self.unpackStrings(arrays['texts'], arrays['textEnds'])
+		for index, isTail, text in zip(arrays['textElements'].tolist(), arrays['textIsTail'].tolist(), texts):
+			if elements[index] is None: continue
+			if isTail: elements[index].tail = text
+			else: elements[index].text = text
+		ownerValues = {} #item element index : {attribute name : value}
+		for number, columnType in enumerate(columnTypes):
+			owner, name = columnNames[2*number], columnNames[2*number + 1]
+			indices = arrays['c%d_elements' % number]
+			isTyped = typed[indices]
+			if isTyped.any():
+				values = self.columnValues(arrays, number, columnType, attributeTypes.get((owner, name)))
+				for handOver, item, value in zip(isTyped.tolist(), parents[parents[indices]].tolist(), values):
+					if handOver: ownerValues.setdefault(item, {})[name] = value
+				if isTyped.all(): continue
+			values = self.columnValues(arrays, number, columnType)
+			for index, handOver, value in zip(indices.tolist(), isTyped.tolist(), values): 
+				if handOver: continue
+				elements[index].set('name', name)
+				elements[index].set('value', value)
+		for item, values in ownerValues.items(): attributeValues[elements[item]] = values
+		if len(elements) == 0: return None
+		return elements[0]
+
+
+def fileManFor(fileName):
+	"""Function to return the file manager that reads and writes the given file - binary for .rig files, XML otherwise"""
+	if str(fileName).endswith(RigBinaryMan.extension): return RigBinaryMan()
+	return XMLMan()
+
+def convertRigFile(sourceFile, targetFile):
+	"""Function to convert a rig file between the XML and binary formats, picked from the file extensions"""
+	source = fileManFor(sourceFile)
+	source.setLoad(sourceFile)
+	if source.getTree() == None: return False
+	target = fileManFor(targetFile)
+	target.setTree(source.getTree())
+	target.setFile(targetFile)
+	target.save()
+	return True
+
 		
 
 
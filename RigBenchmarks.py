@@ -0,0 +1,741 @@
+#################################################################################################
+##RIG BENCHMARKS
+#
+##NOTES:  Timing scripts for the hot paths of the Rig Graphics View. Run this module directly
+##        (python RigBenchmarks.py) to print the results of every benchmark.
+#################################################################################################
+
+import sys
+import os
+import time
+import math
+import random
+import tempfile
+import copy
+import FileControl
+import xml.etree.ElementTree as xml
+from PyQt4 import QtCore, QtGui
+
+#######Project python imports################################################
+from ControlItems import *
+from RigUIControls import RigGraphicsView
+from RigStore import FaceGVCapture
+
+
+#################################CLASSES & FUNCTIONS FOR TIMING##################################################################################
+
+
+def timeCall(func, repeats = 100):
+    """Function to return the average time in milliseconds that a call takes"""
+    start = time.time()
+    for i in range(repeats):
+        func()
+    return 1000.0*(time.time() - start)/repeats
+
+def buildTestNodes(nodeCount, radius = 200.0):
+    """Function to build a row of Nodes laid out around an arc, like a lip wire"""
+    nodes = []
+    for index in range(nodeCount):
+        angle = math.pi*index/float(nodeCount - 1)
+        node = Node(QtCore.QPointF(250 + radius*math.cos(angle), 250 + 0.5*radius*math.sin(angle)))
+        node.setIndex(index)
+        node.setFlag(QtGui.QGraphicsItem.ItemSendsGeometryChanges, False) #The benchmarks drive the curve updates themselves
+        nodes.append(node)
+    return nodes
+
+def legacyBuildCurve(curve):
+    """The segment by segment RigCurve build, using a RigCurveInfo for every segment, kept as a reference"""
+    nodeList = curve.nodeList
+    path = QtGui.QPainterPath()
+    curveInfo = RigCurveInfo(nodeList[0],nodeList[1],nodeList[2])
+    startPoint = curveInfo.getStartPos()
+    endPoint = curveInfo.getEndPos()
+    cP1 = startPoint + curve.handlescale*curveInfo.getDirVec() - curveInfo.getDirDist()*curveInfo.getperpUnitVec()*curve.curveSwing*curveInfo.getPerpSwing()
+    cP2 = startPoint + (1-curve.handlescale)*curveInfo.getDirVec() - curveInfo.getDirDist()*curveInfo.getperpUnitVec()*curve.curveSwing*curveInfo.getPerpSwing()
+    nodeList[0]().setBezierHandles(cP1, 1)
+    nodeList[1]().setBezierHandles(cP2, 0)
+    cPNext = (endPoint - cP2)*curve.secondHandleScale*curveInfo.getTargetNodeDist()/curveInfo.getDirDist() + endPoint
+    nodeList[1]().setBezierHandles(cPNext, 1)
+    path.moveTo(QPVec(startPoint))
+    path.cubicTo(QPVec(cP1),QPVec(cP2),QPVec(endPoint))
+    for index,node in enumerate(nodeList[1:-2]):
+        curveInfo = RigCurveInfo(node,nodeList[index+2],nodeList[index+3])
+        startPoint = curveInfo.getStartPos()
+        endPoint = curveInfo.getEndPos()
+        cP1 = node().getBezierHandles(1)
+        cP2 = startPoint + (1-curve.handlescale)*curveInfo.getDirVec() - curveInfo.getDirDist()*curveInfo.getperpUnitVec()*curve.curveSwing*curveInfo.getPerpSwing()
+        nodeList[index+2]().setBezierHandles(cP2, 0)
+        cPNext = (endPoint - cP2)*curve.secondHandleScale*curveInfo.getTargetNodeDist()/curveInfo.getDirDist() + endPoint
+        nodeList[index+2]().setBezierHandles(cPNext, 1)
+        path.cubicTo(QPVec(cP1),QPVec(cP2),QPVec(endPoint))
+    curveInfo = RigCurveInfo(nodeList[-1],nodeList[-2],nodeList[-3])
+    startPoint = curveInfo.getStartPos()
+    cP2 = startPoint + curve.handlescale*curveInfo.getDirVec() - curveInfo.getDirDist()*curveInfo.getperpUnitVec()*curve.curveSwing*curveInfo.getPerpSwing()
+    cP1 = nodeList[-2]().getBezierHandles(1)
+    nodeList[-1]().setBezierHandles(cP2, 0)
+    path.cubicTo(QPVec(cP1),QPVec(cP2),QPVec(startPoint))
+    return path
+
+def collectHandles(nodes):
+    """Function to copy out the Bezier handles of the nodes, so that two builds can be compared"""
+    handles = []
+    for node in nodes:
+        handles.append([None if h is None else np.array(h) for h in node.bezierHandles])
+    return handles
+
+def benchCurveSolver(nodeCounts = (5, 10, 30, 60, 120), repeats = 200):
+    """Benchmark of the batched Bezier solver in RigCurve.buildCurve against the segment by segment loop"""
+    print "RigCurve.buildCurve - segment loop vs batched solver"
+    for nodeCount in nodeCounts:
+        nodes = buildTestNodes(nodeCount)
+        curve = RigCurve(QtGui.QColor(0,0,0), nodes)
+        legacyBuildCurve(curve)
+        legacyHandles = collectHandles(nodes)
+        curve.buildCurve()
+        for legacy, batched in zip(legacyHandles, collectHandles(nodes)):
+            for a, b in zip(legacy, batched):
+                if (a is None) != (b is None) or (a is not None and not np.allclose(a, b)):
+                    print "WARNING : BATCHED HANDLES DO NOT MATCH THE SEGMENT LOOP"
+        legacyTime = timeCall(lambda: legacyBuildCurve(curve), repeats)
+        batchedTime = timeCall(curve.buildCurve, repeats)
+        print "    %4d nodes : loop %8.3f ms   batched %8.3f ms   (x%.1f)" % (nodeCount, legacyTime, batchedTime, legacyTime/batchedTime)
+
+def benchIncrementalDrag(nodeCounts = (10, 30, 60, 120, 240), repeats = 200):
+    """Benchmark of dragging one node on a long wire - a full rebuild against the dirty segment update"""
+    print "RigCurve drag of one node - full rebuild vs dirty segment update"
+    for nodeCount in nodeCounts:
+        nodes = buildTestNodes(nodeCount)
+        curve = RigCurve(QtGui.QColor(0,0,0), nodes)
+        dragNode = nodes[nodeCount/2]
+        offsets = [QtCore.QPointF(1,0), QtCore.QPointF(-1,0)]
+        def drag(incremental):
+            dragNode.setPos(dragNode.pos() + offsets[0])
+            offsets.reverse()
+            if incremental: curve.setNodeDirty(dragNode)
+            curve.buildCurve()
+        fullTime = timeCall(lambda: drag(False), repeats)
+        incrementalTime = timeCall(lambda: drag(True), repeats)
+        print "    %4d nodes : full %8.3f ms   dirty segments %8.3f ms" % (nodeCount, fullTime, incrementalTime)
+
+def buildSkinnedWire(nodeCount, pinCount, radius = 200.0):
+    """Function to build a wire of pins, nodes and ties with a SuperNode skinned to the first pinCount pins"""
+    nodes = []
+    pins = []
+    for index in range(nodeCount):
+        angle = math.pi*index/float(nodeCount - 1)
+        pin = ControlPin(QtCore.QPointF(250 + radius*math.cos(angle), 250 + 0.5*radius*math.sin(angle)))
+        pin.setIndex(index)
+        node = Node(QtCore.QPointF(0,0))
+        node.setIndex(index)
+        node.setFlag(QtGui.QGraphicsItem.ItemSendsGeometryChanges, False) #The benchmarks drive the updates themselves
+        node.setPin(pin)
+        pin.setNode(node)
+        pinTie = PinTie(node, pin)
+        node.setPinTie(pinTie)
+        pin.setPinTie(pinTie)
+        pins.append(pin)
+        nodes.append(node)
+    curve = RigCurve(QtGui.QColor(0,0,0), nodes)
+    superPin = ControlPin(QtCore.QPointF(250,250))
+    superNode = SuperNode(QtCore.QPointF(0,0))
+    superNode.setFlag(QtGui.QGraphicsItem.ItemSendsGeometryChanges, False)
+    superNode.setPin(superPin)
+    for pin in pins[:pinCount]:
+        skinInfo = SkinningPinInfo()
+        skinInfo.setSuperNode(superNode)
+        skinInfo.setPin(pin)
+        skinInfo.setSkinValue(0.5)
+        superNode.addSkinnedPin(skinInfo)
+    return superNode, nodes, pins, curve
+
+def benchSkinnedDrag(pinCounts = (5, 10, 20, 40), nodeCount = 40, repeats = 100):
+    """Benchmark of one SuperNode drag moving many pins on one wire - an update per pin against one graph evaluation"""
+    print "SuperNode drag of skinned pins - update per pin vs RigDependencyGraph evaluation"
+    for pinCount in pinCounts:
+        superNode, nodes, pins, curve = buildSkinnedWire(nodeCount, pinCount)
+        offsets = [QtCore.QPointF(1,0), QtCore.QPointF(-1,0)]
+        graph = RigDependencyGraph()
+        def drag(useGraph):
+            superNode.setPos(superNode.pos() + offsets[0])
+            offsets.reverse()
+            if useGraph:
+                graph.setDirty(superNode)
+                graph.evaluate()
+                return
+            for skinPin in superNode.getSkinnedPins():
+                skinPin.update()
+                skinPin.getPin().getPinTie().drawTie()
+                curve.setNodeDirty(skinPin.getPin().getNode())
+                curve.buildCurve()
+        perPinTime = timeCall(lambda: drag(False), repeats)
+        graphTime = timeCall(lambda: drag(True), repeats)
+        counts = ", ".join("%s %d" % (name, count/graph.evaluations) for name, count in sorted(graph.getEvalCounts().items()))
+        print "    %4d pins : per pin %8.3f ms   graph %8.3f ms   evaluations per drag : %s" % (pinCount, perPinTime, graphTime, counts)
+
+def benchSkinningDeformation(pinCounts = (10, 40, 160, 640), repeats = 100):
+    """Benchmark of the SuperNode skinning deformation alone - SkinningPinInfo.update() per pin against the batched arrays"""
+    print "SuperNode skinning deformation - per pin update vs batched arrays"
+    for pinCount in pinCounts:
+        superNode, nodes, pins, curve = buildSkinnedWire(pinCount, pinCount)
+        superNode.setPos(QtCore.QPointF(10,5))
+        def perPin():
+            for skinPin in superNode.getSkinnedPins(): skinPin.update()
+        perPinTime = timeCall(perPin, repeats)
+        batchedTime = timeCall(superNode.evaluate, repeats)
+        print "    %4d pins : per pin %8.3f ms   batched %8.3f ms" % (pinCount, perPinTime, batchedTime)
+
+def buildPickScene(markerCount, nodeCount, size = 1000.0):
+    """Function to build a RigGraphicsScene scattered with GuideMarkers, and Nodes on their pins"""
+    random.seed(1)
+    scene = RigGraphicsScene()
+    scene.setSceneRect(0, 0, size, size)
+    scene.setGridClasses([Node, SuperNode])
+    for index in range(markerCount):
+        marker = GuideMarker()
+        marker.setPos(random.uniform(0, size), random.uniform(0, size))
+        scene.addItem(marker)
+    for index in range(nodeCount):
+        pin = ControlPin(QtCore.QPointF(random.uniform(0, size), random.uniform(0, size)))
+        scene.addItem(pin)
+        node = Node(QtCore.QPointF(0,0))
+        node.setPin(pin)
+        pin.setNode(node)
+    return scene
+
+def benchPicking(itemCounts = ((4000, 1000), (8000, 2000)), picks = 500):
+    """Benchmark of picking items under a point with each of the scene index strategies"""
+    print "RigGraphicsScene pick latency - per pick, for all items and for Nodes only"
+    for markerCount, nodeCount in itemCounts:
+        scene = buildPickScene(markerCount, nodeCount)
+        points = [QtCore.QPointF(random.uniform(0, 1000), random.uniform(0, 1000)) for index in range(picks)]
+        for strategy in RigGraphicsScene.indexStrategies:
+            scene.setIndexStrategy(strategy)
+            scene.pickItems(points[0]) #Let Qt build its index before timing
+            allTime = timeCall(lambda: [scene.pickItems(point) for point in points], 3)/picks
+            nodeTime = timeCall(lambda: [scene.pickItems(point, [Node]) for point in points], 3)/picks
+            print "    %5d items %-15s : all items %7.4f ms   nodes %7.4f ms" % (markerCount + 2*nodeCount, strategy, allTime, nodeTime)
+
+def benchDragIndex(wireCounts = (12, 48), steps = 200):
+    """Benchmark of the index upkeep in a Node drag step with each of the scene index strategies
+
+    Qt's BSP tree holds every item whatever the strategy, so each step moves the Node, its ties and its curve in the
+    BSP tree as well as in the grid. Each step is a move, then a pick of all items (which brings Qt's index up to date,
+    as the next paint would), then a pick of Nodes under the dragged Node.
+    """
+    print "Node drag step - index upkeep per step, for each scene index strategy"
+    for wireCount in wireCounts:
+        scene, rigItems = buildFaceRigScene(wireCount = wireCount)
+        scene.setGridClasses([Node, SuperNode])
+        node = rigItems[0][1][len(rigItems[0][1])/2]
+        offsets = [QtCore.QPointF(3,2), QtCore.QPointF(-3,-2)]
+        def dragStep():
+            node.setPos(node.pos() + offsets[0])
+            offsets.reverse()
+            scene.items(node.scenePos())
+            scene.pickItems(node.scenePos(), [Node])
+        for strategy in RigGraphicsScene.indexStrategies:
+            scene.setIndexStrategy(strategy)
+            scene.items(QtCore.QPointF(0,0)) #Let Qt build its index before timing
+            stepTime = timeCall(dragStep, steps)
+            print "    %5d items %-15s : %7.4f ms per drag step" % (len(scene.items()), strategy, stepTime)
+
+def buildFaceRigScene(wireCount = 12, nodeCount = 12, markerCount = 150, size = 1000.0):
+    """Function to build a RigGraphicsScene laid out like a full face rig - wires of pins, nodes, ties and curves, SuperNodes and markers"""
+    random.seed(1)
+    scene = RigGraphicsScene()
+    scene.setSceneRect(0, 0, size, size)
+    rigItems = []
+    for wire in range(wireCount):
+        superNode, nodes, pins, curve = buildSkinnedWire(nodeCount, nodeCount/2, radius = 60.0)
+        offset = QtCore.QPointF(random.uniform(0, size - 500), random.uniform(0, size - 500))
+        for pin in pins + [superNode.getPin()]:
+            pin.setPos(pin.pos() + offset)
+            scene.addItem(pin)
+        for item in [node.getPinTie() for node in nodes] + [curve]: scene.addItem(item)
+        for pinTie in [node.getPinTie() for node in nodes]: pinTie.drawTie()
+        curve.buildCurve()
+        superNode.setForm(["Arrow_4Point", "Arrow_sidePoint", "Default"][wire%3])
+        nodes[0].setSelected(True)
+        rigItems.append((superNode, nodes, pins, curve))
+    for index in range(markerCount):
+        marker = GuideMarker()
+        marker.setPos(random.uniform(0, size), random.uniform(0, size))
+        marker.setGuideColourIndex(index%18)
+        marker.setActive(index%4 == 0)
+        scene.addItem(marker)
+    return scene, rigItems
+
+def benchRepaint(repeats = 20):
+    """Benchmark of repainting a whole face rig - pens and gradients built for every paint against the shared RigStyleCache"""
+    print "Full face rig repaint - styles rebuilt every paint vs shared RigStyleCache"
+    scene, rigItems = buildFaceRigScene()
+    items = scene.items()
+    image = QtGui.QImage(1000, 1000, QtGui.QImage.Format_ARGB32_Premultiplied)
+    def repaint(rebuild):
+        if rebuild: #Throw every style away, so that each item builds its pens and gradients again, as it did before the cache
+            rigStyleCache.clear()
+            for item in items: 
+                if isinstance(item, RigStyledItem): item.style = None
+        painter = QtGui.QPainter(image)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        scene.render(painter)
+        painter.end()
+    rebuildTime = timeCall(lambda: repaint(True), repeats)
+    builds = rigStyleCache.builds
+    cachedTime = timeCall(lambda: repaint(False), repeats)
+    print "    %5d items : rebuilt %8.3f ms   cached %8.3f ms   (%d shared styles, %d builds while cached)" % (len(items), rebuildTime, cachedTime, len(rigStyleCache), rigStyleCache.builds - builds)
+
+def benchPaintEvents(steps = 50):
+    """Benchmark of the paint() calls for each step of a Node drag in a shown view - geometry invalidated in paint against cached bounding rects"""
+    print "Paint calls per Node drag step - prepareGeometryChange() in paint vs cached bounding rects"
+    app = QtGui.QApplication.instance()
+    scene, rigItems = buildFaceRigScene()
+    view = QtGui.QGraphicsView(scene)
+    view.resize(1000, 1000)
+    view.show()
+    dragNode = rigItems[0][1][3]
+    paintedClasses = [Node, SuperNode, ControlPin, GuideMarker, PinTie, RigCurve]
+    counts = {}
+    def countedPaint(cls, paint, invalidate):
+        def counted(self, painter, option, widget):
+            counts[cls.__name__] = counts.get(cls.__name__, 0) + 1
+            if invalidate: self.prepareGeometryChange() #As Node.paint used to
+            return paint(self, painter, option, widget)
+        return counted
+    for invalidate in (True, False):
+        originals = [(cls, cls.__dict__['paint']) for cls in paintedClasses]
+        for cls, paint in originals: setattr(cls, 'paint', countedPaint(cls, paint, invalidate and cls == Node))
+        app.processEvents()
+        counts.clear()
+        start = time.time()
+        for step in range(steps):
+            dragNode.setPos(dragNode.pos() + QtCore.QPointF([-1, 1][step%2], 0))
+            app.processEvents()
+        stepTime = 1000.0*(time.time() - start)/steps
+        for cls, paint in originals: setattr(cls, 'paint', paint)
+        paints = ", ".join("%s %.1f" % (name, count/float(steps)) for name, count in sorted(counts.items()))
+        print "    %-24s : %7.1f paints per step  %8.3f ms per step   (%s)" % (["cached bounding rects", "invalidated in paint"][invalidate], sum(counts.values())/float(steps), stepTime, paints)
+    view.close()
+
+def benchBackground(imagePath = "images/Characters/MangaFace.png", repeats = 50):
+    """Benchmark of drawing the background - the image read from disk for every draw against the RigBackgroundCache"""
+    print "Background draw - QPixmap read every draw vs RigBackgroundCache (visible tiles, mip levels)"
+    cache = RigBackgroundCache(asynchronous = False)
+    cache.setImage(imagePath)
+    if not cache.isValid(): 
+        print "WARNING : BACKGROUND BENCHMARK IMAGE CANNOT BE READ : " + imagePath
+        return
+    size = cache.getSize()
+    image = QtGui.QImage(size.width(), size.height(), QtGui.QImage.Format_ARGB32_Premultiplied)
+    fullRect = QtCore.QRectF(0, 0, size.width(), size.height())
+    exposedRect = QtCore.QRectF(size.width()/3, size.height()/3, 60, 60) #Roughly what a Node drag exposes
+    def draw(cached, rect, viewScale):
+        painter = QtGui.QPainter(image)
+        painter.scale(viewScale, viewScale)
+        if cached: cache.draw(painter, rect)
+        else: painter.drawPixmap(rect, QtGui.QPixmap(imagePath), rect)
+        painter.end()
+    for viewScale in (1.0, 0.25):
+        for name, rect in (("full view", fullRect), ("node drag", exposedRect)):
+            readTime = timeCall(lambda: draw(False, rect, viewScale), repeats)
+            cachedTime = timeCall(lambda: draw(True, rect, viewScale), repeats)
+            print "    scale %.2f %-10s : read every draw %8.3f ms   cached %8.3f ms   (level %d)" % (viewScale, name, readTime, cachedTime, cache.getLevel(viewScale))
+
+def buildLargePlate(imagePath, size):
+    """Function to write out a large test plate, standing in for a scanned face plate, in the format of the file extension"""
+    image = QtGui.QImage(size, size, QtGui.QImage.Format_RGB32)
+    painter = QtGui.QPainter(image)
+    gradient = QtGui.QLinearGradient(0, 0, size, size)
+    gradient.setColorAt(0, QtGui.QColor(250,220,200))
+    gradient.setColorAt(1, QtGui.QColor(120,80,60))
+    painter.fillRect(image.rect(), QtGui.QBrush(gradient))
+    painter.setPen(QtGui.QPen(QtCore.Qt.black, 4))
+    for offset in range(0, size, 256): 
+        painter.drawLine(offset, 0, offset, size)
+        painter.drawLine(0, offset, size, offset)
+    painter.end()
+    image.save(imagePath)
+
+def benchTiledBackground(plateSize = 8192, viewSize = 1000, frames = 20, memoryCap = 64*1024*1024):
+    """Benchmark of panning across a very large background plate at several zoom levels with the tiled RigBackgroundCache
+
+    Each pan is run again with twice the frames. Fails if a PNG plate is decoded whole more than once for any block
+    of tiles in a pan, as the number of those decodes would then grow with the number of frames.
+    """
+    print "Tiled background - %dx%d plate panned in a %dx%d view, %d MB cap" % (plateSize, plateSize, viewSize, viewSize, memoryCap/(1024*1024))
+    import tempfile
+    image = QtGui.QImage(viewSize, viewSize, QtGui.QImage.Format_ARGB32_Premultiplied)
+    for extension in ("jpg", "png"): #PNG tiles are cut a block at a time from a whole decoded source
+        imagePath = os.path.join(tempfile.mkdtemp(), "plate." + extension)
+        buildLargePlate(imagePath, plateSize)
+        cache = RigBackgroundCache(memoryCap = memoryCap, asynchronous = False)
+        headerTime = timeCall(lambda: (cache.clear(), cache.setImage(imagePath)), 1)
+        print "    %s : setImage %8.3f ms, %d levels" % (extension, headerTime, cache.levelCount)
+        for viewScale in (1.0, 0.5, 0.125):
+            sceneSize = viewSize/viewScale
+            peakMemory = [0]
+            def pan(frame, step):
+                painter = QtGui.QPainter(image)
+                painter.scale(viewScale, viewScale)
+                painter.translate(-frame*step, -frame*step)
+                cache.draw(painter, QtCore.QRectF(frame*step, frame*step, sceneSize, sceneSize))
+                painter.end()
+                peakMemory[0] = max(peakMemory[0], cache.memory)
+            sourceDecodes = []
+            for frameCount in (2*frames, frames): #The timings are of the last run, with frames
+                cache.clearTiles()
+                firstDecode = cache.decoder.sourceDecodes
+                step = (plateSize - sceneSize)/float(frameCount)
+                frameTimes = [timeCall(lambda: pan(frame, step), 1) for frame in range(frameCount)]
+                sourceDecodes.append(cache.decoder.sourceDecodes - firstDecode)
+                if cache.blockDecodes and max(cache.blockDecodes.values()) > 1:
+                    raise RuntimeError("%s plate decoded again for a block it had already cut, panning over %d frames at scale %.3f" % (extension, frameCount, viewScale))
+            redrawTime = timeCall(lambda: pan(frames - 1, step), 5) #The tiles of the last frame are all cached
+            print "    scale %.3f : first draw %8.3f ms   mean pan frame %8.3f ms   cached redraw %8.3f ms   %4d decodes   %3d whole image decodes (%d over %d frames)   %6.1f MB held (peak %6.1f MB)" % (viewScale, frameTimes[0], sum(frameTimes)/frames, redrawTime, cache.decodes, sourceDecodes[1], sourceDecodes[0], 2*frames, cache.memory/(1024.0*1024.0), peakMemory[0]/(1024.0*1024.0))
+        cache.clear()
+        os.remove(imagePath)
+
+def benchAsyncBackground(plateSize = 8192, viewSize = 1000):
+    """Benchmark of the time the UI thread is held up opening a large plate - decoding as it is drawn against the worker thread"""
+    print "Opening a %dx%d plate - UI thread time with tiles decoded as drawn vs on the RigTileDecoder thread" % (plateSize, plateSize)
+    import tempfile
+    app = QtGui.QApplication.instance()
+    for extension in ("jpg", "png"):
+        imagePath = os.path.join(tempfile.mkdtemp(), "plate." + extension)
+        buildLargePlate(imagePath, plateSize)
+        image = QtGui.QImage(viewSize, viewSize, QtGui.QImage.Format_ARGB32_Premultiplied)
+        viewScale = float(viewSize)/plateSize
+        def openPlate(cache):
+            cache.setImage(imagePath)
+            painter = QtGui.QPainter(image)
+            painter.scale(viewScale, viewScale)
+            cache.draw(painter, QtCore.QRectF(0, 0, plateSize, plateSize))
+            painter.end()
+        syncTime = timeCall(lambda: openPlate(RigBackgroundCache(asynchronous = False)), 1)
+        cache = RigBackgroundCache()
+        asyncTime = timeCall(lambda: openPlate(cache), 1)
+        start = time.time()
+        while cache.isPending() or cache.placeholder is None: app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+        readyTime = 1000.0*(time.time() - start)
+        openPlate(cache) #Ask for the tiles of the view, now that the placeholder is up
+        start = time.time()
+        while cache.isPending(): app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+        tilesTime = readyTime + 1000.0*(time.time() - start)
+        cache.decoder.stop()
+        print "    %s : decoded as drawn %8.3f ms   worker thread - UI held %8.3f ms, placeholder after %8.3f ms, view tiles after %8.3f ms" % (extension, syncTime, asyncTime, readyTime, tilesTime)
+        os.remove(imagePath)
+
+
+def benchItemCache(markerCounts = (150, 1000, 4000), frames = 30):
+    """Benchmark of the frame time of a shown view over a dense marker layout with each of the item cache modes"""
+    print "Frame time over dense marker layouts - repaints and pans, for each item cache mode"
+    app = QtGui.QApplication.instance()
+    for markerCount in markerCounts:
+        scene, rigItems = buildFaceRigScene(markerCount = markerCount)
+        scene.setCacheClasses([GuideMarker, ControlPin, PinTie, ReflectionLine])
+        view = QtGui.QGraphicsView(scene)
+        view.setRenderHint(QtGui.QPainter.Antialiasing)
+        view.resize(600, 600)
+        view.show()
+        for mode in ["NoCache", "ItemCoordinateCache", "DeviceCoordinateCache"]:
+            scene.setCacheMode(mode)
+            view.viewport().repaint() #Fill the caches before timing
+            app.processEvents()
+            repaintTime = timeCall(view.viewport().repaint, frames)
+            centres = [QtCore.QPointF(300 + 10*(frame%40), 300 + 5*(frame%40)) for frame in range(frames)]
+            def pan():
+                view.centerOn(centres.pop())
+                view.viewport().repaint()
+            panTime = timeCall(pan, frames)
+            print "    %5d markers %-22s : repaint %8.3f ms   pan %8.3f ms" % (markerCount, mode, repaintTime, panTime)
+        view.close()
+
+def benchDetailLevels(zooms = (0.1, 0.2, 0.45, 1.0), repeats = 20):
+    """Benchmark of repainting a whole face rig zoomed out - full detail at every zoom against the RigDetailLevels"""
+    print "Zoomed out face rig repaint - full detail vs level of detail representations"
+    scene, rigItems = buildFaceRigScene(markerCount = 1000)
+    image = QtGui.QImage(1000, 1000, QtGui.QImage.Format_ARGB32_Premultiplied)
+    def repaint(zoom):
+        painter = QtGui.QPainter(image)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.scale(zoom, zoom)
+        scene.render(painter, scene.sceneRect(), scene.sceneRect())
+        painter.end()
+    for zoom in zooms:
+        rigDetailLevels.setEnabled(False)
+        fullTime = timeCall(lambda: repaint(zoom), repeats)
+        rigDetailLevels.setEnabled(True)
+        detailTime = timeCall(lambda: repaint(zoom), repeats)
+        print "    zoom %5.2f : full detail %8.3f ms   level of detail %8.3f ms" % (zoom, fullTime, detailTime)
+
+def benchPinConstruction(pinCounts = (40, 400), repeats = 20):
+    """Benchmark of building ControlPins - the stylesheet read for every pin, as it used to be, against the shared RigResources"""
+    print "ControlPin construction - stylesheet read per pin vs shared RigResources"
+    def readPerPin(count):
+        for index in range(count):
+            with open(RigResources.defaultStyleSheet, 'r') as handle: styleData = handle.read() #As ControlPin.__init__ used to
+            ControlPin(QtCore.QPointF(index, 0))
+    def shared(count):
+        for index in range(count):
+            ControlPin(QtCore.QPointF(index, 0))
+        rigResources.getStyleSheet()
+    for pinCount in pinCounts:
+        readTime = timeCall(lambda: readPerPin(pinCount), repeats)
+        reads = rigResources.reads
+        sharedTime = timeCall(lambda: shared(pinCount), repeats)
+        print "    %5d pins : read per pin %8.3f ms   shared %8.3f ms   (%d reads while shared)" % (pinCount, readTime, sharedTime, rigResources.reads - reads)
+
+def benchMarkerLabels(markerCount = 2000, repeats = 20):
+    """Benchmark of repainting active GuideMarkers - index labels laid out with drawText() every paint against the shared RigLabelCache"""
+    print "Active marker repaint - drawText() every paint vs cached QStaticText labels"
+    random.seed(1)
+    scene = RigGraphicsScene()
+    scene.setSceneRect(0, 0, 1000, 1000)
+    for index in range(markerCount):
+        marker = GuideMarker()
+        marker.setPos(random.uniform(0, 1000), random.uniform(0, 1000))
+        marker.setActive(True)
+        marker.setActiveIndex(index%50)
+        scene.addItem(marker)
+    image = QtGui.QImage(1000, 1000, QtGui.QImage.Format_ARGB32_Premultiplied)
+    def legacyDrawActiveIndex(self, painter):
+        if self.active:
+            painter.setPen(QtGui.QPen(QtGui.QColor(180,180,180,255*self.alpha), 1, QtCore.Qt.SolidLine))
+            painter.setFont(QtGui.QFont('Arial', 9))
+            painter.drawText(self.scale*12,self.scale*21,str(self.activeIndex))
+    def repaint():
+        painter = QtGui.QPainter(image)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        scene.render(painter)
+        painter.end()
+    drawActiveIndex = GuideMarker.__dict__['drawActiveIndex']
+    GuideMarker.drawActiveIndex = legacyDrawActiveIndex
+    textTime = timeCall(repaint, repeats)
+    GuideMarker.drawActiveIndex = drawActiveIndex
+    labelTime = timeCall(repaint, repeats)
+    print "    %5d markers : drawText %8.3f ms   static text %8.3f ms   (%d shared labels)" % (markerCount, textTime, labelTime, len(rigLabelCache))
+
+def buildScaledRigFile(xmlPath, copies, sourcePath = "faceFiles/test.xml"):
+    """Function to write an XML rig file holding the scene items of the source file repeated a number of times"""
+    source = FileControl.XMLMan()
+    source.setLoad(sourcePath)
+    root = source.getTree()
+    sceneItems = root.find('sceneItems')
+    items = list(sceneItems)
+    for index in range(copies - 1):
+        for item in items: sceneItems.append(copy.deepcopy(item))
+    target = FileControl.XMLMan()
+    target.setTree(root)
+    target.setFile(xmlPath)
+    target.save()
+    return len(list(sceneItems))
+
+class AttributeSink():
+    """Stand in item for the attribute schemas to read in to, with every setter doing nothing"""
+    def __getattr__(self, name):
+        return lambda *args: None
+
+def benchRigFileFormats(copies = 1000, repeats = 3):
+    """Benchmark of loading and saving a large rig file as XML and in the binary format, checking the round trip is lossless
+
+    The stream load reads every item through its attribute schema, as FaceGVCapture.read() does - parsing the strings
+    for XML, and taking the typed column values for the binary format.
+    """
+    print "Rig file load/save - XML vs binary (.rig), test.xml scaled %dx" % copies
+    directory = tempfile.mkdtemp()
+    xmlPath = os.path.join(directory, "scaled.xml")
+    rigPath = os.path.join(directory, "scaled" + FileControl.RigBinaryMan.extension)
+    itemCount = buildScaledRigFile(xmlPath, copies)
+    FileControl.convertRigFile(xmlPath, rigPath)
+    schemas = dict((value.schema.getTag(), value.schema) for value in globals().values() if isinstance(getattr(value, 'schema', None), RigAttributeSchema))
+    sink = AttributeSink()
+    def readItem(element):
+        for child in element.iter():
+            if child.tag in schemas: schemas[child.tag].read(sink, child)
+    builders = dict((tag, readItem) for tag in schemas)
+    results = []
+    for path in (xmlPath, rigPath):
+        fileMan = FileControl.fileManFor(path)
+        loadTime = timeCall(lambda: fileMan.setLoad(path), repeats)
+        streamTime = timeCall(lambda: FileControl.fileManFor(path).streamLoad(path, builders), repeats)
+        fileMan.setFile(os.path.join(directory, "saved" + os.path.splitext(path)[1]))
+        saveTime = timeCall(fileMan.save, repeats)
+        results.append((path, loadTime, streamTime, saveTime, xml.tostring(fileMan.getTree())))
+    for path, loadTime, streamTime, saveTime, text in results:
+        print "    %5d items %-6s : load %9.1f ms   stream + read %9.1f ms   save %9.1f ms   %8.1f KB" % (itemCount, os.path.splitext(path)[1], loadTime, streamTime, saveTime, os.path.getsize(path)/1024.0)
+    print "    binary file size : %.2fx the XML file" % (os.path.getsize(rigPath)/float(os.path.getsize(xmlPath)))
+    print "    full tree load (setLoad, as convertRigFile uses) : binary %.2fx the time of XML" % (results[1][1]/results[0][1])
+    singleRigPath = os.path.join(directory, "single" + FileControl.RigBinaryMan.extension) #The per column arrays cost more than they save on a small file
+    FileControl.convertRigFile("faceFiles/test.xml", singleRigPath)
+    singleXMLSize, singleRigSize = os.path.getsize("faceFiles/test.xml"), os.path.getsize(singleRigPath)
+    print "    unscaled test.xml : XML %d bytes   binary %d bytes (%.2fx)" % (singleXMLSize, singleRigSize, singleRigSize/float(singleXMLSize))
+    print "    lossless round trip : " + str(results[0][4] == results[1][4])
+
+def benchStreamingLoad(copies = 1000, repeats = 3):
+    """Benchmark of walking a large rig file - whole tree parse and findBranch() per item type against XMLMan.streamLoad()"""
+    print "Rig XML load - parse and findBranch per type vs single pass streamLoad, test.xml scaled %dx" % copies
+    xmlPath = os.path.join(tempfile.mkdtemp(), "scaled.xml")
+    itemCount = buildScaledRigFile(xmlPath, copies)
+    itemTypes = ["viewSettings", "ReflectionLine", "GuideMarker", "WireGroup", "SuperNodeGroup"]
+    found = {}
+    def parseAndFind():
+        fileMan = FileControl.XMLMan()
+        fileMan.setLoad(xmlPath)
+        for itemType in itemTypes: found[itemType] = len(fileMan.findBranch(itemType))
+        return fileMan
+    def stream():
+        fileMan = FileControl.XMLMan()
+        builders = dict((itemType, lambda element: None) for itemType in itemTypes)
+        fileMan.streamLoad(xmlPath, builders)
+        return fileMan
+    for name, load in (("parse + findBranch", parseAndFind), ("streamLoad", stream)):
+        loadTime = timeCall(load, repeats)
+        heldElements = len(list(load().getTree().iter())) #Elements still held once the load has finished
+        print "    %5d items %-20s : %9.1f ms   %8d elements held" % (itemCount, name, loadTime, heldElements)
+
+class LegacyXMLMan(FileControl.XMLMan):
+    """XMLMan with findBranch() as it was - the whole tree searched recursively for every call"""
+    def findBranch(self, tName):
+        self.setMarkedBranches([])
+        self.iterFindBranch(self.tree, tName)
+        return self.markedBranches
+
+def buildMarkerRigFile(xmlPath, markerCount, size = 1000.0):
+    """Function to write an XML rig file with a Reflection Line and a large number of GuideMarkers"""
+    random.seed(1)
+    root = xml.Element('faceRigGraphicsView')
+    viewSettings = xml.SubElement(root, 'viewSettings')
+    xml.SubElement(viewSettings, 'attribute', name = 'backgroundImage', value = 'None')
+    xml.SubElement(viewSettings, 'attribute', name = 'markerCount', value = str(markerCount))
+    sceneItems = xml.SubElement(root, 'sceneItems')
+    sceneItems.append(ReflectionLine(size, size).store())
+    for index in range(markerCount):
+        marker = GuideMarker()
+        marker.setIndex(index + 1)
+        marker.setPos(random.uniform(0, size), random.uniform(0, size))
+        sceneItems.append(marker.store())
+    fileMan = FileControl.XMLMan()
+    fileMan.setTree(root)
+    fileMan.setFile(xmlPath)
+    fileMan.save()
+
+def benchCaptureRead(markerCount = 10000, repeats = 3):
+    """Benchmark of FaceGVCapture.read() on a file of 10k markers - recursive findBranch, indexed findBranch and streamLoad()"""
+    print "FaceGVCapture read - %d markers, recursive findBranch vs indexed findBranch vs streamed" % markerCount
+    xmlPath = os.path.join(tempfile.mkdtemp(), "markers.xml")
+    buildMarkerRigFile(xmlPath, markerCount)
+    view = RigGraphicsView(None, None, "", None)
+    capture = FaceGVCapture(view, None)
+    capture.setXMLFile(xmlPath)
+    def readByBranch(fileMan):
+        """Read the file as FaceGVCapture.read() did before it was streamed - one findBranch() per item type"""
+        capture.view.clear(isReflectionLine = False)
+        capture.reflectionLineCount = 0
+        fileMan.setLoad(xmlPath)
+        capture.readViewSettings(fileMan.findBranch("viewSettings")[0])
+        for tag, builder in (("ReflectionLine", capture.readRelectionLine), ("GuideMarker", capture.readMarker),
+                             ("WireGroup", capture.readWireGroup), ("SuperNodeGroup", capture.readSuperNodeGroup)):
+            for element in fileMan.findBranch(tag): builder(element)
+        capture.readMarkersFinished()
+    for name, read in (("recursive findBranch", lambda: readByBranch(LegacyXMLMan())),
+                       ("indexed findBranch", lambda: readByBranch(FileControl.XMLMan())),
+                       ("streamLoad", capture.read)):
+        readTime = timeCall(read, repeats)
+        print "    %-22s : %9.1f ms   (%d markers loaded)" % (name, readTime, len(view.getMarkerList()))
+    view.clear()
+
+def legacyStoreMarker(marker):
+    """Store a GuideMarker as GuideMarker.store() did before the RigAttributeSchema"""
+    GuideMarkerRoot = xml.Element('GuideMarker')
+    attributes = xml.SubElement(GuideMarkerRoot,'attributes')
+    xml.SubElement(attributes, 'attribute', name = 'index', value = str(marker.getIndex()))
+    xml.SubElement(attributes, 'attribute', name = 'active', value = str(marker.getActive()))
+    xml.SubElement(attributes, 'attribute', name = 'activeIndex', value = str(marker.getActiveIndex()))
+    xml.SubElement(attributes, 'attribute', name = 'scale', value = str(marker.getScale()))
+    xml.SubElement(attributes, 'attribute', name = 'alpha', value = str(marker.getAlpha()))
+    xml.SubElement(attributes, 'attribute', name = 'guideColourIndex', value = str(marker.getGuideColourIndex()))
+    xml.SubElement(attributes, 'attribute', name = 'zValue', value = str(marker.zValue()))
+    xml.SubElement(attributes, 'attribute', name = 'visible', value = str(marker.isVisible()))
+    xml.SubElement(attributes, 'attribute', name = 'pos', value = (str(marker.pos().x())) + "," + str(marker.pos().y()))
+    return GuideMarkerRoot
+
+def legacyReadMarker(marker, GuideMarkerXml):
+    """Read a GuideMarker as GuideMarker.read() did before the RigAttributeSchema"""
+    for a in GuideMarkerXml.findall( 'attributes/attribute'):
+        if a.attrib['name'] == 'index': marker.setIndex(int(a.attrib['value']))
+        elif a.attrib['name'] == 'active': marker.setActive(str(a.attrib['value']) == 'True')
+        elif a.attrib['name'] == 'activeIndex': marker.setActiveIndex(int(a.attrib['value']))
+        elif a.attrib['name'] == 'scale': marker.setScale(float(a.attrib['value']))
+        elif a.attrib['name'] == 'alpha': marker.setAlpha(float(a.attrib['value']))
+        elif a.attrib['name'] == 'guideColourIndex': marker.setGuideColourIndex(int(a.attrib['value']))
+        elif a.attrib['name'] == 'zValue': marker.setZValue(float(a.attrib['value']))
+        elif a.attrib['name'] == 'visible': marker.setVisible(str(a.attrib['value']) == 'True')
+        elif a.attrib['name'] == 'pos': 
+            newPos = a.attrib['value'].split(",")
+            marker.setPos(float(newPos[0]), float(newPos[1]))
+
+def benchAttributeSchema(markerCount = 5000, repeats = 5):
+    """Benchmark of storing and reading GuideMarkers - hand written store()/read() against the RigAttributeSchema"""
+    print "GuideMarker store/read - hand written if/elif chains vs RigAttributeSchema (%d markers)" % markerCount
+    random.seed(1)
+    markers = []
+    for index in range(markerCount):
+        marker = GuideMarker()
+        marker.setIndex(index)
+        marker.setPos(random.uniform(0, 1000), random.uniform(0, 1000))
+        markers.append(marker)
+    elements = [marker.store() for marker in markers]
+    for name, store, read in (("hand written", legacyStoreMarker, legacyReadMarker),
+                              ("schema", GuideMarker.schema.store, GuideMarker.schema.read)):
+        storeTime = timeCall(lambda: [store(marker) for marker in markers], repeats)
+        readTime = timeCall(lambda: [read(marker, element) for marker, element in zip(markers, elements)], repeats)
+        print "    %-12s : store %8.1f ms   read %8.1f ms" % (name, storeTime, readTime)
+
+def benchBulkLoad(copyCounts = (10, 50), repeats = 3):
+    """Benchmark of FaceGVCapture.read() on large rig files - updates made as each item is built against the RigBulkLoad"""
+    print "FaceGVCapture read - immediate updates vs RigBulkLoad, test.xml scaled"
+    view = RigGraphicsView(None, None, "", None)
+    capture = FaceGVCapture(view, None)
+    graph = rigBulkLoad.getGraph()
+    for copies in copyCounts:
+        xmlPath = os.path.join(tempfile.mkdtemp(), "scaled.xml")
+        itemCount = buildScaledRigFile(xmlPath, copies)
+        capture.setXMLFile(xmlPath)
+        def immediateRead():
+            capture.read()
+            view.updateScheduler.flush() #Draw the ties and curves queued as the items were built, as the bulk load does
+        rigBulkLoad.setEnabled(False) #Every item updates as it is built
+        try: immediateTime = timeCall(immediateRead, repeats)
+        finally: rigBulkLoad.setEnabled(True)
+        graph.resetEvalCounts()
+        bulkTime = timeCall(capture.read, repeats)
+        evaluations = sum(graph.getEvalCounts().values())/repeats
+        print "    %5d items : immediate %9.1f ms   bulk %9.1f ms   (%d items evaluated per bulk load, %d in the scene)" % (itemCount, immediateTime, bulkTime, evaluations, len(view.scene().items()))
+    view.clear()
+
+def main():
+    app = QtGui.QApplication(sys.argv)
+    benchCurveSolver()
+    benchIncrementalDrag()
+    benchSkinnedDrag()
+    benchSkinningDeformation()
+    benchPicking()
+    benchDragIndex()
+    benchRepaint()
+    benchPaintEvents()
+    benchBackground()
+    benchTiledBackground()
+    benchAsyncBackground()
+    benchItemCache()
+    benchDetailLevels()
+    benchPinConstruction()
+    benchMarkerLabels()
+    benchRigFileFormats()
+    benchStreamingLoad()
+    benchCaptureRead()
+    benchAttributeSchema()
+    benchBulkLoad()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,7 +19,8 @@ class FaceGVCapture():
     main "store()" method
 
     This data is then saved to a specified XML file and can be loaded back in to rebuild the 
-    graphics view by using the "read()" method
+    graphics view by using the "read()" method. Files with the ".rig" extension hold the same
+    tree in the compact binary format of FileControl.RigBinaryMan
     """
     def __init__(self, faceGView, messageLogger):
         """Class to capture all of the information out of the Graphics View"""
@@ -35,8 +36,8 @@ class FaceGVCapture():
         self.setTree()
 
     def setTree(self):
-        self.viewXML = FileControl.XMLMan()
-        self.viewXML.setLoad(self.xMLFile)        
+        self.viewXML = FileControl.fileManFor(self.xMLFile) #Binary for .rig files, XML otherwise
+        self.viewXML.setFile(self.xMLFile) #The file is streamed in by read()
 
     def store(self):
 
@@ -44,7 +45,9 @@ class FaceGVCapture():
             self.messageLogger.error("Invalid filename for saving: '%s'" % self.xMLFile)
             return
 
-        self.viewXML = FileControl.XMLMan()
+        self.view.updateScheduler.flush() #Make sure all the curve handles are up to date before they are captured
+
+        self.viewXML = FileControl.fileManFor(self.xMLFile)
         self.viewXML.tree = xml.Element('faceRigGraphicsView')
         self.viewSettings = xml.SubElement(self.viewXML.tree,'viewSettings')
         self.sceneItems = xml.SubElement(self.viewXML.tree,'sceneItems')
@@ -54,6 +57,7 @@ class FaceGVCapture():
         self.captureReflectionLine()
         self.captureMarkers()
         self.captureWireGroups()
+        self.captureSuperNodeGroups()
 
         #Now we have captured everything into a super giant XML tree we need to save this out.
         self.viewXML.setFile(self.xMLFile)
@@ -68,12 +72,22 @@ class FaceGVCapture():
         # Clear the entire Graphics View, including reflection Line
         self.view.clear(isReflectionLine = False)
 
-        self.readBackgroundImage()
-        self.readViewSettings()
-        self.readRelectionLine()
-        self.readMarkers()
-        self.readWireGroups()
-        self.readSuperNodeGroups()
+        # Stream the file in, building each item as soon as its branch has been read
+        self.reflectionLineCount = 0
+        builders = {'viewSettings' : self.readViewSettings,
+                    'ReflectionLine' : self.readRelectionLine,
+                    'GuideMarker' : self.readMarker,
+                    'WireGroup' : self.readWireGroup,
+                    'SuperNodeGroup' : self.readSuperNodeGroup}
+        # Items are built with their updates held back, and the ties, curves and scene index are brought up to date once at the end
+        rigBulkLoad.begin(self.view.scene())
+        try: loaded = self.viewXML.streamLoad(self.xMLFile, builders)
+        finally: rigBulkLoad.end()
+        if not loaded:
+            self.messageLogger.error("Unable to read file: '%s'" % self.xMLFile)
+            return
+        if self.reflectionLineCount != 1: print "WARNING : REFLECTION LINE ERROR : NO REFLECTION LINES OR MULTIPLE REFLECTIONS LINES WERE LOADED"
+        self.readMarkersFinished()
 
         # Updating a full draw for the whole scene
         scene = self.view.scene()
@@ -83,9 +97,8 @@ class FaceGVCapture():
         """Function to process background Image into XML"""
         backgroundImage = xml.SubElement(self.viewSettings, 'attribute', name = 'backgroundImage', value = str(self.view.getBackgroundImage()))
 
-    def readBackgroundImage(self):
+    def readBackgroundImage(self, viewSettings):
         """Function to process background Image from XML"""
-        viewSettings = self.viewXML.findBranch("viewSettings")[0]
         for a in viewSettings.findall( 'attribute'):
             if a.attrib['name'] == 'backgroundImage': self.view.setBackgroundImage(str(a.attrib['value']))
         self.view.setupBackground(remap = False) # Do not remap the reflection Line since it does not exist yet! 
@@ -94,13 +107,15 @@ class FaceGVCapture():
         """Function to process View Settings into XML"""
         markerCount = xml.SubElement(self.viewSettings, 'attribute', name = 'markerCount', value = str(self.view.getMarkerCount()))
         markerScale = xml.SubElement(self.viewSettings, 'attribute', name = 'markerScale', value = str(self.view.getMarkerScale()))
+        skinNormalisation = xml.SubElement(self.viewSettings, 'attribute', name = 'skinNormalisation', value = str(self.view.getSkinNormalisation()))
 
-    def readViewSettings(self):
-        """Function to process view Settings from XML"""
-        viewSettings = self.viewXML.findBranch("viewSettings")[0]
+    def readViewSettings(self, viewSettings):
+        """Function to process view Settings from XML, starting with the background Image"""
+        self.readBackgroundImage(viewSettings)
         for a in viewSettings.findall( 'attribute'):
             if a.attrib['name'] == 'markerCount': self.view.setMarkerCount(int(a.attrib['value']))
             elif a.attrib['name'] == 'markerScale': self.view.setMarkerScale(float(a.attrib['value']))
+            elif a.attrib['name'] == 'skinNormalisation': self.view.setSkinNormalisation(str(a.attrib['value']))
 
     def captureReflectionLine(self):
         """Function to process Reflection Line into XML"""
@@ -108,15 +123,14 @@ class FaceGVCapture():
         reflectionLineXml = reflectionLine.store()
         self.sceneItems.append(reflectionLineXml)
 
-    def readRelectionLine(self):
+    def readRelectionLine(self, reflectionLineXml):
         scene = self.view.scene()
-        reflectionLineXml = self.viewXML.findBranch("ReflectionLine")
-        if len(reflectionLineXml) ==  1: #We have found a single Correct Reflection Line
+        self.reflectionLineCount += 1
+        if self.reflectionLineCount ==  1: #Only the first Reflection Line is used
             newReflectionLine = ReflectionLine(20,20)  #Initialise Reflection line with arbitary width and height that we can over ride immediately with read method
-            newReflectionLine.read(reflectionLineXml[0])
+            newReflectionLine.read(reflectionLineXml)
             scene.addItem(newReflectionLine)
             self.view.setReflectionLine(newReflectionLine)
-        else: print "WARNING : REFLECTION LINE ERROR : NO REFLECTION LINES OR MULTIPLE REFLECTIONS LINES WERE LOADED"
 
     def captureMarkers(self):
         """Function to process Markers into XML"""
@@ -125,15 +139,16 @@ class FaceGVCapture():
             markerXML = m.store()
             self.sceneItems.append(markerXML)
 
-    def readMarkers(self):
+    def readMarker(self, markerXml):
         scene = self.view.scene()
-        markers = self.viewXML.findBranch("GuideMarker")
-        for m in markers:
-            newMarker = GuideMarker()
-            newMarker.read(m)
-            scene.addItem(newMarker)
-            self.view.markerList.append(newMarker) #Add Marker to marker List
-            if newMarker.getActive(): self.view.markerActiveList.append(newMarker)
+        newMarker = GuideMarker()
+        newMarker.read(markerXml)
+        scene.addItem(newMarker)
+        self.view.markerList.append(newMarker) #Add Marker to marker List
+        if newMarker.getActive(): self.view.markerActiveList.append(newMarker)
+
+    def readMarkersFinished(self):
+        """Function to order the active markers once they have all been read"""
         self.view.markerActiveList.sort(key=lambda x: x.getActiveIndex())
         self.view.processMarkerActiveIndex()  #Update all active states 
 
@@ -144,14 +159,11 @@ class FaceGVCapture():
             wireXml = w.store()
             self.sceneItems.append(wireXml)
     
-    def readWireGroups(self):
-        """A Function to generate WireGroups from XML"""
-        scene = self.view.scene()
-        wireGroups = self.viewXML.findBranch("WireGroup")
-        for w in wireGroups:
-            newWireGroup = WireGroup(self.view)
-            newWireGroup.read(w)
-            self.view.wireGroups.append(newWireGroup)
+    def readWireGroup(self, wireXml):
+        """A Function to generate a WireGroup from XML"""
+        newWireGroup = WireGroup(self.view)
+        newWireGroup.read(wireXml)
+        self.view.wireGroups.append(newWireGroup)
 
     def captureSuperNodeGroups(self):
         """Function to process SuperNodeGroups into XML"""
@@ -160,11 +172,8 @@ class FaceGVCapture():
             superNodeXml = s.store()
             self.sceneItems.append(superNodeXml)
 
-    def readSuperNodeGroups(self):
-        """A Function to generate SuperNodeGroups from XML"""
-        scene = self.view.scene()
-        superNodeGroups = self.viewXML.findBranch("SuperNodeGroup")
-        for s in superNodeGroups:
-            newSuperNodeGroup = SuperNodeGroup(QtCore.QPointF(0,0), "Arrow_4Point", self.view) # Create SuperGroup with Arbitrary starting values
-            newSuperNodeGroup.read(s)
-            self.view.superNodeGroups.append(newSuperNodeGroup)
+    def readSuperNodeGroup(self, superNodeXml):
+        """A Function to generate a SuperNodeGroup from XML. Its skinning refers to WireGroups, which are stored before it"""
+        newSuperNodeGroup = SuperNodeGroup(QtCore.QPointF(0,0), "Arrow_4Point", self.view) # Create SuperGroup with Arbitrary starting values
+        newSuperNodeGroup.read(superNodeXml)
+        self.view.superNodeGroups.append(newSuperNodeGroup)
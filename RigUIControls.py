@@ -38,10 +38,18 @@ class RigGraphicsView(QtGui.QGraphicsView):
         self.setDragMode(QtGui.QGraphicsView.RubberBandDrag)
         self.setContextMenuPolicy(QtCore.Qt.DefaultContextMenu)
 
-        scene = QtGui.QGraphicsScene(self)
-        scene.setItemIndexMethod(QtGui.QGraphicsScene.NoIndex)
+        scene = RigGraphicsScene(self) #Keeps a registry of its items by class
+        scene.setGridClasses([Node, SuperNode]) #Nodes are picked from a grid, as well as being in Qt's BSP tree with everything else
+        scene.setIndexStrategy("BspTreeAndGrid")
+        scene.setCacheClasses([GuideMarker, ControlPin, PinTie, ReflectionLine]) #Drawn from pixmaps while they are at rest
+        scene.setCacheMode("DeviceCoordinateCache")
         scene.setSceneRect(self.size[0],self.size[1],self.size[2],self.size[3])
         self.setScene(scene)
+        self.updateScheduler = RigUpdateScheduler(self) #Collects the curve and tie updates so they are drawn once per frame
+        self.cacheTimer = QtCore.QTimer(self) #Turns the item caches back on once zooming has stopped
+        self.cacheTimer.setSingleShot(True)
+        self.cacheTimer.setInterval(250)
+        self.cacheTimer.timeout.connect(self.resumeItemCaches)
         self.setRenderHint(QtGui.QPainter.Antialiasing)
         self.setTransformationAnchor(QtGui.QGraphicsView.AnchorUnderMouse)
         self.setResizeAnchor(QtGui.QGraphicsView.AnchorViewCenter)
@@ -53,6 +61,10 @@ class RigGraphicsView(QtGui.QGraphicsView):
 
         # View Settings
         self.backgroundImage = None
+        self.backgroundCache = RigBackgroundCache(self) #The background image, decoded as tiles on a worker thread
+        self.backgroundCache.sizeReady.connect(self.backgroundSizeReady)
+        self.backgroundCache.tileReady.connect(self.backgroundTileReady)
+        self.backgroundRemap = True
 
         self.markerCount = 1
         self.markerScale = 1.0
@@ -66,12 +78,16 @@ class RigGraphicsView(QtGui.QGraphicsView):
         self.markerList = []
         self.wireGroups = []
         self.superNodeGroups = []
+        self.skinMatrix = RigSkinMatrix(self) #Rig wide skin values of the pins for every SuperNode
 
         self.dragItem = None
         self.skinningItem = None
         self.isSelectableList = [] #list used to store selectable states while panning around 
         self.isMovableList = [] #list used to store selectable states while panning around       
         self.isSelectedList = []
+        self.panItems = [] #Items that have had their flags turned off for a pan
+        self.interactiveItemClasses = [ReflectionLine, GuideMarker, Node, SuperNode, ControlPin, ConstraintEllipse, ConstraintRect, 
+                                       ConstraintLine, OpsCross, OpsRotation, SkinningEllipse]
         
         self.mainWindow = mainWindow
 
@@ -117,10 +133,9 @@ class RigGraphicsView(QtGui.QGraphicsView):
     def setMarkerScaleSlider(self, scale):
         """Function to cycle through markers and scale"""
         scene = self.scene()
-        for item in scene.items():
-            if type(item) == GuideMarker: #change the state of its show ID
-                item.setScale(float(scale/100.0))
-                item.update()
+        for item in scene.getItems(GuideMarker): #change the state of its show ID
+            item.setScale(float(scale/100.0))
+            item.update()
         self.markerScale = float(scale/100.0)
 
     def setMarkerScale(self,markerScale):
@@ -141,6 +156,12 @@ class RigGraphicsView(QtGui.QGraphicsView):
     def getSuperNodeGroups(self):
         return self.superNodeGroups
 
+    def getSkinNormalisation(self):
+        return self.skinMatrix.getNormalisation()
+
+    def setSkinNormalisation(self, normalisation):
+        self.skinMatrix.setNormalisation(normalisation)
+
     def loadBackgroundImage(self):
         imagePath = QtGui.QFileDialog.getOpenFileName(caption = "Please choose front character face image ~ 500px x 500px", directory="./images" , filter = "*.png")
         if os.path.exists(imagePath):
@@ -149,19 +170,31 @@ class RigGraphicsView(QtGui.QGraphicsView):
 
 
     def setupBackground(self, remap = True):
-        """Function to set the validity of a file path, and if it is good then pass it to the Graphics View for drawing"""
+        """Function to set the validity of a file path, and if it is good then pass it to the Graphics View for drawing
+
+        The image is decoded on the worker thread of the backgroundCache. The scene is sized to the image in
+        backgroundSizeReady, once the size is known
+        """
+        self.backgroundRemap = remap
+        self.backgroundCache.setImage(self.backgroundImage) #Only read from disk if the image is new or has changed
+
+    def backgroundSizeReady(self, size):
+        """Function to size the scene, and the reflection line, to the background image once its size is known"""
         if self.backgroundImage:
-            characterImage = QtGui.QPixmap(self.backgroundImage)
-            self.width = characterImage.width()
-            self.height = characterImage.height()
+            self.width = size.width()
+            self.height = size.height()
             self.size = [self.size[0],self.size[1], self.width,self.height]
             self.scene().setSceneRect(self.size[0],self.size[1],self.size[2],self.size[3])
             self.updateSceneRect(QtCore.QRectF(self.size[0],self.size[1],self.size[2],self.size[3]))
-            if remap: self.reflectionLine.remap(self.width, self.height) # Adjust the Positing and height of the reflection line
+            if self.backgroundRemap and self.reflectionLine: self.reflectionLine.remap(self.width, self.height) # Adjust the Positing and height of the reflection line
             # self.setMinimumSize(self.width,self.height)
             self.scene().update()
             self.sizeHint()
 
+    def backgroundTileReady(self, rect):
+        """Function to redraw the part of the background that a newly decoded tile covers"""
+        self.invalidateScene(rect, QtGui.QGraphicsScene.BackgroundLayer)
+
 
     def addReflectionLine(self):
         scene = self.scene()
@@ -184,17 +217,23 @@ class RigGraphicsView(QtGui.QGraphicsView):
         return newMarker
 
     def get_ordered_nodes(self):
-        nodes = [item for item in self.scene().items() if isinstance(item, Node)]
+        nodes = self.scene().getItems(Node) + self.scene().getItems(SuperNode)
         nodes.sort(key=lambda n: n.index)
         return nodes
 
+    def pickItems(self, pos, itemClasses = None):
+        """Function to return the items under a view position, optionally only those of the given classes"""
+        if self.updateScheduler.isDirty(): self.updateScheduler.flush() #Make sure the moved Nodes have been indexed
+        return self.scene().pickItems(self.mapToScene(pos), itemClasses)
+
+    def paintEvent(self, event):
+        if self.updateScheduler.isDirty(): self.updateScheduler.flush() #Make sure nothing is drawn with a stale curve
+        QtGui.QGraphicsView.paintEvent(self, event)
+
     def drawBackground(self, painter, rect):
         if self.backgroundImage != None:
-            backImage = QtGui.QPixmap(self.backgroundImage)
-            # backImage.scaled(500,500, QtCore.Qt.KeepAspectRatio)
-            painter.drawPixmap(rect, backImage, rect)
+            self.backgroundCache.draw(painter, rect) #Only the exposed rect, from the mip level that suits the zoom
             # print "This was drawn"
-        sceneRect = self.sceneRect()
         # print "Back image is: " + str(self.backgroundImage)
 
     def reflectPos(self, pos):
@@ -205,8 +244,8 @@ class RigGraphicsView(QtGui.QGraphicsView):
     def reflectGuides(self):
         scene = self.scene()
         """Function to find the list of selected Guide Markers and reflect them around the Reflection Line"""
-        for item in scene.items():
-            if type(item) == GuideMarker and item.isSelected() == True: #Find our selected GuideMarkers
+        for item in scene.getItems(GuideMarker):
+            if item.isSelected() == True: #Find our selected GuideMarkers
                 itemPos = item.pos() #Now build a marker at the reflected position
                 newGuidePos = self.reflectPos(itemPos)
                 newMarker = GuideMarker()
@@ -293,26 +332,20 @@ class RigGraphicsView(QtGui.QGraphicsView):
     def showItem(self,state,objectType):
         """Function to hide and show markers"""
         scene = self.scene()
-        for item in scene.items():
-            if type(item) == objectType: #change the state of its show ID
-                item.setVisible(state)
-                item.update()
-            if objectType == Node and type(item) == PinTie:
-                item.setVisible(state)
-                item.update()
-            if objectType == ControlPin and type(item) == PinTie:
-                item.setVisible(state)
-                item.update()
+        items = scene.getItems(objectType)
+        if objectType == Node or objectType == ControlPin: items = items + scene.getItems(PinTie)
+        for item in items: #change the state of its show ID
+            item.setVisible(state)
+            item.update()
 
     def selectFilter(self, state, objectType):
         """A function to control whether items can be selected or not"""
         scene = self.scene()
-        for item in scene.items():
-            if type(item) == objectType: #change the state of its show ID        
-                item.setFlag(QtGui.QGraphicsItem.ItemIsMovable,state)
-                item.setFlag(QtGui.QGraphicsItem.ItemSendsGeometryChanges,state)
-                item.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,state)
-                if not state: item.setSelected(state)
+        for item in scene.getItems(objectType): #change the state of its show ID        
+            item.setFlag(QtGui.QGraphicsItem.ItemIsMovable,state)
+            item.setFlag(QtGui.QGraphicsItem.ItemSendsGeometryChanges,state)
+            item.setFlag(QtGui.QGraphicsItem.ItemIsSelectable,state)
+            if not state: item.setSelected(state)
 
     def panSelectableItems(self):
         """A function to turn off moveabliliy and selectablility on all objects for a pan"""
@@ -320,7 +353,8 @@ class RigGraphicsView(QtGui.QGraphicsView):
         self.isMovableList = []
         self.isSelectedList = []
         scene = self.scene()
-        for item in scene.items():
+        self.panItems = [item for itemClass in self.interactiveItemClasses for item in scene.getItems(itemClass)] #PinTies and RigCurves are never selected or moved
+        for item in self.panItems:
             self.isSelectedList.append(item.isSelected())
             flags = item.flags()
             isSelectable = flags.__eq__(flags | QtGui.QGraphicsItem.ItemIsSelectable)
@@ -331,13 +365,16 @@ class RigGraphicsView(QtGui.QGraphicsView):
             item.setFlag(QtGui.QGraphicsItem.ItemIsMovable, False) 
 
     def clear(self, isReflectionLine = True):
+        self.updateScheduler.clear()
         self.scene().clear() # Clear the scene of all items
         self.setBackgroundImage(None)
+        self.backgroundCache.clear()
         self.reflectionLine = None
         self.markerList = []
         self.markerActiveList = []
         self.wireGroups = []
         self.superNodeGroups = []
+        self.skinMatrix.clear()
         if isReflectionLine: self.reflectionLine = self.addReflectionLine()
 
     def store(self, XMLFile):
@@ -360,13 +397,16 @@ class RigGraphicsView(QtGui.QGraphicsView):
         GVXml = FileControl.XMLMan()
         GVXml.setLoad(XMLFile)
         GVMarkers = GVXml.findBranch("GuideMarker")
-        for m in GVMarkers:
-            newMarker = GuideMarker()
-            newMarker.read(m)
-            scene.addItem(newMarker)
-            self.markerList.append(newMarker) #Add Marker to marker List
-            # I Active then it should be added to the Active Marker List too!
-            if newMarker.getActive(): self.markerActiveList.append(newMarker)
+        rigBulkLoad.begin(scene) #Index and cache the markers in one go once they are all added
+        try:
+            for m in GVMarkers:
+                newMarker = GuideMarker()
+                newMarker.read(m)
+                scene.addItem(newMarker)
+                self.markerList.append(newMarker) #Add Marker to marker List
+                # I Active then it should be added to the Active Marker List too!
+                if newMarker.getActive(): self.markerActiveList.append(newMarker)
+        finally: rigBulkLoad.end()
         self.markerActiveList.sort(key=lambda x: x.getActiveIndex())
         self.processMarkerActiveIndex()  #Update all active states    
 
@@ -381,8 +421,8 @@ class RigGraphicsView(QtGui.QGraphicsView):
         elif key == QtCore.Qt.Key_Minus:
             self.scaleView(1 / 1.2)
         elif key == QtCore.Qt.Key_Delete:
-            for item in scene.items():
-                if type(item) == GuideMarker and item.isSelected() == True: #Delete out any GuideMarkers that are selection and need to be removed
+            for item in scene.getItems(GuideMarker):
+                if item.isSelected() == True: #Delete out any GuideMarkers that are selection and need to be removed
                     self.processMarkerDelete(item)
                     scene.removeItem(item)
                     del item
@@ -403,7 +443,7 @@ class RigGraphicsView(QtGui.QGraphicsView):
         scene = self.scene()
         if key == QtCore.Qt.Key_Alt:
             self.setDragMode(QtGui.QGraphicsView.RubberBandDrag)
-            for index, item in enumerate(scene.items()):
+            for index, item in enumerate(self.panItems):
                 item.setFlag(QtGui.QGraphicsItem.ItemIsSelectable, self.isSelectableList[index])
                 item.setFlag(QtGui.QGraphicsItem.ItemIsMovable, self.isMovableList[index])
                 item.setSelected(self.isSelectedList[index])
@@ -417,6 +457,11 @@ class RigGraphicsView(QtGui.QGraphicsView):
         if factor < 0.07 or factor > 100:
             return
         self.scale(scaleFactor, scaleFactor)
+        self.scene().suspendItemCaches()
+        self.cacheTimer.start()
+
+    def resumeItemCaches(self):
+        self.scene().resumeItemCaches(self.transform().m11())
 
     def dragEnterEvent(self, event):
         """Function to overider dragEnterEvent to check that text is being used"""
@@ -460,9 +505,7 @@ class RigGraphicsView(QtGui.QGraphicsView):
         scene = self.scene()
         dropNodes = []
         if type(self.dragItem) == ConstraintLine or type(self.dragItem) == ConstraintRect or type(self.dragItem) == ConstraintEllipse:
-            possibleItems = self.items(event.pos())
-            for item in possibleItems:
-                if type(item) == Node or type(item) == SuperNode: dropNodes.append(item)
+            dropNodes = self.pickItems(event.pos(), [Node, SuperNode])
     
             if len(dropNodes) != 0 :
                 dropNodes[0].goHome()
@@ -480,9 +523,7 @@ class RigGraphicsView(QtGui.QGraphicsView):
                 self.dragItem = None
 
         if type(self.dragItem) == SkinningEllipse:
-            possibleItems = self.items(event.pos())
-            for item in possibleItems:
-                if type(item) == SuperNode: dropNodes.append(item)
+            dropNodes = self.pickItems(event.pos(), [SuperNode])
 
             if len(dropNodes) != 0 :
                 dropNodes[0].goHome()
@@ -560,20 +601,24 @@ class RigGraphicsView(QtGui.QGraphicsView):
 
             # if mouseEvent.modifiers() & QtCore.Qt.ControlModifier:
             #     self.setDragMode(QtGui.QGraphicsView.ScrollHandDrag)
-        return QtGui.QGraphicsView.mousePressEvent(self, mouseEvent)
+        QtGui.QGraphicsView.mousePressEvent(self, mouseEvent)
+        if scene.mouseGrabberItem(): #An item is about to be dragged, so take it, and everything moving with it, out of the caches
+            scene.beginItemEdit([scene.mouseGrabberItem()] + scene.selectedItems())
 
     def mouseMoveEvent(self, mouseEvent):
         scene = self.scene()
         return QtGui.QGraphicsView.mouseMoveEvent(self, mouseEvent)
 
+    def mouseReleaseEvent(self, mouseEvent):
+        QtGui.QGraphicsView.mouseReleaseEvent(self, mouseEvent)
+        if not self.scene().mouseGrabberItem(): self.scene().endItemEdit()
+
 
     def mouseDoubleClickEvent(self, mouseEvent):
         scene = self.scene()
         selGuides = []
-        possibleItems = self.items(mouseEvent.pos())
         if mouseEvent.button() == QtCore.Qt.LeftButton:    #Left Double click on a Marker to activate or deactivate it
-            for item in possibleItems:
-                if type(item) == GuideMarker: selGuides.append(item)
+            selGuides = self.pickItems(mouseEvent.pos(), [GuideMarker])
 
         if len(selGuides) > 0 :
             self.processMarkerSelection(selGuides[0])
@@ -581,15 +626,14 @@ class RigGraphicsView(QtGui.QGraphicsView):
             return QtGui.QGraphicsView.mouseDoubleClickEvent(self, mouseEvent)
 
         if mouseEvent.button() == QtCore.Qt.MiddleButton:  #Send a Node back to its Pin with a Double Right button click
-            for item in possibleItems:
-               if type(item) == Node: 
-                    item.goHome()
+            for item in self.pickItems(mouseEvent.pos(), [Node]):
+                item.goHome()
         return QtGui.QGraphicsView.mouseDoubleClickEvent(self, mouseEvent)
 
     def sortMenuItem(self, event):
         """Function to ensure that the correct RC menu appears where ever possible. Ensure that SkinningEllipse RC's do not appear over other items"""
         scene = self.scene()
-        items = self.items(event.pos())
+        items = self.pickItems(event.pos())
         noneSkinItems = False
         if len(items) != 0:
             for item in items: 
@@ -2,12 +2,16 @@
 import sys
 from PyQt4 import QtCore, QtGui
 import os
+import math
+import collections
+import Queue
 import weakref
 import xml.etree.ElementTree as xml
 
 
 #######Project python imports################################################
 from Utilities import *
+import FileControl
 
 
 #################################CLASSES & FUNCTIONS FOR NON INTERACTIVE GRAPHICS ITEMS##################################################################################
@@ -75,15 +79,1231 @@ class RigCurveInfo():
         return self.perpSwing
 
 
+def segmentTerms(startPos, endPos, targPos):
+    """Function to calculate the RigCurveInfo data for a whole stack of segments at once
 
-class PinTie(QtGui.QGraphicsItem):
+    startPos, endPos and targPos are (M,2) arrays. Returns the direction vectors, the direction
+    distances, the perpendicular unit vectors, the perpendicular swing and the target node distances
+    """
+    dirVec = endPos - startPos
+    dirDist = np.sqrt(np.einsum('ij,ij->i', dirVec, dirVec))
+    #The perpendicular of [x, y, 1] x [0, 0, 1] is simply [y, -x]
+    perpUnitVec = np.column_stack((dirVec[:,1], -dirVec[:,0]))/dirDist[:,None]
+    targetVec = targPos - startPos
+    targetVec = targetVec/np.sqrt(np.einsum('ij,ij->i', targetVec, targetVec))[:,None]
+    targNodeVec = targPos - endPos
+    targNodeDist = np.sqrt(np.einsum('ij,ij->i', targNodeVec, targNodeVec))
+    perpSwing = np.einsum('ij,ij->i', perpUnitVec, targetVec)
+    return dirVec, dirDist, perpUnitVec, perpSwing, targNodeDist
+
+
+def solveBezierHandles(points, handleScale, curveSwing, secondHandleScale, handlesIn = None, handlesOut = None, terms = None):
+    """Function to calculate the Bezier handles of a RigCurve with whole array operations
+
+    points is an (N,2) array of the node scene positions, in wire order, with N >= 3.
+
+    Returns two (N,2) arrays, handlesIn and handlesOut, matching the handles 0 and 1 that the
+    RigCurve sets on each Node. The first Node has no handle 0 and the last Node has no handle 1,
+    so those rows are left as NaN.
+
+    The handles come from N-1 terms. Term k (k < N-2) runs from node k to node k+1, using node k+2
+    as the target, and sets handle 0 and 1 of node k+1 (plus handle 1 of node 0 for k = 0). The
+    last term is calculated from the end backwards and sets handle 0 of the last node.
+    If existing handlesIn/handlesOut arrays and a list of terms are passed in, then only those
+    terms are solved and the arrays are updated in place.
+    """
+    points = np.asarray(points, dtype = float)
+    lastTerm = len(points) - 2
+    if handlesIn is None or handlesOut is None:
+        handlesIn = np.empty_like(points)
+        handlesOut = np.empty_like(points)
+        handlesIn[0] = np.nan
+        handlesOut[-1] = np.nan
+        terms = None
+    if terms is None:
+        forward = np.arange(lastTerm)
+        solveLast = True
+    else:
+        terms = np.asarray(terms, dtype = int)
+        forward = np.unique(terms[terms < lastTerm])
+        solveLast = bool(np.any(terms == lastTerm))
+
+    #Forward terms
+    if len(forward):
+        startPos = points[forward]
+        endPos = points[forward + 1]
+        dirVec, dirDist, perpUnitVec, perpSwing, targNodeDist = segmentTerms(startPos, endPos, points[forward + 2])
+        swingVec = dirDist[:,None]*perpUnitVec*curveSwing*perpSwing[:,None]
+        cP2 = startPos + (1-handleScale)*dirVec - swingVec
+        if forward[0] == 0: #Only the first term sets the outgoing handle of the first node
+            handlesOut[0] = startPos[0] + handleScale*dirVec[0] - swingVec[0]
+        handlesIn[forward + 1] = cP2
+        handlesOut[forward + 1] = (endPos - cP2)*secondHandleScale*targNodeDist[:,None]/dirDist[:,None] + endPos
+
+    #The final term is calculated from the end backwards
+    if solveLast:
+        dirVec, dirDist, perpUnitVec, perpSwing, targNodeDist = segmentTerms(points[-1:], points[-2:-1], points[-3:-2])
+        handlesIn[-1] = points[-1] + handleScale*dirVec[0] - dirDist[0]*perpUnitVec[0]*curveSwing*perpSwing[0]
+    return handlesIn, handlesOut
+
+
+def dirtyTerms(dirtyNodes, nodeCount):
+    """Function to find which solver terms need to be re-solved when the given node indexes have moved
+
+    A handle only depends on its neighbours, so a node k affects the terms k-2, k-1 and k, plus the
+    last term when it is one of the final three nodes
+    """
+    lastTerm = nodeCount - 2
+    terms = set()
+    for index in dirtyNodes:
+        for term in (index - 2, index - 1, index):
+            if 0 <= term < lastTerm: terms.add(term)
+        if index >= nodeCount - 3: terms.add(lastTerm)
+    return sorted(terms)
+
+
+
+class RigGraphNode(object):
+    """Mixin for the items that take part in the RigDependencyGraph
+
+    Each item records the items that drive it (inputs) and the items it drives (outputs) as weak references,
+    so that nothing is kept alive by the graph. The connections are made where the rig relationships are set
+    up (setPin, setPinTie, addRigCurve, setSuperNode ...).
+
+    Items should call initGraph() in their constructor, flag themselves with markDirty() when they change, 
+    and override evaluate() to bring themselves up to date with their inputs.
+    """
+    def initGraph(self):
+        self.graphInputs = []
+        self.graphOutputs = []
+
+    def getGraphInputs(self):
+        return [item() for item in self.graphInputs if item() is not None]
+
+    def getGraphOutputs(self):
+        return [item() for item in self.graphOutputs if item() is not None]
+
+    def addGraphOutput(self, item):
+        """Function to register an item as being driven by this item"""
+        if item not in self.getGraphOutputs():
+            self.graphOutputs.append(weakref.ref(item))
+            item.graphInputs.append(weakref.ref(self))
+
+    def removeGraphOutput(self, item):
+        """Function to remove the connection from this item to an item it was driving"""
+        self.graphOutputs = [ref for ref in self.graphOutputs if ref() is not None and ref() is not item]
+        item.graphInputs = [ref for ref in item.graphInputs if ref() is not None and ref() is not self]
+
+    def graphScheduler(self):
+        return findUpdateScheduler(self)
+
+    def markDirty(self):
+        """Function to flag this item as changed, so that it and everything downstream of it is evaluated
+
+        The evaluation is left to the RigUpdateScheduler of the view. Items that are not in a viewed scene 
+        are evaluated straight away, unless a rig file is being read, when they wait for the end of the RigBulkLoad.
+        """
+        if rigBulkLoad.isActive():
+            rigBulkLoad.setDirty(self)
+            return
+        scheduler = self.graphScheduler()
+        if scheduler: scheduler.setDirty(self)
+        else:
+            graph = RigDependencyGraph()
+            graph.setDirty(self)
+            graph.evaluate()
+
+    def evaluate(self):
+        """Function to bring the item up to date with its inputs, called once per change by the RigDependencyGraph"""
+        pass
+
+
+class RigDependencyGraph():
+    """The RigDependencyGraph evaluates the items downstream of the items that have been marked as dirty
+
+    The data flows SuperNode -> SkinningPinInfo -> ControlPin -> Node -> PinTie/RigCurve, with the constraint
+    items driving their ControlPin. The items hold the connections themselves (see RigGraphNode). When the
+    graph is evaluated, everything reachable from the dirty items is collected and put in topological order,
+    so every dependent is evaluated exactly once, after all of its inputs. The cost of an evaluation grows 
+    with the number of affected items, not the size of the rig.
+
+    Every evaluation is counted by item class in evalCounts, for profiling.
+    """
+    def __init__(self):
+        self.dirtyItems = {}
+        self.pendingItems = set()
+        self.evalCounts = {}
+        self.evaluations = 0
+
+    def setDirty(self, item):
+        if id(item) in self.pendingItems: return #Already waiting to be evaluated in the current pass
+        self.dirtyItems[id(item)] = item
+
+    def isDirty(self):
+        return bool(self.dirtyItems)
+
+    def clear(self):
+        self.dirtyItems = {}
+
+    def getEvalCounts(self):
+        return self.evalCounts
+
+    def resetEvalCounts(self):
+        self.evalCounts = {}
+        self.evaluations = 0
+
+    def affectedItems(self):
+        """Function to collect the dirty items and everything downstream of them"""
+        affected = {}
+        stack = self.dirtyItems.values()
+        while stack:
+            item = stack.pop()
+            if id(item) not in affected:
+                affected[id(item)] = item
+                stack.extend(item.getGraphOutputs())
+        return affected
+
+    def sortItems(self, affected):
+        """Function to return the affected items in topological order, so inputs are evaluated before their outputs"""
+        inputCount = dict((key, 0) for key in affected)
+        for item in affected.values():
+            for output in item.getGraphOutputs(): inputCount[id(output)] += 1
+        ready = [affected[key] for key in affected if inputCount[key] == 0]
+        order = []
+        while ready:
+            item = ready.pop()
+            order.append(item)
+            for output in item.getGraphOutputs():
+                inputCount[id(output)] -= 1
+                if inputCount[id(output)] == 0: ready.append(output)
+        if len(order) != len(affected):
+            print "WARNING : THE RIG DEPENDENCY GRAPH HAS A CYCLE, SOME ITEMS WILL NOT BE EVALUATED"
+        return order
+
+    def evaluate(self, maxPasses = 10):
+        """Function to evaluate every dirty item and its dependents once, in topological order
+
+        Items that are marked as dirty while the graph is being evaluated (for example when an evaluation adds
+        new connections) are evaluated in a further pass, so nothing is left waiting for the next update
+        """
+        passes = 0
+        while self.dirtyItems:
+            if passes == maxPasses:
+                print "WARNING : THE RIG DEPENDENCY GRAPH IS STILL DIRTY AFTER %d PASSES, THE REST WILL WAIT FOR THE NEXT UPDATE" % maxPasses
+                return
+            order = self.sortItems(self.affectedItems())
+            self.dirtyItems = {}
+            self.pendingItems = set(id(item) for item in order)
+            for item in order:
+                self.pendingItems.discard(id(item))
+                item.evaluate()
+                name = type(item).__name__
+                self.evalCounts[name] = self.evalCounts.get(name, 0) + 1
+            passes += 1
+        self.evaluations += 1
+
+
+class RigUpdateScheduler(QtCore.QObject):
+    """The RigUpdateScheduler evaluates the RigDependencyGraph of the view once per tick of the event loop
+
+    Moving one control can move many nodes and pins on the same wire (a SuperNode skinning 20 pins), and each
+    of these used to rebuild the curve straight away. Instead the items are marked as dirty here and the flush
+    is queued on the event loop, so it runs before the scene processes its updates and paints.
+
+    Code that needs to read the Bezier handles or tie positions straight away should call flush() first.
+    """
+    def __init__(self, parent = None):
+        super(RigUpdateScheduler, self).__init__(parent)
+        self.graph = RigDependencyGraph()
+        self.flushPending = False
+
+    def getGraph(self):
+        return self.graph
+
+    def setDirty(self, item):
+        """Function to mark a RigGraphNode as changed and queue a flush"""
+        self.graph.setDirty(item)
+        self.scheduleFlush()
+
+    def isDirty(self):
+        return self.graph.isDirty()
+
+    def scheduleFlush(self):
+        if not self.flushPending:
+            self.flushPending = True
+            QtCore.QMetaObject.invokeMethod(self, "flush", QtCore.Qt.QueuedConnection)
+
+    @QtCore.pyqtSlot()
+    def flush(self):
+        """Function to synchronously evaluate everything that has been marked as dirty"""
+        self.flushPending = False
+        self.graph.evaluate()
+
+    def clear(self):
+        """Function to forget all dirty items, used when the scene is cleared"""
+        self.graph.clear()
+
+
+def findUpdateScheduler(item):
+    """Function to find the update scheduler of the RigGraphicsView that is displaying the item
+
+    Returns None if the item is not in a scene that is being viewed
+    """
+    scene = item.scene()
+    if scene and scene.views():
+        return scene.views()[0].updateScheduler
+    return None
+
+
+class RigGridIndex():
+    """A uniform grid spatial index for items that move often, such as Nodes
+
+    Each item is recorded in every grid cell that its scene bounding rectangle overlaps. When an item moves,
+    update() only touches the grid if the item has moved into a different set of cells, so keeping the
+    index up to date during a drag is cheap, unlike Qt's BSP tree which is better suited to items that stay put.
+    """
+    def __init__(self, cellSize = 50.0):
+        self.cellSize = float(cellSize)
+        self.cells = {}
+        self.entries = {} #id(item) -> (item, rect, cells)
+
+    def getCellSize(self):
+        return self.cellSize
+
+    def setCellSize(self, cellSize):
+        """Function to change the size of the grid cells, re-indexing all of the items"""
+        entries = self.entries.values()
+        self.cellSize = float(cellSize)
+        self.clear()
+        for item, rect, cells in entries: self.update(item, rect)
+
+    def clear(self):
+        self.cells = {}
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def cellRange(self, rect):
+        """Function to return the grid cells that a rectangle overlaps"""
+        left = int(np.floor(rect.left()/self.cellSize))
+        right = int(np.floor(rect.right()/self.cellSize))
+        top = int(np.floor(rect.top()/self.cellSize))
+        bottom = int(np.floor(rect.bottom()/self.cellSize))
+        return [(x, y) for x in range(left, right + 1) for y in range(top, bottom + 1)]
+
+    def update(self, item, rect):
+        """Function to add an item to the index, or move it to its new rectangle"""
+        key = id(item)
+        cells = self.cellRange(rect)
+        if key in self.entries:
+            oldCells = self.entries[key][2]
+            if oldCells == cells:
+                self.entries[key] = (item, rect, cells)
+                return
+            for cell in oldCells: del self.cells[cell][key]
+        for cell in cells: self.cells.setdefault(cell, {})[key] = item
+        self.entries[key] = (item, rect, cells)
+
+    def remove(self, item):
+        key = id(item)
+        if key in self.entries:
+            for cell in self.entries[key][2]: del self.cells[cell][key]
+            del self.entries[key]
+
+    def items(self, point):
+        """Function to return the visible items whose shape contains the point, front most first, as QGraphicsScene.items() does"""
+        cell = (int(np.floor(point.x()/self.cellSize)), int(np.floor(point.y()/self.cellSize)))
+        found = [item for key, item in self.cells.get(cell, {}).items() 
+                 if self.entries[key][1].contains(point) and item.isVisible() and item.contains(item.mapFromScene(point))]
+        found.sort(key = lambda item: item.zValue(), reverse = True)
+        return found
+
+
+class RigGraphicsScene(QtGui.QGraphicsScene):
+    """The RigGraphicsScene keeps a live registry of its items, bucketed by class
+
+    The registry is kept up to date as items are added and removed, so code that works on one kind of item
+    (all GuideMarkers, all Nodes ...) can ask for them with getItems() rather than checking the type of 
+    every item in the scene. As in the rest of the rig, the buckets are keyed on the exact class, so SuperNodes
+    are not returned with the Nodes.
+
+    Items that join the scene through their parent (setParentItem) rather than addItem() are added with
+    registerSceneItem().
+
+    The scene can also be set up with one of these strategies for hit-testing (setIndexStrategy):
+        "NoIndex"        - no index, every pick checks every item
+        "BspTree"        - Qt's BSP tree for all items
+        "BspTreeAndGrid" - Qt's BSP tree, and a RigGridIndex for the classes in gridClasses (Nodes), which is 
+                           updated as they move
+    pickItems() uses the grid whenever it only needs items of the grid classes. Qt cannot leave single items out
+    of its BSP tree, so the moving Nodes, and the ties and curves they drive, are still moved in the BSP tree on
+    every drag step - the grid makes Node picks cheap, but adds its own upkeep to a drag rather than replacing 
+    the BSP upkeep (see benchDragIndex in RigBenchmarks).
+
+    Items of the classes in cacheClasses (markers, pins, ties ...) rarely change, so they can be drawn from
+    a pixmap cache rather than painted again for every viewport update (setCacheMode):
+        "NoCache"               - every item is painted every time
+        "ItemCoordinateCache"   - cached in item space, rendered at the view scale given to resumeItemCaches()
+        "DeviceCoordinateCache" - cached in device space, re-rendered whenever the view is zoomed
+    Items that are being edited, and everything they drive, are painted directly between beginItemEdit() and 
+    endItemEdit(), and the caches are suspended while the view is zooming. Items can also opt out of the
+    cache while they are in an editable state with an isCacheable() method.
+
+    While a rig file is read (beginBulkLoad() to endBulkLoad()) the scene is not indexed and items are not
+    put in the grid index or their caches as they are added, so the whole load is indexed and cached in one go.
+    """
+
+    indexStrategies = ["NoIndex", "BspTree", "BspTreeAndGrid"]
+    cacheModes = {"NoCache" : QtGui.QGraphicsItem.NoCache,
+                  "ItemCoordinateCache" : QtGui.QGraphicsItem.ItemCoordinateCache,
+                  "DeviceCoordinateCache" : QtGui.QGraphicsItem.DeviceCoordinateCache}
+    maxCacheSize = 2048 #Largest side of an ItemCoordinateCache pixmap
+
+    def __init__(self, parent = None):
+        super(RigGraphicsScene, self).__init__(parent)
+        self.itemRegistry = {}
+        self.gridClasses = []
+        self.gridIndex = RigGridIndex()
+        self.indexStrategy = None
+        self.setIndexStrategy("BspTreeAndGrid")
+        self.cacheClasses = []
+        self.cacheMode = "NoCache"
+        self.cacheScale = 1.0
+        self.cacheSuspended = False
+        self.editedItems = {}
+        self.bulkLoading = False
+
+    def getIndexStrategy(self):
+        return self.indexStrategy
+
+    def setIndexStrategy(self, strategy):
+        if strategy not in self.indexStrategies:
+            print "WARNING : INVALID SCENE INDEX STRATEGY : " + str(strategy)
+            return
+        self.indexStrategy = strategy
+        if strategy == "NoIndex": self.setItemIndexMethod(QtGui.QGraphicsScene.NoIndex)
+        else: self.setItemIndexMethod(QtGui.QGraphicsScene.BspTreeIndex)
+        self.gridIndex.clear()
+        if self.isGridIndexed():
+            for itemClass in self.gridClasses:
+                for item in self.getItems(itemClass): self.gridIndex.update(item, item.sceneBoundingRect())
+
+    def isGridIndexed(self):
+        return self.indexStrategy == "BspTreeAndGrid"
+
+    def getGridClasses(self):
+        return self.gridClasses
+
+    def setGridClasses(self, gridClasses):
+        """Function to set the classes of item that are kept in the grid index"""
+        self.gridClasses = list(gridClasses)
+        self.setIndexStrategy(self.indexStrategy)
+
+    def setGridCellSize(self, cellSize):
+        self.gridIndex.setCellSize(cellSize)
+
+    def updateItemIndex(self, item):
+        """Function to bring the grid index up to date with an item that has moved"""
+        if self.bulkLoading: return #The grid is built once the load is finished
+        if self.isGridIndexed() and type(item) in self.gridClasses: 
+            self.gridIndex.update(item, item.sceneBoundingRect())
+
+    def pickItems(self, pos, itemClasses = None):
+        """Function to return the items at a scene position, optionally only those of the given classes"""
+        if itemClasses and self.isGridIndexed() and all(itemClass in self.gridClasses for itemClass in itemClasses):
+            return [item for item in self.gridIndex.items(pos) if type(item) in itemClasses]
+        items = self.items(pos)
+        if itemClasses: items = [item for item in items if type(item) in itemClasses]
+        return items
+
+    def getCacheMode(self):
+        return self.cacheMode
+
+    def setCacheMode(self, mode):
+        if mode not in self.cacheModes:
+            print "WARNING : INVALID ITEM CACHE MODE : " + str(mode)
+            return
+        self.cacheMode = mode
+        self.updateItemCaches()
+
+    def getCacheClasses(self):
+        return self.cacheClasses
+
+    def setCacheClasses(self, cacheClasses):
+        """Function to set the classes of item that are drawn from a cache when they are at rest"""
+        oldClasses = self.cacheClasses
+        self.cacheClasses = list(cacheClasses)
+        self.updateItemCaches(set(oldClasses + self.cacheClasses))
+
+    def isItemCached(self, item):
+        """Function to return whether an item should be drawn from a cache - it must be of a cache class, and at rest"""
+        if self.cacheSuspended or type(item) not in self.cacheClasses or id(item) in self.editedItems: return False
+        if hasattr(item, 'isCacheable'): return item.isCacheable()
+        return True
+
+    def updateItemCache(self, item):
+        """Function to set the cache mode of an item from the scene's caching policy"""
+        if self.bulkLoading: return #The caches are set once the load is finished
+        if not self.isItemCached(item): 
+            item.setCacheMode(QtGui.QGraphicsItem.NoCache)
+        elif self.cacheMode == "ItemCoordinateCache": #Render the cache at the view scale, so it stays sharp
+            rect = item.boundingRect()
+            width = min(max(int(math.ceil(rect.width()*self.cacheScale)), 1), self.maxCacheSize)
+            height = min(max(int(math.ceil(rect.height()*self.cacheScale)), 1), self.maxCacheSize)
+            item.setCacheMode(QtGui.QGraphicsItem.ItemCoordinateCache, QtCore.QSize(width, height))
+        else: 
+            item.setCacheMode(self.cacheModes[self.cacheMode])
+
+    def updateItemCaches(self, itemClasses = None):
+        """Function to set the cache mode of all of the items of the given classes (by default the cache classes)"""
+        if itemClasses == None: itemClasses = self.cacheClasses
+        for itemClass in itemClasses:
+            for item in self.getItems(itemClass): self.updateItemCache(item)
+
+    def beginItemEdit(self, items):
+        """Function to paint items directly while they are edited, along with everything downstream of them
+
+           A cached item that changes every frame has its cache rendered again every frame, which costs more
+           than painting it. The items driven by an edited item (ties, curves, skinned pins ...) change with it.
+        """
+        self.endItemEdit()
+        stack = list(items)
+        while stack:
+            item = stack.pop()
+            if id(item) in self.editedItems: continue
+            self.editedItems[id(item)] = item
+            if isinstance(item, RigGraphNode): stack.extend(item.getGraphOutputs())
+        for item in self.editedItems.values():
+            if type(item) in self.cacheClasses: self.updateItemCache(item)
+
+    def endItemEdit(self):
+        """Function to put the items that were being edited back into their caches"""
+        editedItems = self.editedItems.values()
+        self.editedItems = {}
+        for item in editedItems:
+            if type(item) in self.cacheClasses and item.scene() == self: self.updateItemCache(item)
+
+    def suspendItemCaches(self):
+        """Function to paint all items directly while the view is zooming, rather than rendering every cache at every step"""
+        if self.cacheSuspended: return
+        self.cacheSuspended = True
+        self.updateItemCaches()
+
+    def resumeItemCaches(self, viewScale = 1.0):
+        """Function to turn the caches back on once the view has settled at a new scale"""
+        self.cacheSuspended = False
+        self.cacheScale = viewScale
+        self.updateItemCaches()
+
+    def isBulkLoading(self):
+        return self.bulkLoading
+
+    def beginBulkLoad(self):
+        """Function to stop indexing the scene while a rig file is read in and thousands of items are added"""
+        self.bulkLoading = True
+        self.setItemIndexMethod(QtGui.QGraphicsScene.NoIndex)
+
+    def endBulkLoad(self):
+        """Function to build the scene index, the grid index and the item caches for everything added during the load"""
+        self.bulkLoading = False
+        self.setIndexStrategy(self.indexStrategy)
+        self.updateItemCaches()
+
+    def registerItem(self, item):
+        """Function to add an item, and all of its children, to the registry"""
+        self.itemRegistry.setdefault(type(item), {})[id(item)] = item
+        self.updateItemIndex(item)
+        if type(item) in self.cacheClasses: self.updateItemCache(item)
+        for child in item.childItems(): self.registerItem(child)
+
+    def unregisterItem(self, item):
+        """Function to remove an item, and all of its children, from the registry"""
+        if type(item) in self.itemRegistry: self.itemRegistry[type(item)].pop(id(item), None)
+        self.gridIndex.remove(item)
+        self.editedItems.pop(id(item), None)
+        for child in item.childItems(): self.unregisterItem(child)
+
+    def getItems(self, itemClass):
+        """Function to return all of the items in the scene of the given class"""
+        return self.itemRegistry.get(itemClass, {}).values()
+
+    def addItem(self, item):
+        QtGui.QGraphicsScene.addItem(self, item)
+        self.registerItem(item)
+
+    def removeItem(self, item):
+        self.unregisterItem(item)
+        QtGui.QGraphicsScene.removeItem(self, item)
+
+    def clear(self):
+        self.itemRegistry = {}
+        self.gridIndex.clear()
+        self.editedItems = {}
+        QtGui.QGraphicsScene.clear(self)
+
+
+def registerSceneItem(item):
+    """Function to add an item that has joined a scene through its parent to that scene's registry"""
+    if type(item.scene()) == RigGraphicsScene: item.scene().registerItem(item)
+
+def updateSceneIndex(item):
+    """Function to bring the spatial index of the item's scene up to date after the item has moved"""
+    if type(item.scene()) == RigGraphicsScene: item.scene().updateItemIndex(item)
+
+def updateSceneCache(item):
+    """Function to bring the cache mode of an item up to date after a change to whether it can be cached"""
+    if type(item.scene()) == RigGraphicsScene and type(item) in item.scene().getCacheClasses(): item.scene().updateItemCache(item)
+
+
+class RigStyleCache():
+    """The RigStyleCache is the one store of the pens, brushes, gradients and fixed paths the rig items paint with
+
+       Building QColors, QPens and QRadialGradients inside every paint() call is a large part of the cost
+       of a repaint, and a face rig has hundreds of items that look the same. Items describe their look with
+       a key - their class, colour, alpha, scale and the like - and every item with the same key shares one
+       style, built the first time that key is asked for. The styles are dictionaries of named Qt objects.
+    """
+    def __init__(self):
+        self.styles = {}
+        self.builds = 0
+
+    def getStyle(self, key, build):
+        """Function to return the style stored against the key, calling build() to make it the first time"""
+        style = self.styles.get(key)
+        if style is None:
+            style = build()
+            self.styles[key] = style
+            self.builds += 1
+        return style
+
+    def clear(self):
+        self.styles = {}
+
+    def __len__(self):
+        return len(self.styles)
+
+rigStyleCache = RigStyleCache()
+
+
+class RigShapeLibrary(RigStyleCache):
+    """The RigShapeLibrary is the one store of the fixed outlines (QPainterPaths) that items are drawn with
+
+       Outlines only change with the form and size of an item, so they are keyed on those and shared by every
+       item with the same key, rather than being rebuilt in paint() for each one.
+    """
+    def getShape(self, key, build):
+        """Function to return the shape stored against the key, calling build() to make it the first time"""
+        return self.getStyle(key, build)
+
+rigShapeLibrary = RigShapeLibrary()
+
+
+class RigLabelCache(RigStyleCache):
+    """The RigLabelCache is the one store of the text labels (marker indices ...) that items draw
+
+       Laying out text is one of the most expensive things Qt draws, and the same few numbers are drawn over and
+       over. Each label is laid out once as a QStaticText, keyed on its text, font size and colour, and shared by 
+       every item that draws it. The painter must have the same font set when the label is drawn.
+    """
+    def getLabel(self, text, font, colour):
+        """Function to return the shared QStaticText for the text, laid out in the font the first time it is asked for"""
+        def build():
+            staticText = QtGui.QStaticText(text)
+            staticText.setPerformanceHint(QtGui.QStaticText.AggressiveCaching)
+            staticText.prepare(QtGui.QTransform(), font)
+            return staticText
+        return self.getStyle((text, font.pointSize(), colour.rgba()), build)
+
+rigLabelCache = RigLabelCache()
+
+
+class RigResources():
+    """The RigResources are the one store of the stylesheets, icons and pixmaps read from disk by the rig and its UI
+
+       Each asset is read the first time it is asked for, and shared from then on, so that building items and
+       widgets (or moving the mouse over a button) never goes back to the disk. Paths are relative to the 
+       working directory, as they are elsewhere in the rig.
+    """
+    defaultStyleSheet = 'darkorange.stylesheet'
+
+    def __init__(self):
+        self.styleSheets = {}
+        self.icons = {}
+        self.pixmaps = {}
+        self.files = {}
+        self.reads = 0
+
+    def getStyleSheet(self, path = None):
+        """Function to return the text of a stylesheet (by default the rig's own), or None if it cannot be read"""
+        if path == None: path = self.defaultStyleSheet
+        if path not in self.styleSheets:
+            try:
+                with open(path, 'r') as handle: self.styleSheets[path] = handle.read()
+                self.reads += 1
+            except IOError:
+                print "WARNING : UNABLE TO READ STYLESHEET : " + str(path)
+                return None
+        return self.styleSheets[path]
+
+    def getIcon(self, path):
+        if path not in self.icons: 
+            self.icons[path] = QtGui.QIcon(path)
+            self.reads += 1
+        return self.icons[path]
+
+    def getPixmap(self, path):
+        if path not in self.pixmaps: 
+            self.pixmaps[path] = QtGui.QPixmap(path)
+            self.reads += 1
+        return self.pixmaps[path]
+
+    def hasFile(self, path):
+        """Function to return whether an asset exists on disk, checking only the first time it is asked about"""
+        if path not in self.files: self.files[path] = os.path.exists(path)
+        return self.files[path]
+
+    def clear(self):
+        self.styleSheets = {}
+        self.icons = {}
+        self.pixmaps = {}
+        self.files = {}
+
+rigResources = RigResources()
+
+
+class RigDetailLevels():
+    """The RigDetailLevels decide how much detail the rig items paint with, from how far the view is zoomed out
+
+       The view can be zoomed from 0.07x to 100x. Zoomed well out a pin is only a few pixels across, so the
+       wire curves, gradients and marker text cost time without being visible. Items ask for their level 
+       with getLevel(painter) in paint(), and draw a simplified version of themselves below "Full":
+           "Low"    - the least that still shows where the item is (dots for pins, flat circles for nodes ...)
+           "Medium" - the outline of the item, without text or fine detail
+           "Full"   - everything
+       The thresholds are the levelOfDetailFromTransform() of the painter at which each level starts.
+    """
+    levels = ["Low", "Medium", "Full"]
+
+    def __init__(self):
+        self.thresholds = {"Low" : 0.0, "Medium" : 0.3, "Full" : 0.6}
+        self.enabled = True
+
+    def getThreshold(self, level):
+        return self.thresholds[level]
+
+    def setThreshold(self, level, threshold):
+        if level not in self.levels:
+            print "WARNING : INVALID DETAIL LEVEL : " + str(level)
+            return
+        self.thresholds[level] = float(threshold)
+
+    def isEnabled(self):
+        return self.enabled
+
+    def setEnabled(self, enabled):
+        """Function to turn the simplified representations on or off - when off every item paints in full"""
+        self.enabled = bool(enabled)
+
+    def getLevel(self, painter):
+        """Function to return the level of detail to paint at, for the current transform of the painter"""
+        if not self.enabled: return "Full"
+        levelOfDetail = QtGui.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        if levelOfDetail >= self.thresholds["Full"]: return "Full"
+        elif levelOfDetail >= self.thresholds["Medium"]: return "Medium"
+        return "Low"
+
+rigDetailLevels = RigDetailLevels()
+
+
+class RigBulkLoad():
+    """The RigBulkLoad holds back the updates that items make as they are built, while a rig file is read in
+
+       Reading a WireGroup sets the position of every pin and node, and builds its ties and curve, and each of
+       these used to redraw the ties and curves they drive straight away - often before all of the nodes were
+       in place. Between begin() and end() the items marked as dirty are collected in one RigDependencyGraph
+       instead, and evaluated once at the end, so every tie and curve is drawn once with the final positions.
+       The scenes handed to begin() are not indexed until the end either (see RigGraphicsScene.beginBulkLoad).
+
+       Loads can be nested, only the outermost end() evaluates. When disabled, begin() and end() hold nothing back
+       and every item updates as it is built.
+    """
+    def __init__(self):
+        self.depth = 0
+        self.enabled = True
+        self.graph = RigDependencyGraph()
+        self.scenes = []
+
+    def isActive(self):
+        return self.enabled and self.depth > 0
+
+    def isEnabled(self):
+        return self.enabled
+
+    def setEnabled(self, enabled):
+        """Function to turn the bulk load on or off - takes effect from the next outermost begin()"""
+        if self.depth > 0:
+            print "WARNING : CANNOT CHANGE THE BULK LOAD DURING A LOAD"
+            return
+        self.enabled = bool(enabled)
+
+    def getGraph(self):
+        return self.graph
+
+    def begin(self, scene = None):
+        self.depth += 1
+        if self.enabled and type(scene) == RigGraphicsScene and scene not in self.scenes:
+            scene.beginBulkLoad()
+            self.scenes.append(scene)
+
+    def setDirty(self, item):
+        self.graph.setDirty(item)
+
+    def end(self):
+        if self.depth == 0: return
+        try:
+            if self.depth == 1: self.finish()
+        finally: self.depth -= 1
+
+    def finish(self):
+        """Function to evaluate everything that was marked as dirty during the load, then index the scenes"""
+        for key, item in self.graph.dirtyItems.items(): #Skip the items removed from the scene during the load
+            if isinstance(item, QtGui.QGraphicsItem) and item.scene() is None: del self.graph.dirtyItems[key]
+        scenes = self.scenes
+        self.scenes = []
+        try: self.graph.evaluate() #Still active, so anything marked as dirty by the evaluation joins a further pass
+        finally:
+            self.graph.clear()
+            for scene in scenes: scene.endBulkLoad()
+
+rigBulkLoad = RigBulkLoad()
+
+
+class RigAttributeSchema():
+    """The RigAttributeSchema declares the attributes an item class saves and loads, and how each one is written
+
+       Each attribute is given as (name, getter, setter, kind). The getter and setter are the names of methods
+       on the item, or functions taking the item (and the value), and the setter can be None for attributes
+       that are saved but not read back. The kind picks the encoder and decoder between the value and its
+       string in the file - "int", "float", "bool", "str", "point", "colour", "handle" (an [x,y] or None) and 
+       "weights" (a numpy array or None). The encoders are looked up once here, and read() finds the decoder 
+       and setter of each attribute in the file with one dictionary lookup. Attributes named in late are left
+       for readLate(), for items that need them set after their children are read.
+
+       The kinds are also handed on to FileControl, as the column types of the binary file format. Items streamed
+       from a binary file have no attribute elements, their values come straight from the columns and readValues()
+       sets them with the column decoders, without writing and parsing strings.
+    """
+    encoders = {"int" : str,
+                "float" : str,
+                "bool" : str,
+                "str" : str,
+                "point" : lambda p: str(p.x()) + "," + str(p.y()),
+                "colour" : lambda c: str(c.red()) + "," + str(c.green()) + "," + str(c.blue()),
+                "handle" : lambda h: "None" if h is None else str(h[0]) + "," + str(h[1]),
+                "weights" : lambda w: "None" if w is None else ",".join(str(v) for v in w.flatten())}
+
+    decoders = {"int" : int,
+                "float" : float,
+                "bool" : lambda v: v == 'True',
+                "str" : str,
+                "point" : lambda v: QtCore.QPointF(*[float(p) for p in v.split(",")]),
+                "colour" : lambda v: QtGui.QColor(*[int(c) for c in v.split(",")]),
+                "handle" : lambda v: None if v == "None" else [float(p) for p in v.split(",")],
+                "weights" : lambda v: None if v == "None" else [float(w) for w in v.split(",")]}
+
+    columnDecoders = {"int" : int,
+                      "float" : float,
+                      "bool" : bool,
+                      "str" : str,
+                      "point" : lambda v: QtCore.QPointF(v[0], v[1]),
+                      "colour" : lambda v: QtGui.QColor(v[0], v[1], v[2]),
+                      "handle" : lambda v: None if v is None else [float(p) for p in v],
+                      "weights" : lambda v: None if v is None else [float(w) for w in v]}
+
+    columnTypes = {"int" : "int", "float" : "float", "bool" : "bool", "str" : "str", "point" : "vec2float", 
+                   "colour" : "vec3int", "handle" : "vec2float", "weights" : "vec4float"}
+
+    def __init__(self, tag, attributes, late = []):
+        self.tag = tag
+        self.attributes = list(attributes)
+        self.storers = []
+        self.readers = {}
+        self.lateReaders = {}
+        self.valueReaders = [] #(name, decoder, column decoder, setter) in schema order, for readValues()
+        self.lateValueReaders = []
+        for name, getter, setter, kind in self.attributes:
+            if kind not in self.encoders:
+                print "WARNING : INVALID ATTRIBUTE KIND : " + str(kind)
+                continue
+            self.storers.append((name, self.compileGetter(getter), self.encoders[kind]))
+            if setter == None: continue
+            readers = self.lateReaders if name in late else self.readers
+            readers[name] = (self.decoders[kind], self.compileSetter(setter))
+            valueReaders = self.lateValueReaders if name in late else self.valueReaders
+            valueReaders.append((name, self.decoders[kind], self.columnDecoders[kind], readers[name][1]))
+        FileControl.registerAttributeTypes(tag, dict((name, self.columnTypes[kind]) for name, getter, setter, kind in self.attributes if kind in self.columnTypes))
+
+    def compileGetter(self, getter):
+        if callable(getter): return getter
+        return lambda item: getattr(item, getter)()
+
+    def compileSetter(self, setter):
+        if callable(setter): return setter
+        return lambda item, value: getattr(item, setter)(value)
+
+    def getTag(self):
+        return self.tag
+
+    def getAttributeNames(self):
+        return [attribute[0] for attribute in self.attributes]
+
+    def store(self, item):
+        """Function to return a new element for the item, holding an attributes block with every attribute in the schema"""
+        root = xml.Element(self.tag)
+        attributes = xml.SubElement(root, 'attributes')
+        attributes.extend([xml.Element('attribute', name = name, value = encode(get(item))) for name, get, encode in self.storers])
+        return root
+
+    def read(self, item, element, late = False):
+        """Function to set the item from the attributes block of an element, in the order they were saved"""
+        values = FileControl.getAttributeValues(element)
+        if values != None: return self.readValues(item, values, late)
+        readers = self.lateReaders if late else self.readers
+        for a in element.findall('attributes/attribute'):
+            reader = readers.get(a.attrib['name'])
+            if reader: reader[1](item, reader[0](a.attrib['value']))
+
+    def readLate(self, item, element):
+        """Function to set the attributes that were left out of read()"""
+        self.read(item, element, True)
+
+    def readValues(self, item, values, late = False):
+        """Function to set the item from a dictionary of attribute name : value, in schema order
+
+        Typed values (None for "None") go through the column decoders, strings through the usual decoders.
+        """
+        for name, decode, columnDecode, setter in (self.lateValueReaders if late else self.valueReaders):
+            if name not in values: continue
+            value = values[name]
+            setter(item, decode(value) if isinstance(value, basestring) else columnDecode(value))
+
+
+class RigStyledItem(object):
+    """Mixin for the items that paint with styles from the shared RigStyleCache
+
+    Items should call initStyle() in their constructor, once the attributes of their look are set, and
+    override styleKey() and buildStyle(). The item holds on to its style between repaints, so every setter
+    of an attribute in the key (colour, alpha, scale ...) must call invalidateStyle().
+    """
+    def initStyle(self):
+        self.style = None
+
+    def styleKey(self):
+        """Function to return the tuple of everything the look of the item depends on, starting with its class"""
+        return (type(self).__name__,)
+
+    def buildStyle(self):
+        """Function to build the dictionary of pens, brushes and paths for the current styleKey()"""
+        return {}
+
+    def getStyle(self):
+        if self.style is None: self.style = rigStyleCache.getStyle(self.styleKey(), self.buildStyle)
+        return self.style
+
+    def getDetailLevel(self, painter):
+        """Function to return the level of detail ("Low", "Medium" or "Full") to paint at, from the shared RigDetailLevels"""
+        return rigDetailLevels.getLevel(painter)
+
+    def invalidateStyle(self):
+        self.style = None
+        self.update()
+
+
+class RigTileDecoder(QtCore.QThread):
+    """The RigTileDecoder decodes background tiles into QImages on a worker thread, so the UI never waits on a large plate
+
+       Jobs are queued by the RigBackgroundCache with request(). Each job carries the generation of the image it was
+       asked for, so the results of an image that has since been replaced can be thrown away. A job with no tiles
+       decodes the whole image, for formats that do not record their size in a header. The decoder can also be used
+       without starting the thread, by calling decode() directly.
+
+       For a format that cannot decode a region the whole image is decoded as the source, every tile of the job is
+       cut from it in one pass, and it is dropped straight after. The jobs waiting in the queue when a job is taken
+       are decoded together, so they share one source.
+    """
+    tileDecoded = QtCore.pyqtSignal(int, object, QtGui.QImage) #generation, (level, column, row), image
+    sizeDecoded = QtCore.pyqtSignal(int, QtCore.QSize) #generation, size
+
+    def __init__(self, parent = None):
+        QtCore.QThread.__init__(self, parent)
+        self.jobs = Queue.Queue()
+        self.sourceDecodes = 0
+
+    def request(self, job):
+        if not self.isRunning(): self.start()
+        self.jobs.put(job)
+
+    def stop(self):
+        if self.isRunning():
+            self.jobs.put(None)
+            self.wait()
+
+    def run(self):
+        while True:
+            jobs = [self.jobs.get()]
+            while jobs[-1] is not None and not self.jobs.empty(): jobs.append(self.jobs.get())
+            sources = {} #(generation, imagePath) : source, shared by the jobs taken together
+            for job in jobs:
+                if job is None: return
+                for key, image in self.decode(job, sources):
+                    if key is None: self.sizeDecoded.emit(job[0], image.size())
+                    else: self.tileDecoded.emit(job[0], key, image)
+
+    def getSource(self, generation, imagePath, sources = None):
+        """Function to decode the whole image, or return the one already decoded for the jobs taken together"""
+        if sources is None: sources = {}
+        if (generation, imagePath) not in sources:
+            sources[(generation, imagePath)] = QtGui.QImageReader(imagePath).read()
+            self.sourceDecodes += 1
+        return sources[(generation, imagePath)]
+
+    def decode(self, job, sources = None):
+        """Function to decode the tiles of one level of the image, job is (generation, imagePath, canClip, levelSize, tiles)
+
+        tiles is a list of (key, clip rect), or None for the whole image. Returns a list of (key, image), with the key
+        None for the whole image.
+        """
+        generation, imagePath, canClip, levelSize, tiles = job
+        if tiles is None: return [(None, self.getSource(generation, imagePath, sources))]
+        if canClip:
+            images = []
+            for key, clip in tiles:
+                reader = QtGui.QImageReader(imagePath)
+                if levelSize != reader.size(): reader.setScaledSize(levelSize)
+                reader.setScaledClipRect(clip)
+                images.append((key, reader.read()))
+            return images
+        source = self.getSource(generation, imagePath, sources)
+        if levelSize == source.size(): return [(key, source.copy(clip)) for key, clip in tiles]
+        scaleX = float(source.width())/levelSize.width()
+        scaleY = float(source.height())/levelSize.height()
+        images = []
+        for key, clip in tiles:
+            sourceRect = QtCore.QRect(int(clip.x()*scaleX), int(clip.y()*scaleY), int(math.ceil(clip.width()*scaleX)), int(math.ceil(clip.height()*scaleY)))
+            images.append((key, source.copy(sourceRect).scaled(clip.size(), QtCore.Qt.IgnoreAspectRatio, QtCore.Qt.SmoothTransformation)))
+        return images
+
+
+class RigBackgroundCache(QtCore.QObject):
+    """The RigBackgroundCache holds the decoded background image of the RigGraphicsView as tiles
+
+       Scanned face plates can be far larger than the screen, so the image is never decoded as a whole for
+       drawing. It is split into tileSize square tiles at a number of levels (mip levels) - level 0 is the full
+       image and each further level is half the size of the one before, until it fits in a single tile. Tiles
+       are decoded the first time they are drawn and kept as pixmaps in a least recently drawn (LRU) order, and
+       the oldest are dropped when the tiles take up more than memoryCap bytes.
+
+       Where the image format can decode a region (JPEG) only that region of the file is read for a tile. Other
+       formats (PNG) have to be decoded whole, so the tiles of a level are grouped in square blocks, and a missing
+       tile asks for every tile of its block to be cut from one decode of the image, which is dropped straight 
+       after. Blocks are sized so that the four blocks a view can straddle take up at most half of memoryCap, so
+       panning only decodes the image again on reaching a block that is not cached, however many frames it takes.
+       The decoded image itself is only held while its tiles are cut, and is not counted against memoryCap. The
+       image is only read again when the modification time of the file changes.
+
+       The decoding is done by a RigTileDecoder on a worker thread. The single tile of the smallest level is
+       asked for first, and stands in as a low resolution placeholder for any tile that is still being decoded.
+       sizeReady is emitted once the size of the image is known, and tileReady with the scene rect of each tile
+       as it arrives. With asynchronous False the tiles are decoded as they are drawn.
+    """
+    sizeReady = QtCore.pyqtSignal(QtCore.QSize)
+    tileReady = QtCore.pyqtSignal(QtCore.QRectF)
+
+    def __init__(self, parent = None, tileSize = 256, memoryCap = 128*1024*1024, asynchronous = True):
+        QtCore.QObject.__init__(self, parent)
+        self.tileSize = tileSize
+        self.memoryCap = memoryCap
+        self.blockSize = max(1, int(math.sqrt(memoryCap/(8*4*tileSize*tileSize)))) #Tiles along the side of a block, for formats that cannot decode a region
+        self.asynchronous = asynchronous
+        self.generation = 0
+        self.decoder = RigTileDecoder(self)
+        self.decoder.tileDecoded.connect(self.addDecodedTile)
+        self.decoder.sizeDecoded.connect(self.setDecodedSize)
+        if QtCore.QCoreApplication.instance(): QtCore.QCoreApplication.instance().aboutToQuit.connect(self.decoder.stop)
+        self.clear()
+
+    def clear(self):
+        self.generation += 1 #Anything still being decoded for the last image is thrown away when it arrives
+        self.imagePath = None
+        self.mtime = None
+        self.size = QtCore.QSize(0, 0)
+        self.levelCount = 0
+        self.canClip = False
+        self.placeholder = None
+        self.clearTiles()
+
+    def clearTiles(self):
+        self.tiles = collections.OrderedDict() #(level, column, row) : QPixmap, least recently drawn first
+        self.pending = set()
+        self.memory = 0
+        self.decodes = 0
+        self.blockDecodes = collections.Counter() #(level, block column, block row) : times cut from a decoded image
+
+    def isValid(self):
+        return self.levelCount > 0
+
+    def isPending(self):
+        return len(self.pending) > 0
+
+    def setImage(self, imagePath):
+        """Function to point the cache at an image file, reading its header if it is new or has changed on disk"""
+        if not imagePath: return self.clear()
+        imagePath = str(imagePath)
+        try: mtime = os.path.getmtime(imagePath)
+        except OSError:
+            print "WARNING : BACKGROUND IMAGE CANNOT BE FOUND : " + imagePath
+            return self.clear()
+        if imagePath == self.imagePath and mtime == self.mtime: return
+        self.clear()
+        self.imagePath = imagePath
+        self.mtime = mtime
+        reader = QtGui.QImageReader(imagePath)
+        self.canClip = reader.supportsOption(QtGui.QImageIOHandler.ScaledClipRect)
+        if reader.size().isValid(): self.setSize(reader.size())
+        else: self.requestDecode(None) #The format does not record its size in a header, so it is decoded whole
+
+    def setSize(self, size):
+        """Function to set up the levels once the size of the image is known, and ask for the placeholder"""
+        if size.isEmpty():
+            print "WARNING : BACKGROUND IMAGE CANNOT BE READ : " + self.imagePath
+            return
+        self.size = QtCore.QSize(size)
+        self.levelCount = 1
+        while max(self.getLevelSize(self.levelCount - 1).width(), self.getLevelSize(self.levelCount - 1).height()) > self.tileSize: 
+            self.levelCount += 1
+        self.requestDecode((self.levelCount - 1, 0, 0))
+        self.sizeReady.emit(self.size)
+
+    def getSize(self):
+        return self.size
+
+    def getLevelSize(self, level):
+        return QtCore.QSize(int(math.ceil(self.size.width()/2.0**level)), int(math.ceil(self.size.height()/2.0**level)))
+
+    def getLevel(self, viewScale):
+        """Function to return the index of the smallest level with at least one pixel for each pixel drawn at the view scale"""
+        level = 0
+        while level + 1 < self.levelCount and viewScale <= 0.5**(level + 1): level += 1
+        return level
+
+    def getTileRect(self, key):
+        """Function to return the rect that a tile covers in the scene"""
+        level, column, row = key
+        levelSize = self.getLevelSize(level)
+        clip = QtCore.QRect(column*self.tileSize, row*self.tileSize, self.tileSize, self.tileSize).intersected(QtCore.QRect(QtCore.QPoint(0, 0), levelSize))
+        scaleX = float(self.size.width())/levelSize.width()
+        scaleY = float(self.size.height())/levelSize.height()
+        return QtCore.QRectF(clip.x()*scaleX, clip.y()*scaleY, clip.width()*scaleX, clip.height()*scaleY)
+
+    def getTileClip(self, key):
+        """Function to return the rect that a tile covers in its level"""
+        levelSize = self.getLevelSize(key[0])
+        return QtCore.QRect(key[1]*self.tileSize, key[2]*self.tileSize, self.tileSize, self.tileSize).intersected(QtCore.QRect(QtCore.QPoint(0, 0), levelSize))
+
+    def getBlockKeys(self, key):
+        """Function to return the keys of the tiles in the block of a tile that are not cached or asked for, with the tile last"""
+        level, column, row = key
+        levelSize = self.getLevelSize(level)
+        firstColumn, firstRow = column - column%self.blockSize, row - row%self.blockSize
+        endColumn = min(firstColumn + self.blockSize, (levelSize.width() - 1)/self.tileSize + 1)
+        endRow = min(firstRow + self.blockSize, (levelSize.height() - 1)/self.tileSize + 1)
+        self.blockDecodes[(level, column/self.blockSize, row/self.blockSize)] += 1
+        keys = [(level, c, r) for r in range(firstRow, endRow) for c in range(firstColumn, endColumn)]
+        return [k for k in keys if k != key and k not in self.tiles and k not in self.pending] + [key]
+
+    def requestDecode(self, key):
+        """Function to ask the decoder for a tile (and the rest of its block, for formats that cannot decode a region), 
+        or for the whole image when key is None"""
+        if key in self.pending: return
+        job = (self.generation, self.imagePath, self.canClip, None, None)
+        keys = [key]
+        if key is not None:
+            if not self.canClip: keys = self.getBlockKeys(key)
+            job = (self.generation, self.imagePath, self.canClip, self.getLevelSize(key[0]), [(k, self.getTileClip(k)) for k in keys])
+        self.pending.update(keys)
+        self.decodes += 1
+        if self.asynchronous: return self.decoder.request(job)
+        for key, image in self.decoder.decode(job):
+            if key is None: self.setDecodedSize(self.generation, image.size())
+            else: self.addDecodedTile(self.generation, key, image)
+
+    def setDecodedSize(self, generation, size):
+        if generation != self.generation: return
+        self.pending.discard(None)
+        self.setSize(size)
+
+    def addDecodedTile(self, generation, key, image):
+        """Function to take a decoded tile into the cache, dropping the oldest tiles over the memory cap"""
+        if generation != self.generation: return
+        self.pending.discard(key)
+        pixmap = QtGui.QPixmap.fromImage(image) #Pixmaps can only be made on the UI thread
+        if key[0] == self.levelCount - 1: self.placeholder = pixmap
+        self.tiles[key] = pixmap
+        self.memory += 4*pixmap.width()*pixmap.height()
+        while self.memory > self.memoryCap and len(self.tiles) > 1:
+            oldKey, oldPixmap = self.tiles.popitem(last = False)
+            self.memory -= 4*oldPixmap.width()*oldPixmap.height()
+        self.tileReady.emit(self.getTileRect(key))
+
+    def getTile(self, key):
+        """Function to return the pixmap of a tile, or None while it is being decoded"""
+        pixmap = self.tiles.pop(key, None)
+        if pixmap is None:
+            self.requestDecode(key)
+            pixmap = self.tiles.pop(key, None) #Only there straight away when decoding synchronously
+            if pixmap is None: return None
+        self.tiles[key] = pixmap #The most recently drawn tiles are kept at the end
+        return pixmap
+
+    def draw(self, painter, rect):
+        """Function to draw the tiles of the background that lie in the exposed scene rect"""
+        if not self.isValid(): return
+        exposed = rect.intersected(QtCore.QRectF(0, 0, self.size.width(), self.size.height()))
+        if exposed.isEmpty(): return
+        level = self.getLevel(QtGui.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()))
+        levelSize = self.getLevelSize(level)
+        scaleX = float(self.size.width())/levelSize.width()
+        scaleY = float(self.size.height())/levelSize.height()
+        lastColumn = (levelSize.width() - 1)/self.tileSize
+        lastRow = (levelSize.height() - 1)/self.tileSize
+        firstColumn, firstRow = int(exposed.left()/scaleX)/self.tileSize, int(exposed.top()/scaleY)/self.tileSize
+        endColumn = min(int(exposed.right()/scaleX)/self.tileSize, lastColumn)
+        endRow = min(int(exposed.bottom()/scaleY)/self.tileSize, lastRow)
+        tiles = []
+        for row in range(firstRow, endRow + 1):
+            for column in range(firstColumn, endColumn + 1):
+                key = (level, column, row)
+                tiles.append((self.getTileRect(key), self.getTile(key)))
+        if self.placeholder and None in [pixmap for tileRect, pixmap in tiles]: #Stretch the placeholder over the tiles still to come
+            placeholderScaleX = float(self.placeholder.width())/self.size.width()
+            placeholderScaleY = float(self.placeholder.height())/self.size.height()
+            source = QtCore.QRectF(exposed.x()*placeholderScaleX, exposed.y()*placeholderScaleY, exposed.width()*placeholderScaleX, exposed.height()*placeholderScaleY)
+            painter.drawPixmap(exposed, self.placeholder, source)
+        for tileRect, pixmap in tiles:
+            if pixmap: painter.drawPixmap(tileRect, pixmap, QtCore.QRectF(pixmap.rect()))
+
+
+class PinTie(QtGui.QGraphicsItem, RigGraphNode, RigStyledItem):
     """A PinTie is the yellow dotted line that connects a ControlPin (pin) to the moving Node, or SuperNode
 
        This should be updated every time the node or the ControlPin (pin) move. This is normally done by  
-       calling the "drawTie()" method in the "itemChange()" method of the node or ControlPin
+       marking the node or ControlPin as dirty in its "itemChange()" method. The tie is an output of both
+       in the RigDependencyGraph, so "drawTie()" is then called once when the graph is evaluated
     """
     def __init__(self, startNode, endNode):
         super(PinTie, self).__init__()
+        self.initGraph()
         # self.setFlag(QtGui.QGraphicsItem.ItemSendsGeometryChanges)
         self.thickness = 0.5
         self.index = 0 
@@ -93,7 +1313,9 @@ class PinTie(QtGui.QGraphicsItem):
         self.startPoint = None
         self.endPoint = None
         self.midPoint = None
-        self.drawTie()
+        self.line = QtGui.QPainterPath()
+        self.initStyle()
+        self.markDirty() #Drawn straight away, or once the nodes are in place at the end of a RigBulkLoad
         self.setZValue(1) #Set Draw sorting order - 0 is furthest back. Put curves and pins near the back. Nodes and markers nearer the front.
         # self.setParentItem(self.startNode) # consider implemeting a tie as a child of the pin
 
@@ -114,6 +1336,7 @@ class PinTie(QtGui.QGraphicsItem):
 
     def setThickness(self, thickness):
         self.thickness = thickness
+        self.invalidateStyle()
 
     def linePoints(self):
         """Function to calulate the start mid and end points of the line"""
@@ -134,43 +1357,64 @@ class PinTie(QtGui.QGraphicsItem):
             self.line.moveTo(self.startPoint)
             self.line.lineTo(self.endPoint) 
 
+    def evaluate(self):
+        self.drawTie()
+
+    def styleKey(self):
+        return ("PinTie", self.thickness)
+
+    def buildStyle(self):
+        return {'pen' : QtGui.QPen(QtGui.QColor(255,255,0), self.thickness, QtCore.Qt.DotLine)}
+
     def paint(self, painter, option, widget):
         # self.prepareGeometryChange()
-        pen = QtGui.QPen(QtGui.QColor(255,255,0), self.thickness, QtCore.Qt.DotLine)
-        painter.setPen(pen)
-        painter.strokePath(self.line, painter.pen())
+        painter.strokePath(self.line, self.getStyle()['pen'])
 
 
 
 
 
 
-class RigCurve(QtGui.QGraphicsItem):
+class RigCurve(QtGui.QGraphicsItem, RigGraphNode, RigStyledItem):
     """This the graphics Item that serves to draw the curve that connects all the nodes together in a WireGroup
 
        The user cannot interact with this curve, it is drawn automaticall when a Node or ControlPin is moved
        
-       Currently, this curve is very intensive, and needs optimising in a serious way using dirty bits to 
-       limit the number of times the redraw is calculated. Investigate this!  
+       The Bezier handles for every node on the wire are solved together with whole array operations
+       (see solveBezierHandles), rather than segment by segment. The curve keeps the positions, handles
+       and segment control points from its last evaluation, so when nodes are flagged as moved (setNodeDirty)
+       only the neighbouring handles and segments are recalculated and spliced back in. The path itself is 
+       still put back together from every segment, which stays O(N) in the nodes, so that it is one continuous
+       path and the dash pattern and joins run along the whole wire.
     """
     def __init__(self, color, controlNodes, parent=None, scene=None):
         super(RigCurve, self).__init__(parent, scene)
+        self.initGraph()
         self.selected = False
         self.color = color
         self.nodeList = self.getNodeList(controlNodes)
         self.curveSwing = 0.25
         self.handlescale = 0.3
         self.secondHandleScale = 0.5
+        self.path = QtGui.QPainterPath()
+        self.points = None #Cached node positions, Bezier handles and segment control points from the last evaluation
+        self.handlesIn = None
+        self.handlesOut = None
+        self.segments = [] #(first handle, second handle, end point) of the cubic to each node after the first
+        self.dirtyNodes = set() #Indexes of the nodes that have moved since the last evaluation
+        self.initStyle()
         self.addCurveLink()
-        self.buildCurve()
+        self.markDirty() #Built straight away, or once the nodes are in place at the end of a RigBulkLoad
         self.setZValue(0) #Set Draw sorting order - 0 is furthest back. Put curves and pins near the back. Nodes and markers nearer the front.
 
     def getNodeList(self, controlNodes):
         """Function to collect and store control nodes as weak references"""
         self.nodeList = []
         if len(controlNodes) < 3: print "WARNING : There are less than 3 Control Nodes" 
-        for n in controlNodes: 
+        self.nodeIndexes = {}
+        for index, n in enumerate(controlNodes): 
             self.nodeList.append(weakref.ref(n))
+            self.nodeIndexes[id(n)] = index
         return self.nodeList
 
     def addCurveLink(self):
@@ -183,71 +1427,101 @@ class RigCurve(QtGui.QGraphicsItem):
     def boundingRect(self):
         return self.path.boundingRect()
 
+    def styleKey(self):
+        return ("RigCurve", self.color.rgba())
+
+    def buildStyle(self):
+        return {'pen' : QtGui.QPen(QtCore.Qt.black, 1.2, QtCore.Qt.DotLine), 'brush' : QtGui.QBrush(self.color)}
+
     def paint(self, painter, option, widget):
-        pen = QtGui.QPen(QtCore.Qt.black, 1.2, QtCore.Qt.DotLine)
-        painter.setPen(pen)
-        painter.setBrush(self.color)
-        painter.strokePath(self.path, painter.pen())
+        style = self.getStyle()
+        painter.setBrush(style['brush'])
+        painter.strokePath(self.path, style['pen'])
+
+    def nodePositions(self):
+        """Function to gather the scene positions of all the control nodes into a single (N,2) array"""
+        positions = np.empty((len(self.nodeList), 2))
+        for index, node in enumerate(self.nodeList):
+            pos = node().scenePos()
+            positions[index] = (pos.x(), pos.y())
+        return positions
+
+    def setNodeDirty(self, node):
+        """Function to record that a node has moved since the curve was last evaluated"""
+        index = self.nodeIndexes.get(id(node))
+        if index is not None: self.dirtyNodes.add(index)
+
+    def evaluate(self):
+        self.buildCurve()
 
     def buildCurve(self):
-        """Function to build section of Bezier"""
+        """Function to bring the curve up to date with the nodes
+
+        If the curve has been evaluated before and it has been told which nodes moved (setNodeDirty)
+        then only the segments and handles around those nodes are recalculated, otherwise the whole
+        wire is rebuilt
+        """
         if self.isVisible:
             if len(self.nodeList) >= 3:
-                self.path = QtGui.QPainterPath()
-                self.prepareGeometryChange()
-                #BuildSection
-                curveInfo = RigCurveInfo(self.nodeList[0],self.nodeList[1],self.nodeList[2])
-                startPoint = curveInfo.getStartPos()
-                endPoint = curveInfo.getEndPos()
-                targetPoint= curveInfo.getTargPos()
-                #Take point at a 1/3 of the way along the line and 2/3 of the way along the line
-                cP1 = startPoint + self.handlescale*curveInfo.getDirVec() - curveInfo.getDirDist()*curveInfo.getperpUnitVec()*self.curveSwing*curveInfo.getPerpSwing()
-                cP2 = startPoint + (1-self.handlescale)*curveInfo.getDirVec() - curveInfo.getDirDist()*curveInfo.getperpUnitVec()*self.curveSwing*curveInfo.getPerpSwing()
-                #Now make sure that we assign the new Bezier handles to the end node, but making the far handle proportional to the next segment length
-                self.nodeList[0]().setBezierHandles(cP1, 1)
-                self.nodeList[1]().setBezierHandles(cP2, 0)
-                #Now calculate our endNode second handle - to do this we need to calculate the distance to the next node (endnode to targetnode)
-                targNodeDist = np.linalg.norm(targetPoint - endPoint)
-                #Now set the next handle of the endpoint to be the same tangent, but scaled in proportion to the length of the endnode -> targetnode segment 
-                cPNext = (endPoint - cP2)*self.secondHandleScale*curveInfo.getTargetNodeDist()/curveInfo.getDirDist() + endPoint
-                self.nodeList[1]().setBezierHandles(cPNext, 1)
-                # print "End Node Handle Test : " + str(self.nodeList[1]().getBezierHandles(0))
-                # print "End Node Handle Test : " + str(self.nodeList[1]().getBezierHandles(1))
-                # print "CP1 : " + str(cP1)
-                # print "CP2 : " + str(cP2)
-                #Move the points out along the the perpendicular vector by a 3rd of the magnitude
-                self.path.moveTo(QPVec(startPoint))
-                self.path.cubicTo(QPVec(cP1),QPVec(cP2),QPVec(endPoint))
-                # self.path.cubicTo(QPVec([20,20]),QPVec([40,20]),QPVec([50,50]))
-                midNodes = self.nodeList[1:-2]
-                for index,node in enumerate(midNodes): #This is setup to give us nodes and indexing
-                    curveInfo = RigCurveInfo(node,self.nodeList[index+2],self.nodeList[index+3])
-                    startPoint = curveInfo.getStartPos()
-                    endPoint = curveInfo.getEndPos()
-                    targetPoint= curveInfo.getTargPos()
-                    #First Control Point is already resolved!
-                    cP1 = node().getBezierHandles(1)
-                    cP2 = startPoint + (1-self.handlescale)*curveInfo.getDirVec() - curveInfo.getDirDist()*curveInfo.getperpUnitVec()*self.curveSwing*curveInfo.getPerpSwing()
-
-                    node().setBezierHandles(cP1, 1)
-                    self.nodeList[index+2]().setBezierHandles(cP2, 0)
-                    #Now figure out next node hand
-                    targNodeDist = np.linalg.norm(targetPoint - endPoint)
-                    cPNext = (endPoint - cP2)*self.secondHandleScale*curveInfo.getTargetNodeDist()/curveInfo.getDirDist() + endPoint
-                    self.nodeList[index+2]().setBezierHandles(cPNext, 1)
-                    self.path.cubicTo(QPVec(cP1),QPVec(cP2),QPVec(endPoint))
-                #Now place the final Bezier. To do this we will calculate from the end backwards, then plot the nodes forwards
-                curveInfo = RigCurveInfo(self.nodeList[-1],self.nodeList[-2],self.nodeList[-3])
-                startPoint = curveInfo.getStartPos()
-                endPoint = curveInfo.getEndPos()
-                targetPoint= curveInfo.getTargPos()
-                cP2 = startPoint + self.handlescale*curveInfo.getDirVec() - curveInfo.getDirDist()*curveInfo.getperpUnitVec()*self.curveSwing*curveInfo.getPerpSwing()
-                #We have cP1 from our previous Node calculations
-                cP1 = self.nodeList[-2]().getBezierHandles(1)
-                self.nodeList[-1]().setBezierHandles(cP2, 0)
-                self.path.cubicTo(QPVec(cP1),QPVec(cP2),QPVec(startPoint))
+                if self.points is not None and self.dirtyNodes:
+                    self.updateSegments()
+                else:
+                    self.rebuildSegments()
+                self.dirtyNodes = set()
+
+    def rebuildSegments(self):
+        """Function to solve all the Bezier handles for the wire in one pass and rebuild every segment"""
+        self.points = self.nodePositions()
+        self.handlesIn, self.handlesOut = solveBezierHandles(self.points, self.handlescale, self.curveSwing, self.secondHandleScale)
+        nodeCount = len(self.nodeList)
+        self.assignHandles(range(nodeCount))
+        self.segments = [None]*(nodeCount - 1)
+        self.spliceSegments(range(nodeCount - 1))
+
+    def updateSegments(self):
+        """Function to re-solve only the handles and segments that depend on the dirty nodes"""
+        nodeCount = len(self.nodeList)
+        for index in self.dirtyNodes:
+            pos = self.nodeList[index]().scenePos()
+            self.points[index] = (pos.x(), pos.y())
+        terms = dirtyTerms(self.dirtyNodes, nodeCount)
+        solveBezierHandles(self.points, self.handlescale, self.curveSwing, self.secondHandleScale, self.handlesIn, self.handlesOut, terms)
 
+        #Work out which nodes have new handles and which segments use the moved points or new handles
+        changedNodes = set()
+        segments = set()
+        for term in terms:
+            if term < nodeCount - 2:
+                changedNodes.update((term, term + 1))
+                segments.update((term, term + 1))
+            else:
+                changedNodes.add(nodeCount - 1)
+                segments.add(nodeCount - 2)
+        for index in self.dirtyNodes:
+            segments.update((index - 1, index))
+        self.assignHandles(sorted(changedNodes))
+        self.spliceSegments([s for s in sorted(segments) if 0 <= s < nodeCount - 1])
 
+    def assignHandles(self, indexes):
+        """Function to pass the solved Bezier handles on to the nodes
 
+        The first node has no incoming handle and the last node has no outgoing handle
+        """
+        lastIndex = len(self.nodeList) - 1
+        for index in indexes:
+            node = self.nodeList[index]()
+            if index > 0: node.setBezierHandles(self.handlesIn[index].copy(), 0)
+            if index < lastIndex: node.setBezierHandles(self.handlesOut[index].copy(), 1)
 
+    def spliceSegments(self, segments):
+        """Function to rebuild the given segments in the cached segment list and reassemble the curve path
 
+        The path is one moveTo and a cubicTo for every segment, as a single continuous subpath. Only the changed
+        segments are recalculated, but the assembly walks every segment, so it is O(N) in the nodes.
+        """
+        for index in segments:
+            self.segments[index] = (QPVec(self.handlesOut[index]), QPVec(self.handlesIn[index+1]), QPVec(self.points[index+1]))
+        self.prepareGeometryChange()
+        self.path = QtGui.QPainterPath(QPVec(self.points[0]))
+        for handleOut, handleIn, point in self.segments:
+            self.path.cubicTo(handleOut, handleIn, point)
@@ -50,7 +50,7 @@ class WireGroupButton(QtGui.QPushButton):
     def initUI(self):
         """Check the images folder to see if there is an appropriate image to load""" 
         self.setStyleSheet(self.validImageFile())
-        self.pixmap = QtGui.QPixmap(self.imageFile)
+        self.pixmap = rigResources.getPixmap(self.imageFile)
 
     def leaveEvent(self,event):
         # QtGui.QPushButton.mouseReleaseEvent(self, event)
@@ -89,7 +89,7 @@ class WireGroupButton(QtGui.QPushButton):
             imageFile = 'images/' + self.itemName + '.png'
             imageFileCss = 'image: url(:/' + imageFile + ');'
 
-        if os.path.exists(imageFile): #create icon and add to button
+        if rigResources.hasFile(imageFile): #create icon and add to button
             self.imageFile = imageFile
             return imageFileCss
         else:
@@ -125,7 +125,7 @@ class DragItemButton(QtGui.QPushButton):
     def initUI(self):
         """Check the images folder to see if there is an appropriate image to load""" 
         self.setStyleSheet(self.validImageFile())
-        self.pixmap = QtGui.QPixmap(self.imageFile)
+        self.pixmap = rigResources.getPixmap(self.imageFile)
 
     def leaveEvent(self,event):
         self.setDown(False)
@@ -152,7 +152,7 @@ class DragItemButton(QtGui.QPushButton):
             imageFile = 'images/' + self.itemName + '.png'
             imageFileCss = 'image: url(:/' + imageFile + ');'
 
-        if os.path.exists(imageFile): #create icon and add to button
+        if rigResources.hasFile(imageFile): #create icon and add to button
             self.imageFile = imageFile
             return imageFileCss
         else:
@@ -206,7 +206,7 @@ class DragSuperNodeButton(DragItemButton):
             imageFile = 'images/' + self.form + '.png'
             imageFileCss = 'image: url(:/' + imageFile + ');'
 
-        if os.path.exists(imageFile): #create icon and add to button
+        if rigResources.hasFile(imageFile): #create icon and add to button
             self.imageFile = imageFile
             return imageFileCss
         else:
@@ -227,22 +227,129 @@ class DragSuperNodeButton(DragItemButton):
 
 
 
-class SkinTabW(QtGui.QTableWidget):
-    """Class to subclass QTableWidget to give us control over how we handle
+class SkinTableModel(QtCore.QAbstractTableModel):
+    """Table model over the skinning Info of a SuperNode, for the SkinTabW
+
+    Nothing is copied out of the SuperNode when it is set. Each cell is read from its SkinningPinInfo when the
+    view asks for it, so only the rows that are on screen are ever built.
+
+    Edits go through setRangeData(), so a value can be filled down many rows at once with a single
+    update of the skinning deformation at the end.
+    """
+
+    SKINVALUE = 3
+    AXISWEIGHTS = 4
+
+    def __init__(self, parent = None):
+        super(SkinTableModel, self).__init__(parent)
+        self.superNode = None
+        self.headers = ["  Super Node Controller  ", "  Node Wire Group  ", "  Node Index  ", "  Skin Value  ", "  Axis Weights (xx,xy,yx,yy)  "]
+
+    def getSuperNode(self):
+        return self.superNode
+
+    def setSuperNode(self, superNode):
+        self.beginResetModel()
+        self.superNode = superNode
+        self.endResetModel()
+
+    def getSkinnedPins(self):
+        if self.superNode: return self.superNode.getSkinnedPins()
+        return []
+
+    def rowCount(self, parent = QtCore.QModelIndex()):
+        if parent.isValid(): return 0
+        return len(self.getSkinnedPins())
+
+    def columnCount(self, parent = QtCore.QModelIndex()):
+        if parent.isValid(): return 0
+        return len(self.headers)
+
+    def headerData(self, section, orientation, role = QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole:
+            if orientation == QtCore.Qt.Horizontal: return QtCore.QVariant(self.headers[section])
+            return QtCore.QVariant(section + 1)
+        return QtCore.QVariant()
+
+    def flags(self, index):
+        if not index.isValid(): return QtCore.Qt.NoItemFlags
+        if index.column() in (self.SKINVALUE, self.AXISWEIGHTS): 
+            return QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsEditable
+        return QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
+
+    def data(self, index, role = QtCore.Qt.DisplayRole):
+        if not index.isValid() or role not in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole): return QtCore.QVariant()
+        skinPin = self.getSkinnedPins()[index.row()]
+        column = index.column()
+        if column == 0: return QtCore.QVariant(self.superNode.getName())
+        elif column == 1: return QtCore.QVariant(skinPin.getWireGroupName())
+        elif column == 2: return QtCore.QVariant(str(skinPin.getPinIndex()))
+        elif column == self.SKINVALUE: 
+            if role == QtCore.Qt.EditRole: return QtCore.QVariant(repr(float(skinPin.getSkinValue()))) #Full precision, so an unchanged edit writes back the same value
+            return QtCore.QVariant(str(skinPin.getSkinValue()))
+        elif column == self.AXISWEIGHTS:
+            if skinPin.getAxisWeights() is None: return QtCore.QVariant("")
+            if role == QtCore.Qt.EditRole: return QtCore.QVariant(",".join(repr(float(w)) for w in skinPin.getAxisWeights().flatten()))
+            return QtCore.QVariant(",".join(str(round(w, 2)) for w in skinPin.getAxisWeights().flatten())) #Rounded for display only
+        return QtCore.QVariant()
+
+    def setData(self, index, value, role = QtCore.Qt.EditRole):
+        if not index.isValid() or role != QtCore.Qt.EditRole: return False
+        return self.setRangeData([index.row()], index.column(), str(value.toString()))
+
+    def setRangeData(self, rows, column, text):
+        """Function to set the same skin value or axis weights on a set of rows, then update the deformation once"""
+        if not self.superNode or not rows: return False
+        text = str(text).strip()
+        skinnedPins = self.getSkinnedPins()
+        if column == self.SKINVALUE:
+            try: skinValue = float(text)
+            except ValueError:
+                print "WARNING : SKIN VALUES MUST BE A NUMBER BETWEEN 0 AND 1"
+                return False
+            for row in rows: skinnedPins[row].setSkinValue(skinValue)
+        elif column == self.AXISWEIGHTS: #Axis weights are entered as xx,xy,yx,yy - or left empty to use the skin value on both axes
+            axisWeights = None
+            if text:
+                try: axisWeights = [float(w) for w in text.split(",")]
+                except ValueError:
+                    print "WARNING : AXIS WEIGHTS MUST BE FOUR NUMBERS SEPARATED BY COMMAS"
+                    return False
+            for row in rows: skinnedPins[row].setAxisWeights(axisWeights)
+        else: return False
+        self.superNode.markDirty() #Move the skinned pins, and everything they drive, once for the whole batch
+        self.dataChanged.emit(self.index(min(rows), column), self.index(max(rows), column))
+        return True
+
+
+class SkinFillDelegate(QtGui.QStyledItemDelegate):
+    """Item delegate for the SkinTabW that fills an edited value down every selected row of the same column"""
+    def setModelData(self, editor, model, index):
+        rows = set([index.row()])
+        for selected in self.parent().selectionModel().selectedIndexes():
+            if selected.column() == index.column(): rows.add(selected.row())
+        model.setRangeData(sorted(rows), index.column(), editor.text())
+
+
+class SkinTabW(QtGui.QTableView):
+    """Class to subclass QTableView to give us control over how we handle
     the skinning data on a SuperNode
 
     If a SuperNode is selected then the populate() method is called in this 
     class to fill the contents of the UI bottom docking Skinning Table
 
+    The table is a view onto a SkinTableModel, so selecting a SuperNode does not
+    build any table items. Editing a value with several rows selected fills
+    it down all of them.
+
     """
     def __init__(self, parent = None):
         super(SkinTabW, self).__init__(parent)
         self.superNode = None
-        self.headers = QtCore.QStringList()
-        self.headers.append(QtCore.QString("  Super Node Controller  "))
-        self.headers.append(QtCore.QString("  Node Wire Group  "))
-        self.headers.append(QtCore.QString("  Node Index  "))
-        self.headers.append(QtCore.QString("  Skin Value  "))
+        self.skinModel = SkinTableModel(self)
+        self.setModel(self.skinModel)
+        self.setItemDelegate(SkinFillDelegate(self))
+        self.verticalHeader().setDefaultSectionSize(20)
         self.populate()
 
     def getSuperNode(self):
@@ -253,26 +360,8 @@ class SkinTabW(QtGui.QTableWidget):
         self.populate()
 
     def populate(self):
-        if self.superNode:
-            self.clear()
-            self.setColumnCount(4)
-            self.setHorizontalHeaderLabels(self.headers)
-            for index, skinPin in enumerate(self.superNode.getSkinnedPins()):
-                superNodeNameitem = QtGui.QTableWidgetItem(self.superNode.getName())
-                superNodeNameitem.setFlags(QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled)
-                wireGroupNameitem = QtGui.QTableWidgetItem(skinPin.getWireGroupName())
-                wireGroupNameitem.setFlags(QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled)
-                pinIndexItem = QtGui.QTableWidgetItem(str(skinPin.getPinIndex()))
-                pinIndexItem.setFlags(QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled)
-                skinValueItem = QtGui.QTableWidgetItem(str(skinPin.getSkinValue()))
-
-                self.setItem(index,0,superNodeNameitem)
-                self.setItem(index,1,wireGroupNameitem)
-                self.setItem(index,2,pinIndexItem)
-                self.setItem(index,3,skinValueItem)
-            self.setRowCount(len(self.superNode.getSkinnedPins()))
-            self.resizeColumnsToContents()
-            self.resizeRowsToContents()
+        self.skinModel.setSuperNode(self.superNode)
+        if self.superNode: self.resizeColumnsToContents() #Only sizes from the rows on screen
 
     def mousePressEvent(self, mouseEvent):
         # print "Node"
@@ -295,12 +384,3 @@ class SkinTabW(QtGui.QTableWidget):
         mItem = self.indexAt(mouseEvent.pos())
         # if mItem.row() == -1 : print "missed"
         return QtGui.QAbstractItemView.mouseReleaseEvent(self, mouseEvent)
-
-    def updateSkinning(self, item): #Need to add restriction of value to input to 0 - 1 and also to only allow float values
-        if item.column() == 3: #Tryiong to check if the table is fully formed
-            self.superNode.getSkinnedPins()[item.row()].setSkinValue(float(item.text()))
-            self.superNode.getSkinnedPins()[item.row()].update()
-            homeNode = self.superNode.getSkinnedPins()[item.row()].getPin().getNode()
-            if homeNode:  #Hacky way of updating the curves when the pin is sent home! Maybe wrap into a neat function
-                for rigCurve in homeNode.rigCurveList:
-                    rigCurve().buildCurve() 